@@ -1,20 +1,37 @@
+import atexit
+from contextlib import contextmanager
+from datetime import date
 from functools import cached_property
-import netCDF4 as nc
+import os
+from pathlib import Path
+import threading
 from psycopg import sql
 import psycopg as pg
-from psycopg.rows import dict_row
+from psycopg.rows import dict_row, tuple_row
+from psycopg_pool import ConnectionPool
 from importlib import resources
 import time
 import pandas as pd
 from typing import IO
-from typing import Any, List, Dict, Optional
+from typing import Any, List, Dict, Iterable, Iterator, Mapping, Optional
+from dateutil.relativedelta import relativedelta
 import numpy as np
 from sqlalchemy import create_engine
 
 from OceanDB.config import Config
+from OceanDB.utils.basin_connections import BasinConnections
+from OceanDB.utils.basin_mask import load_basin_mask
 from OceanDB.utils.logging import get_logger
 
 
+def reset_pooled_connection(connection: pg.Connection) -> None:
+    """
+    Undo per-use connection settings before a connection goes back to the pool
+    """
+    connection.autocommit = False
+    connection.row_factory = tuple_row
+
+
 class OceanDB:
     """
     Base class for all classes that interface with the Postgres database
@@ -22,6 +39,19 @@ class OceanDB:
     This class expects a .env file at the project root with database credentials.  See instructions in the README
     """
 
+    # Connection pools shared by all OceanDB objects, keyed by process and DSN so a
+    # forked process never uses the sockets of its parent
+    _connection_pools: dict[tuple[int, str], ConnectionPool] = {}
+    _connection_pools_lock = threading.Lock()
+
+    # Contents of the SQL files read by this process, keyed by file name
+    _sql_files: dict[str, str] = {}
+
+    # Basin connectivity, read once per process, see basin_connections
+    _basin_connections: Optional[BasinConnections] = None
+    # Basin mask mapped by this process, see basin_mask_data
+    _basin_mask_data: Optional[np.ndarray] = None
+
     def __init__(
         self,
     ):
@@ -56,13 +86,16 @@ class OceanDB:
 
     def load_sql_file(self, filename: str):
         """
-        Load the contents of a SQL file
+        Load the contents of a SQL file, read once per process
         """
-        with self.load_module_file(
-            module="OceanDB.sql", filename=filename, mode="r", encoding="utf-8"
-        ) as f:
-            query = f.read()
-            return query
+        query = OceanDB._sql_files.get(filename)
+        if query is None:
+            with self.load_module_file(
+                module="OceanDB.sql", filename=filename, mode="r", encoding="utf-8"
+            ) as f:
+                query = f.read()
+            OceanDB._sql_files[filename] = query
+        return query
 
     def select_query(self, table: str, query: str) -> Optional[List[Dict[str, Any]]]:
         """
@@ -81,8 +114,8 @@ class OceanDB:
             List of dictionaries (rows), or None if no results.
         """
         try:
-            with pg.connect(self.connection_string, row_factory=dict_row) as conn:
-                with conn.cursor() as cur:
+            with self.borrow_connection() as conn:
+                with conn.cursor(row_factory=dict_row) as cur:
                     cur.execute(query)
 
                     # Detect if the query returns rows (e.g. SELECT)
@@ -100,6 +133,195 @@ class OceanDB:
             self.logger.info(f"Error while Executing Query: {ex}")
             return None
 
+    @property
+    def connection_pool(self) -> ConnectionPool:
+        """
+        The connection pool shared by every OceanDB object in this process.
+
+        Opened on first use with the ``postgres_pool_*`` settings of the first object
+        that asks for it.
+        """
+        key = (os.getpid(), self.connection_string)
+        pool = OceanDB._connection_pools.get(key)
+        if pool is not None:
+            return pool
+
+        with OceanDB._connection_pools_lock:
+            pool = OceanDB._connection_pools.get(key)
+            if pool is None:
+                if not OceanDB._connection_pools:
+                    atexit.register(OceanDB.close_connection_pools)
+                pool = ConnectionPool(
+                    self.connection_string,
+                    min_size=self.config.postgres_pool_min_size,
+                    max_size=max(
+                        self.config.postgres_pool_min_size,
+                        self.config.postgres_pool_max_size,
+                    ),
+                    max_lifetime=self.config.postgres_pool_max_lifetime,
+                    max_idle=self.config.postgres_pool_max_idle,
+                    timeout=self.config.postgres_pool_timeout,
+                    check=(
+                        ConnectionPool.check_connection
+                        if self.config.postgres_pool_check
+                        else None
+                    ),
+                    reset=reset_pooled_connection,
+                    name="oceandb",
+                    open=True,
+                )
+                OceanDB._connection_pools[key] = pool
+        return pool
+
+    @classmethod
+    def close_connection_pools(cls) -> None:
+        """
+        Close the connection pools opened by this process
+        """
+        with cls._connection_pools_lock:
+            for key in [key for key in cls._connection_pools if key[0] == os.getpid()]:
+                cls._connection_pools.pop(key).close()
+
+    def ensure_pool_capacity(self, connections: int) -> None:
+        """
+        Grow the pool so that ``connections`` connections can be held at once, e.g. by
+        worker threads that each keep a connection for their whole run.
+        """
+        pool = self.connection_pool
+        if pool.max_size < connections:
+            pool.resize(min_size=pool.min_size, max_size=connections)
+
+    def pool_stats(self) -> dict[str, int]:
+        """
+        Current size and usage counters of the connection pool, see
+        ``psycopg_pool.ConnectionPool.get_stats``
+        """
+        return self.connection_pool.get_stats()
+
+    @contextmanager
+    def borrow_connection(
+        self, connection: Optional[pg.Connection] = None
+    ) -> Iterator[pg.Connection]:
+        """
+        Yield ``connection`` if one is given, otherwise take one from the pool.
+
+        A borrowed connection is left open and uncommitted so the caller controls the
+        transaction.  A pooled connection is committed (rolled back on error) and
+        returned to the pool on exit.
+        """
+        if connection is not None:
+            yield connection
+            return
+
+        with self.connection_pool.connection() as pooled_connection:
+            yield pooled_connection
+
+    def list_partitions(
+        self, table_name: str, connection: Optional[pg.Connection] = None
+    ) -> list[str]:
+        """
+        Names of the partitions of a partitioned table
+        """
+        query = """
+            SELECT child.relname
+            FROM pg_inherits
+            JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+            WHERE pg_inherits.inhparent = %(table_name)s::regclass
+            ORDER BY child.relname
+        """
+        with self.borrow_connection(connection) as conn:
+            with conn.cursor() as cur:
+                cur.execute(query, {"table_name": f"public.{table_name}"})
+                return [row[0] for row in cur.fetchall()]
+
+    def create_monthly_partitions(
+        self,
+        table_name: str,
+        months: Iterable[date],
+        connection: Optional[pg.Connection] = None,
+        sub_partition_column: Optional[str] = None,
+        sub_partition_values: Optional[Mapping[str, Any]] = None,
+    ) -> list[str]:
+        """
+        Create the missing monthly partitions of ``table_name`` in one transaction.
+
+        ``months`` may contain any date within each month.  Concurrent callers are
+        serialized by a transaction-level advisory lock on the table, so two writers
+        never race to create the same partition.
+
+        With ``sub_partition_column`` each month is itself partitioned by LIST on that
+        column.  ``sub_partition_values`` maps a name suffix to the value of each
+        sub-partition, e.g. ``{"j3": 19}`` creates ``along_track_2019_01_j3``, and a
+        DEFAULT sub-partition holds any other value.
+
+        Returns the names of the monthly partitions that were created.
+        """
+        months = sorted({date(month.year, month.month, 1) for month in months})
+        if not months:
+            return []
+
+        if sub_partition_column is None:
+            statement = self.load_sql_file(
+                "tables/along_track/create_along_track_table_partition.sql"
+            )
+        else:
+            statement = self.load_sql_file(
+                "tables/along_track/create_along_track_table_partition_by_mission.sql"
+            )
+            sub_partition_statement = self.load_sql_file(
+                "tables/along_track/create_along_track_table_mission_subpartition.sql"
+            )
+            default_partition_statement = self.load_sql_file(
+                "tables/along_track/create_along_track_table_default_subpartition.sql"
+            )
+
+        created = []
+        with self.borrow_connection(connection) as conn:
+            with conn.cursor() as cur:
+                cur.execute("SELECT pg_advisory_xact_lock(hashtext(%s))", (table_name,))
+                existing = set(self.list_partitions(table_name, connection=conn))
+                for month in months:
+                    partition_name = f"{table_name}_{month.year}_{month.month:02d}"
+                    if partition_name in existing:
+                        continue
+                    next_month = month + relativedelta(months=1)
+                    params = {
+                        "partition_name": sql.Identifier(partition_name),
+                        "table_name": sql.Identifier(table_name),
+                        "min_partition_date": sql.Literal(month.isoformat()),
+                        "max_partition_date": sql.Literal(next_month.isoformat()),
+                    }
+                    if sub_partition_column is not None:
+                        params["sub_partition_column"] = sql.Identifier(
+                            sub_partition_column
+                        )
+                    cur.execute(sql.SQL(statement).format(**params))
+
+                    if sub_partition_column is not None:
+                        for suffix, value in (sub_partition_values or {}).items():
+                            cur.execute(
+                                sql.SQL(sub_partition_statement).format(
+                                    partition_name=sql.Identifier(
+                                        f"{partition_name}_{suffix}"
+                                    ),
+                                    table_name=sql.Identifier(partition_name),
+                                    value=sql.Literal(value),
+                                )
+                            )
+                        cur.execute(
+                            sql.SQL(default_partition_statement).format(
+                                partition_name=sql.Identifier(
+                                    f"{partition_name}_default"
+                                ),
+                                table_name=sql.Identifier(partition_name),
+                            )
+                        )
+                    created.append(partition_name)
+
+        for partition_name in created:
+            self.logger.info(f"Created partition {partition_name}")
+        return created
+
     # def execute_query(self, table, query):
     #     try:
     #         with pg.connect(self.connection_string) as conn:
@@ -125,7 +347,7 @@ class OceanDB:
     def vacuum_analyze(self):
         print(f"Starting VACUUM ANALYZE...")
         start = time.time()
-        with pg.connect(self.connection_string) as conn:
+        with self.borrow_connection() as conn:
             conn.autocommit = True
             with conn.cursor() as cur:
                 cur.execute("VACUUM ANALYZE")
@@ -153,7 +375,7 @@ class OceanDB:
             table_name=sql.Identifier(name)
         )
 
-        with pg.connect(self.connection_string) as conn:
+        with self.borrow_connection() as conn:
             with conn.cursor() as cur:
                 cur.execute(query_truncate_table)
                 conn.commit()
@@ -218,21 +440,20 @@ class OceanDB:
                     }
         return xrdata, encodings
 
-    @cached_property
-    def basin_mask_data(self):
+    @property
+    def basin_mask_data(self) -> np.ndarray:
         """
-        Load the basin mask NetCDF file packaged with the module.
-        Returns the 'basinmask' variable as a NumPy array.
+        The basin mask NetCDF file packaged with the module, as a read-only memory
+        map shared by every process, see :func:`load_basin_mask`
         """
-        # Open resource file via importlib.resources
-        with self.load_module_file(
-            "OceanDB.data", "basin_masks/new_basin_mask.nc", mode="rb"
-        ) as f:
-            ds = nc.Dataset("inmemory.nc", memory=f.read())  # load from memory buffer
-            ds.set_auto_mask(False)
-            basin_mask = ds.variables["basinmask"][:]
-            ds.close()
-            return basin_mask
+        if OceanDB._basin_mask_data is None:
+            OceanDB._basin_mask_data = load_basin_mask(
+                resources.files(self.data_pkg).joinpath(
+                    "basin_masks/new_basin_mask.nc"
+                ),
+                Path(self.config.oceandb_cache_directory).expanduser(),
+            )
+        return OceanDB._basin_mask_data
 
     def basin_mask(self, latitude, longitude):
         """
@@ -245,86 +466,24 @@ class OceanDB:
         basin_mask = mask_data[i, j]
         return basin_mask
 
+    @property
+    def basin_connections(self) -> BasinConnections:
+        """
+        Connectivity of the ocean basins, read once per process from the
+        ``ocean_basin_connections.csv`` packaged with the module, the same rows
+        loaded into the basin_connections table
+        """
+        if OceanDB._basin_connections is None:
+            with self.load_module_file(
+                "OceanDB.data", "basins/ocean_basin_connections.csv", mode="r"
+            ) as f:
+                OceanDB._basin_connections = BasinConnections.from_csv(f)
+        return OceanDB._basin_connections
+
     @cached_property
     def basin_connection_map(self) -> dict:
-        with pg.connect(self.connection_string) as connection:
-            with connection.cursor() as cursor:
-                cursor.execute(
-                    """SELECT DISTINCT basin_id FROM basin_connections ORDER BY basin_id"""
-                )
-                unique_ids = cursor.fetchall()
-
-        uid = [data_i[0] for data_i in unique_ids]
-        basin_id_dict = [{"basin_id": basin_id} for basin_id in uid]
-
-        query = """SELECT array_agg(connected_id) as connected_basin_id
-        		FROM basin_connections
-        		WHERE basin_id = %(basin_id)s
-        		GROUP BY basin_id"""
-
-        basin_id_connection_dict = {}
-        with pg.connect(self.connection_string) as connection:
-            with connection.cursor() as cursor:
-                cursor.executemany(query, basin_id_dict, returning=True)
-                i = 0
-                while True:
-                    data = cursor.fetchall()
-                    basin_id_connection_dict[uid[i]] = data[0][0]
-                    basin_id_connection_dict[uid[i]].insert(0, uid[i])
-                    i = i + 1
-                    if not cursor.nextset():
-                        break
-        return basin_id_connection_dict
-
-    def data_as_xarray(self, data, header_array, row_metadata):
-        meta = dict()
-        encodings = dict()
-
-        try:
-            df = pd.DataFrame(data, columns=header_array)
-        except Exception as err:
-            print(err)
-            raise Exception
-
-        # We need to either assign the metadata to the 'attrs' of the variable, or the encoding. If we do the encoding,
-        # then xarray will actively transform the data. For the moment, I am only transforming the datatype.
-        # The other notable piece is time. Time data already has some default encoding associated with it, so we just
-        # need to override it.
-
-        # encoding_keys = ['dtype', 'scale_factor', 'add_offset', '_FillValue']
-        encoding_keys = ["dtype"]
-        disallowed_time_keys = [
-            "dtype",
-            "units",
-            "calendar",
-            "scale_factor",
-            "add_offset",
-        ]
-
-        xrdata = df.to_xarray()
-        for record in row_metadata:
-            if record["var_name"] in header_array:
-                # Remove empty items from dictionary. Xarray will throw an error is an item is None
-                if "time" in record["var_name"]:
-                    xrdata[record["var_name"]].attrs = {
-                        k: v
-                        for k, v in record.items()
-                        if v is not None and k not in disallowed_time_keys
-                    }
-                    xrdata[record["var_name"]].encoding["dtype"] = "float64"
-                    xrdata[record["var_name"]].encoding[
-                        "units"
-                    ] = "days since 1950-01-01 00:00:00"
-                    xrdata[record["var_name"]].encoding["calendar"] = "gregorian"
-                else:
-                    xrdata[record["var_name"]].attrs = {
-                        k: v
-                        for k, v in record.items()
-                        if v is not None and k not in encoding_keys
-                    }
-                    encodings[record["var_name"]] = {
-                        k: v
-                        for k, v in record.items()
-                        if v is not None and k in encoding_keys
-                    }
-        return xrdata, encodings
+        """
+        ``{basin_id: connected basin ids}``, the basin itself first.  Prefer
+        :attr:`basin_connections`, which looks up arrays of basins at once.
+        """
+        return self.basin_connections.to_dict()
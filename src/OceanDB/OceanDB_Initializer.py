@@ -1,10 +1,15 @@
 import psycopg as pg
 from psycopg import sql
+from concurrent.futures import ThreadPoolExecutor
+from collections import defaultdict
 from datetime import datetime
+import time
+from typing import Iterable
 from dateutil.relativedelta import relativedelta
 from sqlalchemy import text
 
 from OceanDB.OceanDB import OceanDB
+from OceanDB.etl.along_track_etl import AlongTrackETL
 
 table_definitions = [
     {
@@ -24,6 +29,27 @@ table_definitions = [
         "filepath": "tables/along_track/create_along_track_metadata_table.sql",
         "params": {"table_name": "along_track_metadata"},
     },
+    {
+        "name": "along_track_generation",
+        "filepath": "tables/along_track/create_along_track_generation.sql",
+        "params": {
+            "table_name": "along_track_metadata",
+            "generation_table_name": "along_track_generation",
+            "function_name": "bump_along_track_generation",
+            "trigger_name": "along_track_metadata_generation",
+            "truncate_trigger_name": "along_track_metadata_truncate_generation",
+        },
+    },
+    {
+        "name": "along_track_mission",
+        "filepath": "tables/along_track/create_along_track_mission_table.sql",
+        "params": {"table_name": "along_track_mission"},
+    },
+    {
+        "name": "along_track_file",
+        "filepath": "tables/along_track/create_along_track_file_table.sql",
+        "params": {"table_name": "along_track_file"},
+    },
     {
         "name": "along_track",
         "filepath": "tables/along_track/create_along_track_table.sql",
@@ -31,6 +57,32 @@ table_definitions = [
     },
 ]
 
+# along_track with each monthly partition sub-partitioned by mission,
+# used instead of the above when ALONG_TRACK_MISSION_PARTITIONS is set
+along_track_by_mission_table = {
+    "name": "along_track",
+    "filepath": "tables/along_track/create_along_track_table_by_mission.sql",
+    "params": {"table_name": "along_track"},
+}
+
+# along_track in the compact layout: a table with integer micro-degree coordinates,
+# read through a view named along_track, used when ALONG_TRACK_COMPACT_ROWS is set
+along_track_compact_table = {
+    "name": "along_track_compact",
+    "filepath": "tables/along_track/create_along_track_compact_table.sql",
+}
+along_track_compact_view = {
+    "name": "along_track",
+    "filepath": "tables/along_track/create_along_track_compact_view.sql",
+}
+
+# along_track_point of the compact layout.  The view and the spatial indices must use
+# the same expression for the planner to match queries on the view to the indices.
+compact_along_track_point = (
+    "(ST_SetSRID(ST_MakePoint(longitude::double precision / 1000000, "
+    "latitude::double precision / 1000000), 4326)::geography)"
+)
+
 
 eddy_tables = [
     {
@@ -50,52 +102,82 @@ sql_index_files = [
     {
         "name": "along_track_index_basin",
         "filepath": "indices/along_track/create_along_track_index_basin.sql",
-        "params": {"index_name": "along_track_index_basin"},
+        "params": {
+            "index_name": "along_track_basin_idx",
+            "table_name": "along_track",
+        },
     },
     {
         "name": "along_track_index_date",
         "filepath": "indices/along_track/create_along_track_index_date.sql",
-        "params": {"index_name": "along_track_index_date"},
+        "params": {
+            "index_name": "along_track_date_idx",
+            "table_name": "along_track",
+        },
     },
     {
         "name": "along_track_index_filename",
         "filepath": "indices/along_track/create_along_track_index_filename.sql",
-        "params": {"index_name": "along_track_index_filename"},
+        "params": {
+            "index_name": "along_track_file_name_idx",
+            "table_name": "along_track",
+        },
     },
     {
         "name": "along_track_index_mission",
         "filepath": "indices/along_track/create_along_track_index_mission.sql",
-        "params": {"index_name": "along_track_index_mission"},
+        "params": {
+            "index_name": "along_track_mission_idx",
+            "table_name": "along_track",
+        },
     },
     {
         "name": "along_track_index_point",
         "filepath": "indices/along_track/create_along_track_index_point.sql",
-        "params": {"index_name": "along_track_index_point"},
+        "params": {
+            "index_name": "along_track_point_idx",
+            "table_name": "along_track",
+        },
     },
     {
         "name": "along_track_index_point_date",
         "filepath": "indices/along_track/create_along_track_index_point_date.sql",
-        "params": {"index_name": "along_track_index_point_date"},
+        "params": {
+            "index_name": "along_track_point_date_idx",
+            "table_name": "along_track",
+        },
     },
     {
         "name": "along_track_index_point_date_mission",
         "filepath": "indices/along_track/create_along_track_index_point_date_mission.sql",
-        "params": {"index_name": "along_track_index_point_date_mission"},
+        "params": {
+            "index_name": "along_track_point_date_mission_idx",
+            "table_name": "along_track",
+        },
     },
     {
         "name": "along_track_index_point_date_mission_basin",
         "filepath": "indices/along_track/create_along_track_index_point_date_mission_basin.sql",
-        "params": {"index_name": "along_track_index_point_date_mission_basin"},
+        "params": {
+            "index_name": "along_track_point_date_mission_basin_idx",
+            "table_name": "along_track",
+        },
     },
     {
         "name": "along_track_index_point_geom",
         "filepath": "indices/along_track/create_along_track_index_point_geom.sql",
-        "params": {"index_name": "along_track_index_point_geom"},
+        "params": {
+            "index_name": "along_track_point_geom_idx",
+            "table_name": "along_track",
+        },
     },
     {
         "name": "along_track_index_time",
         "filepath": "indices/along_track/create_along_track_index_time.sql",
-        "params": {"index_name": "along_track_index_time"},
+        "params": {
+            "index_name": "along_track_time_idx",
+            "table_name": "along_track",
+        },
     },
     {
         "name": "basin_connection_index_basin_id",
@@ -189,6 +271,9 @@ EXPECTED_TABLE_INDEXES = {
 
 
 class OceanDBInit(OceanDB):
+    # Name of the pre-migration along_track, see migrate_along_track
+    legacy_along_track_table = "along_track_monthly"
+
     def __init__(self):
         super().__init__()
 
@@ -212,7 +297,7 @@ class OceanDBInit(OceanDB):
                 print(f"Database '{self.db_name}' created successfully.")
 
         ## Enable POSTGIS extensions
-        with pg.connect(self.config.postgres_dsn) as atdb_conn:
+        with self.borrow_connection() as atdb_conn:
             with atdb_conn.cursor() as atdb_cur:
                 atdb_cur.execute(sql.SQL("CREATE EXTENSION IF NOT EXISTS plpgsql;"))
                 atdb_cur.execute(sql.SQL("CREATE EXTENSION IF NOT EXISTS postgis;"))
@@ -224,8 +309,11 @@ class OceanDBInit(OceanDB):
         for table in table_definitions:
             try:
                 table_name = table["name"]
-                query = self.parametrize_sql_statements(table)
-                self.execute_query(table, query)
+                if table_name == "along_track":
+                    self.create_along_track_table()
+                else:
+                    query = self.parametrize_sql_statements(table)
+                    self.execute_query(table, query)
                 self.logger.info(f"Executing {table_name}")
             except Exception as ex:
                 self.logger.info(f"{table_name}")
@@ -243,12 +331,268 @@ class OceanDBInit(OceanDB):
                 self.logger.info(ex)
 
     def create_indices(self):
+        along_track_indices = self.along_track_index_definitions()
         for index in sql_index_files:
             table_name = index["name"]
-            query = self.parametrize_sql_statements(index)
+            if index in along_track_indices:
+                query = self.along_track_index_query(
+                    index,
+                    index_name=index["params"]["index_name"],
+                    table=sql.Identifier(self.along_track_physical_table),
+                )
+            else:
+                query = self.parametrize_sql_statements(index)
             self.execute_query(index, query)
             self.logger.info(f"Executing {table_name}")
 
+    @property
+    def along_track_physical_table(self) -> str:
+        """
+        The table holding the along_track rows: along_track itself, or the table
+        behind the along_track view in the compact layout
+        """
+        if self.config.along_track_compact_rows:
+            return AlongTrackETL.along_track_compact_table_name
+        return "along_track"
+
+    def along_track_point(self) -> sql.Composable:
+        """
+        The along_track_point geography as an expression on the physical table
+        """
+        if self.config.along_track_compact_rows:
+            return sql.SQL(compact_along_track_point)
+        return sql.Identifier("along_track_point")
+
+    def create_along_track_table(self):
+        """
+        Create along_track in the configured layout, see
+        Config.along_track_mission_partitions & Config.along_track_compact_rows
+        """
+        mission_partitions = self.config.along_track_mission_partitions
+        if not self.config.along_track_compact_rows:
+            if mission_partitions:
+                table = along_track_by_mission_table
+            else:
+                table = next(t for t in table_definitions if t["name"] == "along_track")
+            self.execute_query(table, self.parametrize_sql_statements(table))
+            return
+
+        # Unique constraints must include every partition key
+        primary_key = ["date_time", "latitude", "longitude"]
+        if mission_partitions:
+            primary_key.append("mission_id")
+        physical_table = self.along_track_physical_table
+        self.execute_query(
+            along_track_compact_table,
+            sql.SQL(self.load_sql(along_track_compact_table["filepath"])).format(
+                table_name=sql.Identifier(physical_table),
+                primary_key_name=sql.Identifier(f"{physical_table}_pkey"),
+                primary_key=sql.SQL(", ").join(map(sql.Identifier, primary_key)),
+            ),
+        )
+        self.execute_query(
+            along_track_compact_view,
+            sql.SQL(self.load_sql(along_track_compact_view["filepath"])).format(
+                view_name=sql.Identifier("along_track"),
+                table_name=sql.Identifier(physical_table),
+                point=self.along_track_point(),
+            ),
+        )
+
+    def along_track_index_definitions(self) -> list[dict]:
+        """
+        The secondary along_track indices, i.e. everything except the primary key and
+        the unique constraint
+        """
+        return [
+            index
+            for index in sql_index_files
+            if index["params"].get("table_name") == "along_track"
+        ]
+
+    def along_track_partitions(self) -> list[str]:
+        """
+        Names of the partitions of along_track
+        """
+        return self.list_partitions(self.along_track_physical_table)
+
+    def can_defer_along_track_indices(self, new_partitions: Iterable[str]) -> bool:
+        """
+        Whether the secondary indices can be dropped to load rows into
+        ``new_partitions``, see drop_along_track_indices.
+
+        Postgres cannot drop the index of a single partition, an index is dropped
+        from every partition at once.  So the indices are only dropped if no other
+        partition holds rows, e.g. for an initial archive load, rather than leave the
+        rows already loaded unindexed until every partition is rebuilt.
+        """
+        new_partitions = set(new_partitions)
+        partitions = [
+            partition
+            for partition in self.along_track_partitions()
+            if partition not in new_partitions
+        ]
+        with self.borrow_connection() as conn:
+            with conn.cursor() as cur:
+                for partition in partitions:
+                    cur.execute(
+                        sql.SQL("SELECT EXISTS (SELECT 1 FROM public.{})").format(
+                            sql.Identifier(partition)
+                        )
+                    )
+                    if cur.fetchone()[0]:
+                        self.logger.info(f"{partition} holds rows, keeping indices")
+                        return False
+        return True
+
+    def drop_along_track_indices(self):
+        """
+        Drop the secondary along_track indices from the table and all its partitions.
+
+        Used before an initial archive ingest so rows are loaded without index
+        maintenance, see can_defer_along_track_indices and
+        rebuild_along_track_indices.
+        """
+        with self.borrow_connection() as conn:
+            with conn.cursor() as cur:
+                for index in self.along_track_index_definitions():
+                    index_name = index["params"]["index_name"]
+                    cur.execute(
+                        sql.SQL("DROP INDEX IF EXISTS public.{index_name}").format(
+                            index_name=sql.Identifier(index_name)
+                        )
+                    )
+                    self.logger.info(f"Dropped {index_name}")
+
+    def rebuild_along_track_indices(
+        self,
+        workers: int = 4,
+        maintenance_work_mem: str = "1GB",
+        partitions: list[str] | None = None,
+    ) -> float:
+        """
+        Build the secondary along_track indices partition by partition, in parallel.
+
+        Each index is first created ``ON ONLY along_track``, which is instant and
+        leaves it invalid.  Every (partition, index) pair is then built on its own
+        connection by ``workers`` threads and attached to the parent index, which
+        becomes valid once all partitions are attached.  Partitions that already have
+        an attached index are skipped, so an interrupted rebuild can be rerun.
+
+        Each worker uses ``maintenance_work_mem``, so peak server memory is roughly
+        ``workers * maintenance_work_mem``.
+
+        Returns the total build time in seconds.
+        """
+        start = time.perf_counter()
+        indices = self.along_track_index_definitions()
+        partitions = partitions or self.along_track_partitions()
+
+        with self.borrow_connection() as conn:
+            with conn.cursor() as cur:
+                for index in indices:
+                    cur.execute(
+                        self.along_track_index_query(
+                            index,
+                            index_name=index["params"]["index_name"],
+                            table=sql.SQL("ONLY {}").format(
+                                sql.Identifier(
+                                    "public", self.along_track_physical_table
+                                )
+                            ),
+                        )
+                    )
+
+        tasks = [(partition, index) for partition in partitions for index in indices]
+        self.ensure_pool_capacity(workers)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            durations = list(
+                executor.map(
+                    lambda task: self.build_partition_index(
+                        *task, maintenance_work_mem=maintenance_work_mem
+                    ),
+                    tasks,
+                )
+            )
+
+        index_durations = defaultdict(float)
+        for (_, index), duration in zip(tasks, durations):
+            index_durations[index["params"]["index_name"]] += duration
+        for index_name, duration in index_durations.items():
+            print(f"{index_name}: {duration:.2f} seconds across partitions")
+
+        total_duration = time.perf_counter() - start
+        print(
+            f"Built {len(indices)} indices on {len(partitions)} partitions "
+            f"in {total_duration:.2f} seconds"
+        )
+        return total_duration
+
+    def build_partition_index(
+        self, partition: str, index: dict, maintenance_work_mem: str = "1GB"
+    ) -> float:
+        """
+        Build one secondary index on one partition and attach it to the parent index.
+
+        Returns the build time in seconds, 0 if the partition was already indexed.
+        """
+        parent_index_name = index["params"]["index_name"]
+        index_name = f"{partition}_{parent_index_name.removeprefix('along_track_')}"
+
+        start = time.perf_counter()
+        with self.borrow_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    """
+                    SELECT 1
+                    FROM pg_inherits
+                    JOIN pg_index ON pg_index.indexrelid = pg_inherits.inhrelid
+                    WHERE pg_inherits.inhparent = %(parent_index)s::regclass
+                      AND pg_index.indrelid = %(partition)s::regclass
+                    """,
+                    {
+                        "parent_index": f"public.{parent_index_name}",
+                        "partition": f"public.{partition}",
+                    },
+                )
+                if cur.fetchone() is not None:
+                    return 0.0
+
+                cur.execute(
+                    "SELECT set_config('maintenance_work_mem', %s, true)",
+                    (maintenance_work_mem,),
+                )
+                cur.execute(
+                    self.along_track_index_query(
+                        index,
+                        index_name=index_name,
+                        table=sql.Identifier("public", partition),
+                    )
+                )
+                cur.execute(
+                    sql.SQL("ALTER INDEX {parent} ATTACH PARTITION {child}").format(
+                        parent=sql.Identifier("public", parent_index_name),
+                        child=sql.Identifier("public", index_name),
+                    )
+                )
+
+        duration = time.perf_counter() - start
+        self.logger.info(f"Built {index_name} in {duration:.2f} seconds")
+        return duration
+
+    def along_track_index_query(
+        self, index: dict, index_name: str, table: sql.Composable
+    ) -> sql.Composed:
+        """
+        Render an along_track index definition for an arbitrary index name and table,
+        with along_track_point as stored in the configured layout
+        """
+        return sql.SQL(self.load_sql(index["filepath"])).format(
+            index_name=sql.Identifier(index_name),
+            table_name=table,
+            point=self.along_track_point(),
+        )
+
     def create_eddy_indices(self):
         for index in eddy_index_files:
             table_name = index["name"]
@@ -262,35 +606,373 @@ class OceanDBInit(OceanDB):
         Args:
         min_date (str | datetime): start date, e.g. "2020-01-01"
         max_date (str | datetime): end date, e.g. "2020-06-01"
+
+        All missing partitions are created in a single transaction.
         """
         if isinstance(min_date, str):
             min_date = datetime.strptime(min_date, "%Y-%m-%d")
         if isinstance(max_date, str):
             max_date = datetime.strptime(max_date, "%Y-%m-%d")
 
-        query_filepath = "tables/along_track/create_along_track_table_partition.sql"
-
-        table_name = "along_track"
+        months = []
         current = min_date.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+        while current < max_date:
+            months.append(current)
+            current = current + relativedelta(months=1)
 
-        sql_statement = self.load_sql(query_filepath)
+        return AlongTrackETL().create_along_track_partitions(months)
 
-        while current < max_date:
-            next_month = (current + relativedelta(months=1)).replace(day=1)
-            partition_name = f"{table_name}_{current.year}_{current.month:02d}"
-
-            safe_params = {
-                "partition_name": sql.Identifier(partition_name),
-                "table_name": sql.Identifier(table_name),
-                "min_partition_date": sql.Literal(current.strftime("%Y-%m-%d")),
-                "max_partition_date": sql.Literal(next_month.strftime("%Y-%m-%d")),
-            }
-            # Safely construct SQL
-            query = sql.SQL(sql_statement).format(**safe_params)
-            self.execute_query(query=query, table=partition_name)
-
-            print(f"Created partition {partition_name}")
-            current = next_month
+    def migrate_along_track(
+        self,
+        workers: int = 4,
+        maintenance_work_mem: str = "1GB",
+        drop_legacy: bool = False,
+    ) -> dict[str, float]:
+        """
+        Rebuild along_track in the current layout: monthly partitions, sub-partitioned
+        by mission if ALONG_TRACK_MISSION_PARTITIONS is set, compact rows if
+        ALONG_TRACK_COMPACT_ROWS is set, with file_name & mission stored as
+        along_track_file & along_track_mission keys.  A compact along_track cannot
+        be migrated.
+
+        1. The current table, its partitions, indices and identity sequence are
+           renamed to ``along_track_monthly*``, which only touches the catalog.
+        2. A new along_track is created in the current layout, with the same months.
+           If the legacy table stores file_name & mission as text, the dimension
+           tables are filled from along_track_metadata.
+        3. Each legacy month is copied by ``workers`` threads, one transaction per
+           month.  Months that already hold rows are skipped, so an interrupted
+           migration can be rerun.
+        4. The secondary indices are built with rebuild_along_track_indices.
+
+        along_track is empty between steps 2 and 3, so queries should be stopped
+        for the duration.  The legacy table is kept for comparison, see
+        benchmark_along_track_layouts, unless ``drop_legacy`` is set.
+
+        Returns the duration of each step in seconds.
+        """
+        durations = {}
+        start = time.perf_counter()
+        self.rename_along_track_to_legacy()
+        durations["rename"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for table in table_definitions:
+            if table["name"] in ("along_track_mission", "along_track_file"):
+                self.execute_query(table, self.parametrize_sql_statements(table))
+        self.create_along_track_table()
+        text_columns = self.legacy_along_track_has_text_columns()
+        if text_columns:
+            self.fill_along_track_dimensions_from_metadata()
+        legacy_partitions = self.list_partitions(self.legacy_along_track_table)
+        months = [
+            datetime.strptime(
+                partition.removeprefix(f"{self.legacy_along_track_table}_"), "%Y_%m"
+            )
+            for partition in legacy_partitions
+        ]
+        AlongTrackETL().create_along_track_partitions(months)
+        durations["create"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        self.ensure_pool_capacity(workers)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            list(
+                executor.map(
+                    lambda partition: self.copy_legacy_along_track_partition(
+                        partition, text_columns=text_columns
+                    ),
+                    legacy_partitions,
+                )
+            )
+        durations["copy"] = time.perf_counter() - start
+
+        durations["index"] = self.rebuild_along_track_indices(
+            workers=workers, maintenance_work_mem=maintenance_work_mem
+        )
+
+        if drop_legacy:
+            self.execute_query(
+                self.legacy_along_track_table,
+                sql.SQL("DROP TABLE public.{table}").format(
+                    table=sql.Identifier(self.legacy_along_track_table)
+                ),
+            )
+
+        print(
+            " | ".join(
+                f"{step}: {duration:.2f} seconds"
+                for step, duration in durations.items()
+            )
+        )
+        return durations
+
+    def rename_along_track_to_legacy(self) -> bool:
+        """
+        Rename along_track and everything that would collide with a new along_track
+        to ``along_track_monthly*``, in one transaction.
+
+        Index names are unique per schema, so the indices of the table and of all
+        its (sub-)partitions are renamed after their oid.  Returns False if the
+        rename was already done by an earlier run.
+        """
+        legacy = self.legacy_along_track_table
+        with self.borrow_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute("SELECT to_regclass(%s)", (f"public.{legacy}",))
+                if cur.fetchone()[0] is not None:
+                    return False
+
+                cur.execute(
+                    "SELECT relkind FROM pg_class "
+                    "WHERE oid = to_regclass('public.along_track')"
+                )
+                if cur.fetchone() == ("v",):
+                    raise ValueError(
+                        "along_track is a compact view, it cannot be migrated"
+                    )
+
+                cur.execute("""
+                    SELECT pg_class.relname
+                    FROM pg_partition_tree('public.along_track')
+                    JOIN pg_class ON pg_class.oid = pg_partition_tree.relid
+                    WHERE pg_partition_tree.level > 0
+                    """)
+                partitions = [row[0] for row in cur.fetchall()]
+                cur.execute(
+                    """
+                    SELECT index_class.relname, index_class.oid
+                    FROM pg_index
+                    JOIN pg_class index_class ON index_class.oid = pg_index.indexrelid
+                    WHERE pg_index.indrelid = ANY(%(tables)s::regclass[])
+                    """,
+                    {"tables": [f"public.{t}" for t in ["along_track", *partitions]]},
+                )
+                for index_name, oid in cur.fetchall():
+                    cur.execute(
+                        sql.SQL("ALTER INDEX {index} RENAME TO {legacy_index}").format(
+                            index=sql.Identifier("public", index_name),
+                            legacy_index=sql.Identifier(f"{legacy}_idx_{oid}"),
+                        )
+                    )
+
+                cur.execute("SELECT pg_get_serial_sequence('public.along_track', 'id')")
+                sequence = cur.fetchone()[0]
+                if sequence is not None:
+                    cur.execute(
+                        sql.SQL("ALTER SEQUENCE {sequence} RENAME TO {name}").format(
+                            sequence=sql.SQL(sequence),
+                            name=sql.Identifier(f"{legacy}_id_seq"),
+                        )
+                    )
+
+                cur.execute(
+                    sql.SQL("ALTER TABLE public.along_track RENAME TO {legacy}").format(
+                        legacy=sql.Identifier(legacy)
+                    )
+                )
+                for partition in partitions:
+                    cur.execute(
+                        sql.SQL("ALTER TABLE {partition} RENAME TO {name}").format(
+                            partition=sql.Identifier("public", partition),
+                            name=sql.Identifier(
+                                f"{legacy}_{partition.removeprefix('along_track_')}"
+                            ),
+                        )
+                    )
+
+        print(f"Renamed along_track and {len(partitions)} partitions to {legacy}")
+        return True
+
+    def legacy_along_track_has_text_columns(self) -> bool:
+        """
+        Whether the legacy table stores file_name & mission as text instead of keys
+        """
+        with self.borrow_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    """
+                    SELECT EXISTS (
+                        SELECT 1 FROM information_schema.columns
+                        WHERE table_schema = 'public'
+                          AND table_name = %s
+                          AND column_name = 'file_name'
+                    )
+                    """,
+                    (self.legacy_along_track_table,),
+                )
+                return cur.fetchone()[0]
+
+    def fill_along_track_dimensions_from_metadata(self):
+        """
+        Register every ingested file, and its mission, in the dimension tables.
+
+        along_track_metadata lists every ingested file, so the legacy rows do not
+        have to be scanned.  The mission is the third part of the file name, as in
+        AlongTrackETL.extract_data_from_netcdf.
+        """
+        AlongTrackETL().insert_along_track_missions()
+        with self.borrow_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute("""
+                    INSERT INTO along_track_mission (mission)
+                    SELECT DISTINCT split_part(file_name, '_', 3)
+                    FROM along_track_metadata
+                    ON CONFLICT (mission) DO NOTHING
+                    """)
+                cur.execute("""
+                    INSERT INTO along_track_file (file_name, mission_id)
+                    SELECT along_track_metadata.file_name, along_track_mission.mission_id
+                    FROM along_track_metadata
+                    JOIN along_track_mission
+                      ON along_track_mission.mission
+                         = split_part(along_track_metadata.file_name, '_', 3)
+                    ON CONFLICT (file_name) DO NOTHING
+                    """)
+                print(f"Registered {cur.rowcount} files")
+
+    def copy_legacy_along_track_partition(
+        self, legacy_partition: str, text_columns: bool = False
+    ) -> float:
+        """
+        Copy one legacy monthly partition into along_track.
+
+        With ``text_columns`` the file_name of each legacy row is replaced by the
+        keys of its along_track_file entry.  Coordinates are converted to integer
+        micro-degrees for the compact layout.  Rows of files missing from
+        along_track_metadata are orphans (see
+        AlongTrackETL.delete_along_track_file_rows) and are not copied.
+
+        Returns the copy time in seconds, 0 if the month was already copied.
+        """
+        physical_table = self.along_track_physical_table
+        partition = f"{physical_table}_" + legacy_partition.removeprefix(
+            f"{self.legacy_along_track_table}_"
+        )
+        columns = AlongTrackETL.along_track_copy_columns
+        select_list = []
+        for column in columns:
+            if text_columns and column in ("file_id", "mission_id"):
+                value = sql.Identifier("along_track_file", column)
+            else:
+                value = sql.Identifier("legacy", column)
+            if self.config.along_track_compact_rows and column in (
+                "latitude",
+                "longitude",
+            ):
+                value = sql.SQL("round({value} * {scale})::integer").format(
+                    value=value,
+                    scale=sql.Literal(AlongTrackETL.compact_coordinate_scale),
+                )
+            select_list.append(value)
+
+        source = sql.SQL("public.{legacy_partition} AS legacy").format(
+            legacy_partition=sql.Identifier(legacy_partition)
+        )
+        if text_columns:
+            source = sql.SQL("{source} JOIN along_track_file USING (file_name)").format(
+                source=source
+            )
+
+        start = time.perf_counter()
+        with self.borrow_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    sql.SQL("SELECT EXISTS (SELECT 1 FROM public.{partition})").format(
+                        partition=sql.Identifier(partition)
+                    )
+                )
+                if cur.fetchone()[0]:
+                    return 0.0
+
+                cur.execute(
+                    sql.SQL(
+                        "INSERT INTO public.{table} ({columns}) "
+                        "SELECT {select_list} FROM {source}"
+                    ).format(
+                        table=sql.Identifier(physical_table),
+                        columns=sql.SQL(", ").join(map(sql.Identifier, columns)),
+                        select_list=sql.SQL(", ").join(select_list),
+                        source=source,
+                    )
+                )
+                n_rows = cur.rowcount
+
+        duration = time.perf_counter() - start
+        self.logger.info(
+            f"Copied {n_rows} rows into {partition} in {duration:.2f} seconds"
+        )
+        return duration
+
+    def along_track_storage(self, table: str, month: datetime) -> dict[str, int]:
+        """
+        Row count and on-disk bytes of one monthly partition of ``table``,
+        including its sub-partitions.  ``toast_bytes`` also counts the free space
+        and visibility maps.
+        """
+        partition = f"{table}_{month.year}_{month.month:02d}"
+        with self.borrow_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    sql.SQL("SELECT count(*) FROM public.{partition}").format(
+                        partition=sql.Identifier(partition)
+                    )
+                )
+                rows = cur.fetchone()[0]
+                cur.execute(
+                    """
+                    SELECT
+                        coalesce(sum(pg_relation_size(relid)), 0),
+                        coalesce(sum(pg_indexes_size(relid)), 0),
+                        coalesce(sum(pg_total_relation_size(relid)), 0)
+                    FROM pg_partition_tree(%s::regclass)
+                    WHERE isleaf
+                    """,
+                    (f"public.{partition}",),
+                )
+                heap_bytes, index_bytes, total_bytes = cur.fetchone()
+
+        return {
+            "rows": rows,
+            "heap_bytes": heap_bytes,
+            "index_bytes": index_bytes,
+            "toast_bytes": total_bytes - heap_bytes - index_bytes,
+        }
+
+    def along_track_storage_report(self, month: datetime) -> dict[str, dict[str, int]]:
+        """
+        Compare the storage of one month in the legacy along_track table, kept by
+        migrate_along_track, with the current layout.
+        """
+        tables = [self.legacy_along_track_table, self.along_track_physical_table]
+        report = {table: self.along_track_storage(table, month) for table in tables}
+
+        for table, storage in report.items():
+            rows = max(storage["rows"], 1)
+            print(
+                f"{table}: {storage['rows']} rows | "
+                f"heap {storage['heap_bytes'] / 2**20:.1f} MiB "
+                f"({storage['heap_bytes'] / rows:.1f} bytes/row) | "
+                f"indices {storage['index_bytes'] / 2**20:.1f} MiB "
+                f"({storage['index_bytes'] / rows:.1f} bytes/row)"
+            )
+
+        legacy, current = report.values()
+        for kind in ("heap_bytes", "index_bytes"):
+            if legacy[kind]:
+                print(
+                    f"{kind.removesuffix('_bytes')}: "
+                    f"{1 - current[kind] / legacy[kind]:.1%} smaller"
+                )
+        return report
+
+    def execute_query(self, table, query):
+        """
+        Execute a DDL statement in its own transaction
+        """
+        with self.borrow_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(query)
 
     def parametrize_sql_statements(self, table):
         """
@@ -339,6 +1021,9 @@ class OceanDBInit(OceanDB):
         print("VALIDDATING SCHEMA")
         for table_name, expected_indices in EXPECTED_TABLE_INDEXES.items():
             schema_name = "public"  # change if you use another schema
+            if table_name == "along_track":
+                # along_track is a view on the compact table in the compact layout
+                table_name = self.along_track_physical_table
 
             with engine.connect() as conn:
                 rows = conn.execute(
@@ -0,0 +1,184 @@
+"""
+Query latency of the monthly and the mission sub-partitioned along_track layouts.
+
+Run after ``oceandb migrate-along-track`` without
+``--drop-legacy``, so both ``along_track_monthly`` and ``along_track`` exist,
+see ``oceandb benchmark-along-track-layouts``.
+"""
+
+from datetime import datetime, timedelta
+
+import numpy as np
+from psycopg import sql
+
+from OceanDB.data_access.along_track import AlongTrack
+from OceanDB.data_access.schema.along_track_schema import along_track_schema
+
+
+class AlongTrackLayoutBenchmark(AlongTrack):
+    """
+    Runs the spatiotemporal window query against several along_track tables with
+    ``EXPLAIN ANALYZE`` and reports latency and the number of partitions scanned
+    """
+
+    benchmark_fields = ["latitude", "longitude", "sla_filtered", "date_time"]
+
+    def random_query_points(
+        self,
+        n_points: int,
+        start_date: datetime,
+        end_date: datetime,
+        seed: int = 0,
+    ) -> list[dict]:
+        """
+        Random ocean points between 60S and 60N within [start_date, end_date),
+        with their connected basins
+        """
+        rng = np.random.default_rng(seed)
+        latitudes = rng.uniform(-60, 60, 4 * n_points)
+        longitudes = rng.uniform(0, 360, 4 * n_points)
+        span = (end_date - start_date).total_seconds()
+        offsets = rng.uniform(0, span, 4 * n_points)
+
+        basin_ids = self.basin_mask(latitudes, longitudes)
+        points = []
+        for latitude, longitude, offset, basin_id in zip(
+            latitudes, longitudes, offsets, basin_ids
+        ):
+            if basin_id not in self.basin_connections:
+                continue  # land
+            points.append(
+                {
+                    "latitude": float(latitude),
+                    "longitude": float(longitude),
+                    "central_date_time": start_date + timedelta(seconds=offset),
+                    "connected_basin_ids": self.basin_connections[basin_id].tolist(),
+                }
+            )
+            if len(points) == n_points:
+                break
+        return points
+
+    # Mission filter of the spatiotemporal window query
+    mission_id_filter = "mission_id = ANY(%(mission_ids)s::smallint[])"
+
+    def has_mission_id(self, table: str) -> bool:
+        """
+        Whether ``table`` keys missions by ``mission_id``, legacy tables may store
+        the mission as text
+        """
+        with self.borrow_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    """
+                    SELECT 1 FROM information_schema.columns
+                    WHERE table_name = %(table)s AND column_name = 'mission_id'
+                    """,
+                    {"table": table},
+                )
+                return cur.fetchone() is not None
+
+    def layout_query(self, table: str, mission_id: bool = True) -> sql.Composed:
+        """
+        The spatiotemporal window query, reading from ``table`` instead of along_track
+        and, unless ``mission_id``, filtering on the text ``mission`` column
+        """
+        query_string = self.load_sql_file(self.along_track_spatiotemporal_query)
+        query_string = query_string.replace("FROM along_track", "FROM {table}")
+        if not mission_id:
+            query_string = query_string.replace(
+                self.mission_id_filter, "mission = ANY(%(missions)s)"
+            )
+        return sql.SQL("EXPLAIN (ANALYZE, FORMAT JSON) " + query_string).format(
+            table=sql.Identifier(table),
+            fields=sql.SQL(", ").join(
+                [
+                    along_track_schema[field].to_sql_query()
+                    for field in self.benchmark_fields
+                ]
+            ),
+        )
+
+    @staticmethod
+    def scanned_relations(plan: dict) -> set[str]:
+        """
+        Tables (partitions) that a plan node and its children actually executed on
+        """
+        relations = set()
+        if "Relation Name" in plan and plan.get("Actual Loops", 0) > 0:
+            relations.add(plan["Relation Name"])
+        for child in plan.get("Plans", []):
+            relations |= AlongTrackLayoutBenchmark.scanned_relations(child)
+        return relations
+
+    def run(
+        self,
+        tables: list[str],
+        missions: list[AlongTrack.Mission],
+        n_points: int = 200,
+        start_date: datetime = datetime(2013, 1, 1),
+        end_date: datetime = datetime(2020, 1, 1),
+        radius: float = 500_000.0,
+        time_window: timedelta = timedelta(days=10),
+        seed: int = 0,
+    ) -> dict[str, dict[str, float]]:
+        """
+        Query the same random points against each table, interleaving tables point
+        by point so both see the same cache state.  A first pass over the points
+        warms the cache and is not timed.
+
+        Returns, per table, the median and 95th percentile latency in milliseconds
+        (planning + execution), the mean number of partitions scanned and the mean
+        number of rows returned.
+        """
+        points = self.random_query_points(n_points, start_date, end_date, seed)
+        mission_ids = self.mission_ids(missions)
+        queries = {
+            table: self.layout_query(table, self.has_mission_id(table))
+            for table in tables
+        }
+        latencies = {table: [] for table in tables}
+        partitions = {table: [] for table in tables}
+        rows = {table: [] for table in tables}
+
+        with self.borrow_connection() as conn:
+            with conn.cursor() as cur:
+                for timed in (False, True):
+                    for point in points:
+                        params = {
+                            **point,
+                            "distance": radius,
+                            "time_delta": time_window,
+                            "missions": missions,
+                            "mission_ids": mission_ids,
+                        }
+                        for table, query in queries.items():
+                            cur.execute(query, params)
+                            explain = cur.fetchone()[0][0]
+                            if not timed:
+                                continue
+                            latencies[table].append(
+                                explain["Planning Time"] + explain["Execution Time"]
+                            )
+                            partitions[table].append(
+                                len(self.scanned_relations(explain["Plan"]))
+                            )
+                            rows[table].append(explain["Plan"]["Actual Rows"])
+
+        results = {
+            table: {
+                "median_ms": float(np.median(latencies[table])),
+                "p95_ms": float(np.percentile(latencies[table], 95)),
+                "partitions_scanned": float(np.mean(partitions[table])),
+                "rows": float(np.mean(rows[table])),
+            }
+            for table in tables
+        }
+        for table, result in results.items():
+            print(
+                f"{table}: median {result['median_ms']:.2f} ms | "
+                f"p95 {result['p95_ms']:.2f} ms | "
+                f"{result['partitions_scanned']:.1f} partitions scanned | "
+                f"{result['rows']:.1f} rows"
+            )
+        return results
@@ -0,0 +1,123 @@
+"""
+Latency of the nearest neighbor query as its time window grows, see
+``oceandb benchmark-nearest-neighbor``.
+
+The previous query computed ``ST_Distance`` for every row in the time window and
+sorted them all, so its latency grows with the window.  The KNN query orders by
+``along_track_point <-> point`` and stops after ``k`` rows of the GiST index scan.
+"""
+
+from datetime import datetime, timedelta
+
+import numpy as np
+from psycopg import sql
+
+from OceanDB.benchmarks.along_track_layout import AlongTrackLayoutBenchmark
+from OceanDB.data_access.along_track import AlongTrack
+from OceanDB.data_access.schema.along_track_schema import along_track_schema
+
+
+class NearestNeighborBenchmark(AlongTrackLayoutBenchmark):
+    """
+    Runs the sorted-distance and the KNN nearest neighbor queries with
+    ``EXPLAIN ANALYZE`` over increasing time windows
+    """
+
+    benchmark_fields = [
+        "latitude",
+        "longitude",
+        "sla_filtered",
+        "date_time",
+        "distance",
+    ]
+
+    # The nearest neighbor query before the KNN operator: every row of the window
+    # is measured, then sorted
+    sorted_distance_query = """
+SELECT
+{fields}
+FROM along_track
+WHERE date_time BETWEEN %(central_date_time)s - %(time_delta)s::interval
+                    AND %(central_date_time)s + %(time_delta)s::interval
+  AND basin_id = ANY(%(connected_basin_ids)s)
+  AND mission_id = ANY(%(mission_ids)s::smallint[])
+ORDER BY distance
+LIMIT %(k)s;
+"""
+
+    def explain_query(self, query_string: str) -> sql.Composed:
+        """
+        ``query_string`` with the benchmark fields, under ``EXPLAIN ANALYZE``
+        """
+        return sql.SQL("EXPLAIN (ANALYZE, FORMAT JSON) " + query_string).format(
+            fields=sql.SQL(", ").join(
+                [
+                    along_track_schema[field].to_sql_query()
+                    for field in self.benchmark_fields
+                ]
+            )
+        )
+
+    def run(
+        self,
+        missions: list[AlongTrack.Mission],
+        n_points: int = 200,
+        start_date: datetime = datetime(2013, 1, 1),
+        end_date: datetime = datetime(2020, 1, 1),
+        time_windows: tuple[timedelta, ...] = tuple(
+            timedelta(days=days) for days in (1, 3, 10, 30)
+        ),
+        k: int = 3,
+        seed: int = 0,
+    ) -> dict[timedelta, dict[str, dict[str, float]]]:
+        """
+        Query the same random points with both queries for each time window,
+        interleaving the queries point by point so both see the same cache state.
+        A first pass over the points warms the cache and is not timed.
+
+        Returns, per time window and query, the median and 95th percentile latency
+        in milliseconds (planning + execution).
+        """
+        points = self.random_query_points(n_points, start_date, end_date, seed)
+        mission_ids = self.mission_ids(missions)
+        queries = {
+            "sorted_distance": self.explain_query(self.sorted_distance_query),
+            "knn": self.explain_query(self.load_sql_file(self.nearest_neighbor_query)),
+        }
+
+        results = {}
+        with self.borrow_connection() as conn:
+            with conn.cursor() as cur:
+                for time_window in time_windows:
+                    latencies = {name: [] for name in queries}
+                    for timed in (False, True):
+                        for point in points:
+                            params = {
+                                **point,
+                                "time_delta": str(time_window / 2),
+                                "mission_ids": mission_ids,
+                                "k": k,
+                            }
+                            for name, query in queries.items():
+                                cur.execute(query, params)
+                                explain = cur.fetchone()[0][0]
+                                if timed:
+                                    latencies[name].append(
+                                        explain["Planning Time"]
+                                        + explain["Execution Time"]
+                                    )
+
+                    results[time_window] = {
+                        name: {
+                            "median_ms": float(np.median(latencies[name])),
+                            "p95_ms": float(np.percentile(latencies[name], 95)),
+                        }
+                        for name in queries
+                    }
+                    for name, result in results[time_window].items():
+                        print(
+                            f"{time_window} {name}: "
+                            f"median {result['median_ms']:.2f} ms | "
+                            f"p95 {result['p95_ms']:.2f} ms"
+                        )
+        return results
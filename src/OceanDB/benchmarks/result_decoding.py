@@ -0,0 +1,125 @@
+"""
+Client-side cost of turning query result rows into dataset columns, see
+``oceandb benchmark-result-decoding``.
+
+No database is needed: rows are generated as psycopg returns them, tuples of
+Python values, so only the client side is measured.  Timestamps start from their
+binary wire format, so each decoder also pays for its timestamp loader.
+"""
+
+import time
+
+import numpy as np
+import psycopg as pg
+
+from OceanDB.data_access.base_query import BaseQuery, TimestampMicrosecondsLoader
+from OceanDB.data_access.schema.along_track_schema import along_track_schema
+from OceanDB.ocean_data.dataset import Dataset
+from OceanDB.utils.binary_copy import PG_EPOCH
+
+
+class ResultDecodingBenchmark(BaseQuery):
+    """
+    Compares the dict row decoder with the columnar tuple decoder of
+    :meth:`BaseQuery.build_dataset`
+    """
+
+    benchmark_fields = [
+        "latitude",
+        "longitude",
+        "date_time",
+        "mission",
+        "track",
+        "cycle",
+        "sla_filtered",
+        "dac",
+    ]
+
+    def synthetic_rows(self, n_rows: int, seed: int = 0) -> list[tuple]:
+        """
+        ``n_rows`` result rows of ``benchmark_fields`` as Python values, with
+        ``date_time`` as binary wire values
+        """
+        rng = np.random.default_rng(seed)
+        date_times = np.datetime64("2019-01-01", "us") + np.arange(n_rows).astype(
+            "timedelta64[s]"
+        )
+        wire_date_times = (date_times - PG_EPOCH).astype(">i8").tobytes()
+        columns = [
+            rng.uniform(-60, 60, n_rows).tolist(),
+            rng.uniform(0, 360, n_rows).tolist(),
+            [wire_date_times[i : i + 8] for i in range(0, 8 * n_rows, 8)],
+            ["j3"] * n_rows,
+            rng.integers(0, 254, n_rows).tolist(),
+            rng.integers(0, 1000, n_rows).tolist(),
+            # sla_filtered and dac, smallint millimeters
+            rng.integers(-2000, 2000, n_rows).tolist(),
+            rng.integers(-200, 200, n_rows).tolist(),
+        ]
+        return list(zip(*columns))
+
+    def load_timestamps(self, rows: list[tuple], loader) -> list[tuple]:
+        """
+        Rows with the wire timestamps loaded the way a cursor would
+        """
+        index = self.benchmark_fields.index("date_time")
+        return [
+            row[:index] + (loader.load(row[index]),) + row[index + 1 :] for row in rows
+        ]
+
+    def dict_row_dataset(self, rows: list[tuple]) -> Dataset:
+        """
+        The previous decoder: a dict per row, then a list per column passed to
+        ``np.asarray``, with timestamps as an object array of ``datetime``
+        """
+        timestamp_oid = pg.adapters.types["timestamp"].oid
+        loader = pg.adapters.get_loader(timestamp_oid, pg.pq.Format.BINARY)
+        rows = self.load_timestamps(rows, loader(timestamp_oid))
+        dict_rows = [dict(zip(self.benchmark_fields, row)) for row in rows]
+        data = {}
+        dtypes = {}
+        for name in self.benchmark_fields:
+            field = along_track_schema[name]
+            values = [row[field.postgres_column_or_query_name] for row in dict_rows]
+            data[name] = np.asarray(values, dtype=field.python_type)
+            dtypes[name] = field.python_type
+        return Dataset(
+            name="along_track_spatiotemporal",
+            data=data,
+            dtypes=dtypes,
+            schema=along_track_schema,
+        )
+
+    def columnar_dataset(self, rows: list[tuple]) -> Dataset:
+        """
+        The columnar decoder fed by :meth:`BaseQuery.columnar_cursor`
+        """
+        timestamp_oid = pg.adapters.types["timestamp"].oid
+        rows = self.load_timestamps(rows, TimestampMicrosecondsLoader(timestamp_oid))
+        return self.build_dataset(
+            schema=along_track_schema, rows=rows, columns=self.benchmark_fields
+        )
+
+    def run(self, n_rows: int = 1_000_000, repeats: int = 3) -> dict[str, float]:
+        """
+        Best of ``repeats`` decode times in seconds of both decoders
+        """
+        rows = self.synthetic_rows(n_rows)
+        results = {}
+        for name, decode in [
+            ("dict_rows", self.dict_row_dataset),
+            ("columnar", self.columnar_dataset),
+        ]:
+            durations = []
+            for _ in range(repeats):
+                start = time.perf_counter()
+                decode(rows)
+                durations.append(time.perf_counter() - start)
+            results[name] = min(durations)
+            print(
+                f"{name}: {results[name]:.3f} seconds, "
+                f"{n_rows / results[name]:,.0f} rows/sec"
+            )
+
+        print(f"speedup: {results['dict_rows'] / results['columnar']:.2f}x")
+        return results
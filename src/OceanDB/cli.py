@@ -1,11 +1,19 @@
-from datetime import datetime
+from datetime import datetime, timedelta
 import click
+import numpy as np
 from pathlib import Path
-from multiprocessing import Pool, cpu_count
+from multiprocessing import cpu_count
 import time
 
 from OceanDB.OceanDB_Initializer import OceanDBInit
+from OceanDB.benchmarks.along_track_layout import AlongTrackLayoutBenchmark
+from OceanDB.benchmarks.nearest_neighbor import NearestNeighborBenchmark
+from OceanDB.benchmarks.result_decoding import ResultDecodingBenchmark
 from OceanDB.config import Config
+from OceanDB.data_access.along_track import AlongTrack
+from OceanDB.data_access.metadata import ALONG_TRACK_VARIABLES
+from OceanDB.data_access.schema.along_track_schema import along_track_schema
+from OceanDB.ocean_data.netcdf import write_datasets_to_netcdf
 from OceanDB.utils.logging import get_logger
 from OceanDB.etl import BaseETL, EddyETL, AlongTrackETL, OceanDBCopernicusMarine
 
@@ -31,11 +39,12 @@ def init():
 
     ocean_db_init.create_indices()
     ocean_db_init.create_eddy_indices()
-    ocean_db_init.create_partitions("1990-01-01", "2025-11-01")
+    # along_track partitions are created by ingest-along-track from the files it ingests
     # ocean_db_init.validate_schema()
     oceandb_etl = BaseETL()
     oceandb_etl.insert_basins_data()
     oceandb_etl.insert_basin_connections_data()
+    AlongTrackETL().insert_along_track_missions()
 
 
 @cli.command()
@@ -267,7 +276,87 @@ def get_netcdf4_files(
     type=click.DateTime(formats=["%Y-%m-%d"]),
     required=False,
 )
-def ingest_along_track(missions, start_date, end_date):
+@click.option(
+    "--write-method",
+    type=click.Choice(["copy", "insert"]),
+    default="copy",
+    show_default=True,
+    help="Write rows with a binary COPY or with row-by-row INSERT statements.",
+)
+@click.option(
+    "--parsers",
+    type=click.IntRange(min=1),
+    default=min(6, cpu_count()),
+    show_default=True,
+    help="Number of processes parsing NetCDF files.",
+)
+@click.option(
+    "--writers",
+    type=click.IntRange(min=1),
+    default=2,
+    show_default=True,
+    help="Number of database connections writing parsed files.",
+)
+@click.option(
+    "--queue-size",
+    type=click.IntRange(min=1),
+    default=12,
+    show_default=True,
+    help="Maximum number of parsed files waiting to be written.",
+)
+@click.option(
+    "--resume/--no-resume",
+    default=True,
+    show_default=True,
+    help="Skip files already recorded in along_track_metadata before parsing them.",
+)
+@click.option(
+    "--staging-batch",
+    type=click.IntRange(min=1),
+    default=None,
+    help=(
+        "Bulk load this many files per transaction through an UNLOGGED staging "
+        "table, dropping duplicate rows in one set-based merge. With mission "
+        "partitions files are always loaded this way, one per transaction by default."
+    ),
+)
+@click.option(
+    "--defer-indexes",
+    is_flag=True,
+    default=False,
+    help=(
+        "Initial archive load: drop the secondary along_track indexes, ingest, "
+        "then rebuild them partition by partition. Ignored if partitions other "
+        "than those created for the files hold rows."
+    ),
+)
+@click.option(
+    "--index-workers",
+    type=click.IntRange(min=1),
+    default=4,
+    show_default=True,
+    help="Parallel index builds when --defer-indexes is set.",
+)
+@click.option(
+    "--maintenance-work-mem",
+    default="1GB",
+    show_default=True,
+    help="maintenance_work_mem of each index build when --defer-indexes is set.",
+)
+def ingest_along_track(
+    missions,
+    start_date,
+    end_date,
+    write_method,
+    parsers,
+    writers,
+    queue_size,
+    resume,
+    staging_batch,
+    defer_indexes,
+    index_workers,
+    maintenance_work_mem,
+):
     """
     Ingest along-track altimetry data for one or more missions.
 
@@ -291,6 +380,42 @@ def ingest_along_track(missions, start_date, end_date):
         ``YYYY-MM-DD``. If only one of ``start_date`` or ``end_date`` is provided,
         the command will raise an error.
 
+    write_method : str, optional
+        ``copy`` (default) streams each file with a binary COPY, ``insert`` uses
+        row-by-row INSERT statements. Both report rows/sec per file.
+
+    parsers, writers, queue_size : int, optional
+        Files are parsed by ``parsers`` processes and written by ``writers``
+        database connections. At most ``queue_size`` parsed files wait between the
+        two stages; parsers block when the queue is full.
+
+    resume : bool, optional
+        Each file's rows and its ``along_track_metadata`` entry are committed in a
+        single transaction, so the metadata table records exactly the files that
+        were ingested. With ``--resume`` (default) an interrupted ingest is picked
+        up by looking up only the candidate file names in that table. With
+        ``--no-resume`` every file is parsed and already ingested files are skipped
+        at write time.
+
+    staging_batch : int, optional
+        Bulk-load mode. Each writer COPYs ``staging_batch`` files into its own
+        UNLOGGED staging table and merges them into ``along_track`` with a single
+        ``INSERT ... SELECT ... ON CONFLICT DO NOTHING``. Rows duplicated by
+        overlapping products (e.g. ``j3`` and ``j3n``) are dropped and counted.
+        With ``along_track_mission_partitions`` the unique key includes
+        ``mission_id``, so files are always loaded this way, one file per
+        transaction by default, and the merge drops rows shared by two missions.
+
+    defer_indexes : bool, optional
+        Intended for the initial archive load. The secondary ``along_track``
+        indexes are dropped before ingesting so rows are loaded without index
+        maintenance, then rebuilt per partition by ``index_workers`` parallel
+        builds, each with ``maintenance_work_mem``. The primary key and unique
+        constraint are kept. Postgres drops an index from every partition at once,
+        so the indexes are only dropped if no partition other than those created
+        for the files holds rows; an incremental load keeps them. If the ingest is
+        interrupted, rebuild the indexes with ``oceandb rebuild-along-track-indexes``.
+
     Behavior
     --------
     - If no dates are provided → ingest **all** available files.
@@ -311,6 +436,14 @@ def ingest_along_track(missions, start_date, end_date):
         oceandb ingest-along-track j3 al s3a \\
             --start-date 2023-01-01 \\
             --end-date 2023-03-31
+
+    Use 24 parser processes and 8 writer connections::
+
+        oceandb ingest-along-track --parsers 24 --writers 8
+
+    Re-ingest overlapping products, merging 32 files at a time::
+
+        oceandb ingest-along-track j3 j3n --staging-batch 32
     """
 
     missions = list(missions)
@@ -323,21 +456,282 @@ def ingest_along_track(missions, start_date, end_date):
     ):
         return
 
-    # Query the ingested metadata so that we can skip processing files that have already been processed
     oceandb_etl = AlongTrackETL()
-    metadata_filenames = oceandb_etl.query_metadata()
-
     start_ingest_time = time.perf_counter()
 
-    along_track_files = [
-        file for file in nc_files if file.name not in metadata_filenames
-    ]
-
-    process_count = 6
-    with Pool(process_count) as multiprocessing_pool:
-        multiprocessing_pool.map(
-            oceandb_etl.process_along_track_file, along_track_files
+    along_track_files = nc_files
+    if resume:
+        # Query the ingested metadata so that we can skip processing files that have already been processed
+        metadata_filenames = oceandb_etl.query_metadata(
+            file_names=[file.name for file in nc_files]
+        )
+        along_track_files = [
+            file for file in nc_files if file.name not in metadata_filenames
+        ]
+        click.echo(
+            f"Resuming: {len(nc_files) - len(along_track_files)} files already ingested"
         )
 
+    new_partitions = oceandb_etl.create_partitions_for_files(along_track_files)
+
+    if defer_indexes:
+        ocean_db_init = OceanDBInit()
+        if ocean_db_init.can_defer_along_track_indices(new_partitions):
+            ocean_db_init.drop_along_track_indices()
+        else:
+            click.echo(
+                "along_track already holds rows outside the new partitions, loading "
+                "with its indexes"
+            )
+            defer_indexes = False
+
+    oceandb_etl.ingest_along_track_files(
+        along_track_files,
+        parser_count=parsers,
+        writer_count=writers,
+        queue_size=queue_size,
+        write_method=write_method,
+        staging_batch_size=staging_batch,
+    )
+
     full_ingest_duration = time.perf_counter() - start_ingest_time
     print(f"Full Ingest Time {full_ingest_duration:.2f} seconds")
+
+    if defer_indexes:
+        index_duration = ocean_db_init.rebuild_along_track_indices(
+            workers=index_workers, maintenance_work_mem=maintenance_work_mem
+        )
+        print(
+            f"Loading: {full_ingest_duration:.2f} seconds | "
+            f"Indexing: {index_duration:.2f} seconds"
+        )
+
+
+@cli.command()
+@click.option("--workers", type=click.IntRange(min=1), default=4, show_default=True)
+@click.option("--maintenance-work-mem", default="1GB", show_default=True)
+def rebuild_along_track_indexes(workers, maintenance_work_mem):
+    """
+    Build missing secondary along_track indexes partition by partition.
+
+    Partitions that already have an index are skipped, so this also completes an
+    interrupted ``ingest-along-track --defer-indexes`` run.
+    """
+    OceanDBInit().rebuild_along_track_indices(
+        workers=workers, maintenance_work_mem=maintenance_work_mem
+    )
+
+
+@cli.command()
+@click.option("--workers", type=click.IntRange(min=1), default=4, show_default=True)
+@click.option("--maintenance-work-mem", default="1GB", show_default=True)
+@click.option(
+    "--drop-legacy",
+    is_flag=True,
+    default=False,
+    help="Drop the previous table once the migration is complete.",
+)
+def migrate_along_track(workers, maintenance_work_mem, drop_legacy):
+    """
+    Rebuild along_track in the current layout.
+
+    - file_name & mission are stored as keys of the along_track_file &
+      along_track_mission tables, which are filled from along_track_metadata.
+    - With ALONG_TRACK_MISSION_PARTITIONS=true in the .env file, each monthly
+      partition is sub-partitioned by mission, so queries that filter on
+      ``mission`` only scan the partitions of the requested missions.  Postgres
+      requires unique constraints to include the partition keys, so duplicate rows
+      of two missions are dropped by the staging merge of the ingest instead.
+
+    The existing table is renamed to ``along_track_monthly`` and copied month by
+    month, so the migration can be rerun if interrupted.  Without
+    ``--drop-legacy`` the old table is kept for
+    ``oceandb benchmark-along-track-layouts``.
+    """
+    if not click.confirm(
+        "along_track is unavailable while the migration runs. Continue?"
+    ):
+        return
+
+    OceanDBInit().migrate_along_track(
+        workers=workers,
+        maintenance_work_mem=maintenance_work_mem,
+        drop_legacy=drop_legacy,
+    )
+
+
+@cli.command()
+@click.argument("missions", nargs=-1)
+@click.option("--points", type=click.IntRange(min=1), default=200, show_default=True)
+@click.option(
+    "--start-date",
+    type=click.DateTime(formats=["%Y-%m-%d"]),
+    default="2013-01-01",
+    show_default=True,
+)
+@click.option(
+    "--end-date",
+    type=click.DateTime(formats=["%Y-%m-%d"]),
+    default="2020-01-01",
+    show_default=True,
+)
+@click.option("--seed", type=int, default=0, show_default=True)
+def benchmark_along_track_layouts(missions, points, start_date, end_date, seed):
+    """
+    Compare spatiotemporal query latency on ``along_track_monthly`` (monthly
+    partitions) and ``along_track`` (monthly partitions sub-partitioned by
+    mission) for the given missions, e.g.::
+
+        oceandb benchmark-along-track-layouts j3 s3a
+    """
+    AlongTrackLayoutBenchmark().run(
+        tables=[OceanDBInit.legacy_along_track_table, "along_track"],
+        missions=list(missions) or ["j3"],
+        n_points=points,
+        start_date=start_date,
+        end_date=end_date,
+        seed=seed,
+    )
+
+
+@cli.command()
+@click.argument("missions", nargs=-1)
+@click.option("--points", type=click.IntRange(min=1), default=200, show_default=True)
+@click.option(
+    "--start-date",
+    type=click.DateTime(formats=["%Y-%m-%d"]),
+    default="2013-01-01",
+    show_default=True,
+)
+@click.option(
+    "--end-date",
+    type=click.DateTime(formats=["%Y-%m-%d"]),
+    default="2020-01-01",
+    show_default=True,
+)
+@click.option(
+    "--window-days",
+    type=click.FloatRange(min=0, min_open=True),
+    multiple=True,
+    default=[1, 3, 10, 30],
+    show_default=True,
+    help="Time window to query, repeat for several.",
+)
+@click.option("-k", type=click.IntRange(min=1), default=3, show_default=True)
+@click.option("--seed", type=int, default=0, show_default=True)
+def benchmark_nearest_neighbor(
+    missions, points, start_date, end_date, window_days, k, seed
+):
+    """
+    Compare the latency of the KNN nearest neighbor query with the previous sorted
+    distance query as the time window grows, e.g.::
+
+        oceandb benchmark-nearest-neighbor j3 --window-days 1 --window-days 30
+    """
+    NearestNeighborBenchmark().run(
+        missions=list(missions) or ["j3"],
+        n_points=points,
+        start_date=start_date,
+        end_date=end_date,
+        time_windows=tuple(timedelta(days=days) for days in window_days),
+        k=k,
+        seed=seed,
+    )
+
+
+@cli.command()
+@click.option(
+    "--month",
+    type=click.DateTime(formats=["%Y-%m"]),
+    required=True,
+    help="Month to compare, e.g. 2019-01.",
+)
+def along_track_storage_report(month):
+    """
+    Compare the heap and index size of one month before and after
+    ``oceandb migrate-along-track``, e.g. to measure the compact layout
+    (ALONG_TRACK_COMPACT_ROWS=true)::
+
+        oceandb along-track-storage-report --month 2019-01
+    """
+    OceanDBInit().along_track_storage_report(month)
+
+
+@cli.command()
+@click.option(
+    "--rows", type=click.IntRange(min=1), default=1_000_000, show_default=True
+)
+@click.option("--repeats", type=click.IntRange(min=1), default=3, show_default=True)
+def benchmark_result_decoding(rows, repeats):
+    """
+    Compare decoding query result rows into dataset columns through dict rows with
+    the columnar tuple decoder.  Runs without a database::
+
+        oceandb benchmark-result-decoding --rows 1000000
+    """
+    ResultDecodingBenchmark().run(n_rows=rows, repeats=repeats)
+
+
+@cli.command()
+@click.argument("missions", nargs=-1)
+@click.option("--start-date", type=click.DateTime(formats=["%Y-%m-%d"]), required=True)
+@click.option("--end-date", type=click.DateTime(formats=["%Y-%m-%d"]), required=True)
+@click.option(
+    "--field",
+    "fields",
+    multiple=True,
+    default=["date_time", "latitude", "longitude", "mission", "sla_filtered"],
+    show_default=True,
+    help="along_track field to export, repeat for several.",
+)
+@click.option(
+    "--output",
+    type=click.Path(dir_okay=False, path_type=Path),
+    required=True,
+    help="NumPy .npz file the columns are written to, or a .nc file to stream them "
+    "into a compressed NetCDF file.",
+)
+def export_along_track(missions, start_date, end_date, fields, output):
+    """
+    Export along_track rows with start-date <= date_time < end-date through a binary
+    COPY and save the columns to an .npz or NetCDF file, e.g.::
+
+        oceandb export-along-track j3 s3a --start-date 2019-01-01 --end-date 2019-02-01 --output 2019_01.npz
+        oceandb export-along-track j3 --start-date 2019-01-01 --end-date 2020-01-01 --output j3_2019.nc
+
+    Packed fields, e.g. sla_filtered, are saved as the stored integers, in an .npz
+    file with their <field>_scale_factor, <field>_add_offset and <field>_fill_value.
+    """
+    along_track = AlongTrack()
+    missions = list(missions) or along_track.all_missions
+    if output.suffix == ".nc":
+        # written chunk by chunk, the export is never held in memory
+        rows = write_datasets_to_netcdf(
+            output,
+            along_track.export_chunks(list(fields), start_date, end_date, missions),
+            schema=along_track_schema,
+            metadata=ALONG_TRACK_VARIABLES,
+        )
+        click.echo(f"Saved {rows} rows of {', '.join(fields)} to {output}")
+        return
+
+    dataset = along_track.export(
+        list(fields), start_date=start_date, end_date=end_date, missions=missions
+    )
+    if dataset is None:
+        click.echo("No rows matched.")
+        return
+
+    # packed fields are saved as stored, with the CF packing to unpack them
+    columns = dataset.columns(scaled=False)
+    for field in dataset:
+        ocean_field = dataset.schema.get(field)
+        if ocean_field is None or ocean_field.packed_dtype is None:
+            continue
+        columns[f"{field}_scale_factor"] = np.float64(ocean_field.scale_factor)
+        columns[f"{field}_add_offset"] = np.float64(ocean_field.add_offset)
+        columns[f"{field}_fill_value"] = ocean_field.packed_dtype.type(
+            ocean_field.packed_fill_value
+        )
+    np.savez(output, **columns)
+    click.echo(f"Saved {', '.join(dataset)} to {output}")
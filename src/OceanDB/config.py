@@ -10,11 +10,34 @@ class Config(BaseSettings):
     postgres_password: str
     postgres_database: str = Field(default="ocean")
 
+    # Connection pool shared by every OceanDB object in a process, see
+    # OceanDB.connection_pool. Lifetimes and timeouts are in seconds.
+    postgres_pool_min_size: int = Field(default=1)
+    postgres_pool_max_size: int = Field(default=10)
+    postgres_pool_max_lifetime: float = Field(default=3600.0)
+    postgres_pool_max_idle: float = Field(default=600.0)
+    postgres_pool_timeout: float = Field(default=30.0)
+    # Check that a pooled connection is alive before handing it out
+    postgres_pool_check: bool = Field(default=True)
+    # Run queries as server-side prepared statements, kept per pooled connection.
+    # Disable behind a transaction-pooling proxy such as PgBouncer.
+    postgres_prepared_statements: bool = Field(default=True)
+
+    # Files derived from the packaged data, e.g. the memory-mapped basin mask
+    oceandb_cache_directory: str = Field(default="~/.cache/oceandb")
+
     along_track_data_directory: str
     eddy_data_directory: str
     copernicus_password: str
     copernicus_username: str
 
+    # Sub-partition each monthly along_track partition by mission, see
+    # `oceandb migrate-along-track`
+    along_track_mission_partitions: bool = Field(default=False)
+    # Store along_track coordinates as integer micro-degrees without an identity or
+    # geography column, read through the along_track view
+    along_track_compact_rows: bool = Field(default=False)
+
     model_config = SettingsConfigDict(
         env_prefix="",  # no prefix (POSTGRES_HOST, etc.)
         env_file=".env",  # default fallback
@@ -2,3 +2,7 @@
 # from OceanDB.data_access.eddy import Eddy
 from OceanDB.data_access.along_track import AlongTrack
 
+from OceanDB.data_access.async_along_track import AsyncAlongTrack
+from OceanDB.data_access.result_cache import ResultCache
+
+__all__ = ["AlongTrack", "AsyncAlongTrack", "ResultCache"]
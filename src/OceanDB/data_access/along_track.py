@@ -4,14 +4,19 @@ Projection-Aware Dataset Architecture
 """
 
 from datetime import datetime, timedelta
-from typing import Iterable, List, Literal, get_args
+import time
+from typing import Any, Iterable, Iterator, List, Literal, get_args
 import psycopg as pg
 import numpy.typing as npt
 import numpy as np
 
 from OceanDB.data_access.base_query import BaseQuery
+from OceanDB.data_access.result_cache import ResultCache
 from OceanDB.data_access.schema.along_track_schema import along_track_fields, along_track_schema
 from OceanDB.ocean_data.dataset import Dataset
+from OceanDB.ocean_data.ocean_data import PLACEHOLDER_PATTERN
+from OceanDB.ocean_data.ragged_dataset import RaggedDataset
+from OceanDB.utils.binary_copy import PG_BINARY_DTYPES, BinaryCopyDecoder
 
 class AlongTrack(BaseQuery):
     """
@@ -64,13 +69,120 @@ class AlongTrack(BaseQuery):
         "queries/along_track/geographic_points_in_spatialtemporal_window.sql"
     )
 
+    nearest_neighbor_batch_query = (
+        "queries/along_track/geographic_nearest_neighbor_batch.sql"
+    )
+    along_track_spatiotemporal_batch_query = (
+        "queries/along_track/geographic_points_in_spatialtemporal_window_batch.sql"
+    )
+
+    # Per-point parameters of the field calculations and the columns of the
+    # query_point relation that replace them in batched queries
+    batch_point_columns = {
+        "latitude": "query_point.latitude",
+        "longitude": "query_point.longitude",
+        "central_date_time": "query_point.central_date_time",
+    }
+
+    export_query = "queries/along_track/export_along_track.sql"
+
+    # Text fields are exported as the key of their dimension table, so every COPY row
+    # has the same width, and mapped back to text once the copy is done
+    export_dimensions = {
+        "mission": ("mission_id", "smallint", "along_track_mission"),
+        "file_name": ("file_id", "integer", "along_track_file"),
+    }
+    # Bytes of COPY data decoded at once by export_chunks
+    export_block_size = 16 * 1024 * 1024
+
     projected_spatio_temporal_query_mask = "queries/along_track/geographic_points_in_spatialtemporal_projected_window_nomask.sql"
     projected_spatio_temporal_query_no_mask = (
         "queries/along_track/geographic_points_in_spatialtemporal_window.sql"
     )
 
-    def __init__(self):
+    # Keys of the along_track_mission dimension, read once per process, see
+    # mission_ids
+    mission_ids_query = "SELECT mission, mission_id FROM along_track_mission"
+    _mission_ids: dict[str, int] | None = None
+
+    # Generation marker of the ingested files, read at most once per
+    # result_cache_generation_ttl seconds by each process, see result_cache_generation
+    ingest_generation_query = "SELECT generation FROM along_track_generation"
+    result_cache_generation_ttl = 5.0
+    _ingest_generation: tuple[float, str] | None = None
+
+    def __init__(self, result_cache: ResultCache | None = None):
+        """
+        :param result_cache:
+            cache of batched query results, shared by the services given the same
+            cache.  Results are not cached by default.
+        """
         super().__init__()
+        self.result_cache = result_cache
+
+    def result_cache_generation(self) -> str:
+        """
+        Marker of the files recorded in along_track_metadata, part of every cached
+        query's key.  It is the counter of along_track_generation, which a trigger
+        bumps when a transaction changing along_track_metadata commits.
+
+        The counter is read at most once per ``result_cache_generation_ttl`` seconds
+        by each process, so a cache hit rarely costs a query, and a new ingest is
+        seen at most that long after it commits.
+        """
+        now = time.monotonic()
+        cached = AlongTrack._ingest_generation
+        if cached is not None and now - cached[0] < self.result_cache_generation_ttl:
+            return cached[1]
+
+        try:
+            with self.borrow_connection() as conn:
+                with conn.cursor() as cur:
+                    cur.execute(self.ingest_generation_query)
+                    (generation,) = cur.fetchone()
+        except pg.errors.UndefinedTable as ex:
+            raise RuntimeError(
+                "along_track_generation is missing, run `oceandb init` to create it "
+                "before caching query results"
+            ) from ex
+        AlongTrack._ingest_generation = (now, f"g{generation}")
+        return AlongTrack._ingest_generation[1]
+
+    def mission_ids(self, missions: Iterable[str]) -> list[int]:
+        """
+        Keys of ``missions`` in along_track_mission, missions never ingested are left
+        out.
+
+        Queries bind these keys as ``mission_id = ANY(%(mission_ids)s)`` rather than
+        looking them up in a subquery, so the planner can prune the mission
+        partitions of along_track.  The dimension is read once per process, see
+        :meth:`clear_mission_ids`.
+        """
+        if AlongTrack._mission_ids is None:
+            with self.borrow_connection() as conn:
+                with conn.cursor() as cur:
+                    cur.execute(self.mission_ids_query)
+                    AlongTrack._mission_ids = dict(cur.fetchall())
+        return self.known_mission_ids(missions)
+
+    @classmethod
+    def known_mission_ids(cls, missions: Iterable[str]) -> list[int]:
+        """
+        Keys of ``missions`` among the mission keys already read
+        """
+        return [
+            AlongTrack._mission_ids[mission]
+            for mission in missions
+            if mission in AlongTrack._mission_ids
+        ]
+
+    @classmethod
+    def clear_mission_ids(cls) -> None:
+        """
+        Forget the mission keys, so a mission first ingested after they were read is
+        queried
+        """
+        AlongTrack._mission_ids = None
 
     def geographic_points_in_r_dt(
         self,
@@ -87,40 +199,128 @@ class AlongTrack(BaseQuery):
 
         Yields one AlongTrackDataset per query point, or None if empty.
         """
+        dataset = self.geographic_points_in_r_dt_batch(
+            latitudes=latitudes,
+            longitudes=longitudes,
+            dates=dates,
+            fields=fields,
+            radii=radii,
+            time_window=time_window,
+            missions=missions,
+        )
+        return self.split_by_point(dataset, len(latitudes))
 
-        # format what parameters we want out of the query
-        query_string = self.load_sql_file(self.along_track_spatiotemporal_query)
-        query = pg.sql.SQL(query_string).format(
-            fields=pg.sql.SQL(', ').join([
-                along_track_schema[field].to_sql_query() for field in fields
-        ]))
+    def geographic_points_in_r_dt_batch(
+        self,
+        latitudes: npt.NDArray,
+        longitudes: npt.NDArray,
+        dates: List[datetime],
+        fields: list[along_track_fields],
+        radii: List[float] | float = 500_000.0,
+        time_window: timedelta = timedelta(days=10),
+        missions: list[Mission] = all_missions,
+    ) -> Dataset[along_track_fields, npt.NDArray[np.floating]] | None:
+        """
+        Query along-track points within the spatial + temporal windows of all query
+        points in a single statement.
 
+        Returns one dataset with a ``point_index`` column giving the query point of
+        each row, or None if no query point matched anything.
+        """
+        query, params = self.spatiotemporal_batch_query(
+            latitudes, longitudes, dates, fields, radii, time_window, missions
+        )
+        return self.execute_batch_query(query, along_track_schema, params)
+
+    def geographic_points_in_r_dt_ragged(
+        self,
+        latitudes: npt.NDArray,
+        longitudes: npt.NDArray,
+        dates: List[datetime],
+        fields: list[along_track_fields],
+        radii: List[float] | float = 500_000.0,
+        time_window: timedelta = timedelta(days=10),
+        missions: list[Mission] = all_missions,
+    ) -> RaggedDataset[along_track_fields, npt.NDArray[np.floating]]:
+        """
+        Query along-track points within the spatial + temporal windows of all query
+        points in a single statement, grouped by query point without a dataset per
+        point.  ``result[i]`` is a view on the rows of point ``i``, or None.
+        """
+        dataset = self.geographic_points_in_r_dt_batch(
+            latitudes=latitudes,
+            longitudes=longitudes,
+            dates=dates,
+            fields=fields,
+            radii=radii,
+            time_window=time_window,
+            missions=missions,
+        )
+        return RaggedDataset.from_batch(
+            dataset,
+            len(latitudes),
+            self.query_point_columns(latitudes, longitudes, dates),
+        )
+
+    def geographic_points_in_r_dt_chunks(
+        self,
+        latitudes: npt.NDArray,
+        longitudes: npt.NDArray,
+        dates: List[datetime],
+        fields: list[along_track_fields],
+        radii: List[float] | float = 500_000.0,
+        time_window: timedelta = timedelta(days=10),
+        missions: list[Mission] = all_missions,
+        chunk_size: int | None = None,
+    ) -> Iterator[Dataset[along_track_fields, npt.NDArray[np.floating]]]:
+        """
+        Stream along-track points within the spatial + temporal windows of all query
+        points through a server-side cursor, for windows too large to hold in memory.
+
+        Yields datasets of at most ``chunk_size`` rows with a ``point_index`` column.
+        The rows of one query point may span chunks.
+        """
+        query, params = self.spatiotemporal_batch_query(
+            latitudes, longitudes, dates, fields, radii, time_window, missions
+        )
+        return self.stream_query(
+            query,
+            {"point_index": self.point_index_field, **along_track_schema},
+            params,
+            chunk_size=chunk_size,
+        )
+
+    def spatiotemporal_batch_query(
+        self,
+        latitudes: npt.NDArray,
+        longitudes: npt.NDArray,
+        dates: List[datetime],
+        fields: list[along_track_fields],
+        radii: List[float] | float,
+        time_window: timedelta,
+        missions: list[Mission],
+    ) -> tuple[pg.sql.SQL, dict[str, Any]]:
+        """
+        Batched spatiotemporal window query and its parameters
+        """
+        query = self.compose_query(
+            self.along_track_spatiotemporal_batch_query,
+            along_track_schema,
+            fields,
+            self.batch_point_columns,
+        )
 
         # input niceties---allow users to specify one radius to be used for all query points
         if not isinstance(radii, list):
             radii = [float(radii)] * len(latitudes)
 
-        # connected basins
-        basin_ids = self.basin_mask(latitudes, longitudes)
-        connected_basin_ids = list(map(self.basin_connection_map.get, basin_ids))
-
-        # format params
-        params = [
-            {
-                "longitude": lon,
-                "latitude": lat,
-                "distance": r,
-                "central_date_time": dt,
-                "time_delta": time_window,
-                "connected_basin_ids": basins,
-                "missions": missions,
-            }
-            for lat, lon, dt, basins, r in zip(
-                latitudes, longitudes, dates, connected_basin_ids, radii
-            )
-        ]
-        # execute the query
-        return self.execute_query(query, along_track_schema, params)
+        params = {
+            **self.batch_point_params(latitudes, longitudes, dates),
+            "distances": [float(r) for r in radii],
+            "time_delta": time_window,
+            "mission_ids": self.mission_ids(missions),
+        }
+        return query, params
 
     def geographic_nearest_neighbors_dt(
         self,
@@ -130,31 +330,295 @@ class AlongTrack(BaseQuery):
         fields: list[along_track_fields],
         time_window=timedelta(seconds=856710),
         missions: list[Mission] = all_missions,
+        k: int = 3,
     ) -> Iterable[Dataset[along_track_fields, npt.NDArray[np.floating]] | None]:
         """
-        Given an array of spatiotemporal points, returns the THREE closest data points to each
+        Given an array of spatiotemporal points, returns the ``k`` closest data points
+        to each, nearest first
         """
+        dataset = self.geographic_nearest_neighbors_dt_batch(
+            latitudes=latitudes,
+            longitudes=longitudes,
+            dates=dates,
+            fields=fields,
+            time_window=time_window,
+            missions=missions,
+            k=k,
+        )
+        return self.split_by_point(dataset, len(latitudes))
 
-        query_string = self.load_sql_file(self.nearest_neighbor_query)
-        query = pg.sql.SQL(query_string).format(
-            fields=pg.sql.SQL(', ').join([
-                along_track_schema[field].to_sql_query() for field in fields
-        ]))
+    def geographic_nearest_neighbors_dt_batch(
+        self,
+        latitudes: npt.NDArray[np.floating],
+        longitudes: npt.NDArray[np.floating],
+        dates: List[datetime],
+        fields: list[along_track_fields],
+        time_window=timedelta(seconds=856710),
+        missions: list[Mission] = all_missions,
+        k: int = 3,
+    ) -> Dataset[along_track_fields, npt.NDArray[np.floating]] | None:
+        """
+        Returns the ``k`` closest data points to every query point in a single
+        statement.  Points are ordered with the KNN distance operator ``<->`` on
+        along_track_point, so the GiST index is walked nearest first instead of
+        computing the distance of every row in the time window.
+
+        Returns one dataset with a ``point_index`` column giving the query point of
+        each row, or None if no query point matched anything.
+        """
+        query = self.compose_query(
+            self.nearest_neighbor_batch_query,
+            along_track_schema,
+            fields,
+            self.batch_point_columns,
+        )
 
+        params = {
+            **self.batch_point_params(latitudes, longitudes, dates),
+            "time_delta": str(time_window / 2),
+            "mission_ids": self.mission_ids(missions),
+            "k": k,
+        }
+        return self.execute_batch_query(query, along_track_schema, params)
+
+    def geographic_nearest_neighbors_dt_ragged(
+        self,
+        latitudes: npt.NDArray[np.floating],
+        longitudes: npt.NDArray[np.floating],
+        dates: List[datetime],
+        fields: list[along_track_fields],
+        time_window=timedelta(seconds=856710),
+        missions: list[Mission] = all_missions,
+        k: int = 3,
+    ) -> RaggedDataset[along_track_fields, npt.NDArray[np.floating]]:
+        """
+        Returns the ``k`` closest data points to every query point in a single
+        statement, grouped by query point without a dataset per point
+        """
+        dataset = self.geographic_nearest_neighbors_dt_batch(
+            latitudes=latitudes,
+            longitudes=longitudes,
+            dates=dates,
+            fields=fields,
+            time_window=time_window,
+            missions=missions,
+            k=k,
+        )
+        return RaggedDataset.from_batch(
+            dataset,
+            len(latitudes),
+            self.query_point_columns(latitudes, longitudes, dates),
+        )
+
+    @staticmethod
+    def query_point_columns(
+        latitudes: npt.NDArray[np.floating],
+        longitudes: npt.NDArray[np.floating],
+        dates: List[datetime],
+    ) -> dict[str, npt.NDArray]:
+        """
+        The query points as the per-point columns of a RaggedDataset
+        """
+        return {
+            "query_latitude": np.asarray(latitudes, dtype=np.float64),
+            "query_longitude": np.asarray(longitudes, dtype=np.float64),
+            "query_date_time": np.array(dates, dtype="datetime64[us]"),
+        }
+
+    def batch_point_params(
+        self,
+        latitudes: npt.NDArray[np.floating],
+        longitudes: npt.NDArray[np.floating],
+        dates: List[datetime],
+    ) -> dict[str, list]:
+        """
+        Array parameters describing every query point of a batched query.
+
+        The connected basins of each point have different lengths, so they are sent
+        as one row per point of a 2-D array padded with -1, which is never a basin id.
+        """
         basin_ids = self.basin_mask(latitudes, longitudes)
-        connected_basin_ids = list(map(self.basin_connection_map.get, basin_ids))
-        params = [
-            {
-                "latitude": latitude,
-                "longitude": longitude,
-                "central_date_time": date,
-                "connected_basin_ids": connected_basin_ids,
-                "time_delta": str(time_window / 2),
-                "missions": missions,
-            }
-            for latitude, longitude, date, connected_basin_ids in zip(
-                latitudes, longitudes, dates, connected_basin_ids
+
+        return {
+            "latitudes": np.asarray(latitudes, dtype=np.float64).tolist(),
+            "longitudes": np.asarray(longitudes, dtype=np.float64).tolist(),
+            "central_date_times": list(dates),
+            "connected_basin_ids": self.basin_connections.padded(basin_ids).tolist(),
+        }
+
+    def export(
+        self,
+        fields: list[along_track_fields],
+        start_date: datetime,
+        end_date: datetime,
+        missions: list[Mission] = all_missions,
+    ) -> Dataset[along_track_fields, npt.NDArray] | None:
+        """
+        Export every along-track row of ``missions`` with
+        ``start_date <= date_time < end_date`` through a binary COPY, for bulk
+        extraction of whole months and missions.
+
+        Returns one dataset with the concatenated columns, or None if no row matched.
+        The throughput is logged in rows/sec.
+        """
+        start = time.perf_counter()
+        chunks = list(self.export_chunks(fields, start_date, end_date, missions))
+        duration = time.perf_counter() - start
+
+        n_rows = sum(len(next(iter(chunk.values()), [])) for chunk in chunks)
+        self.logger.info(
+            f"Exported {n_rows} rows in {duration:.2f} seconds "
+            f"({n_rows / max(duration, 1e-9):,.0f} rows/sec)"
+        )
+        if n_rows == 0:
+            return None
+
+        return Dataset[along_track_fields, npt.NDArray](
+            name="along_track_export",
+            data={
+                field: np.concatenate([chunk[field] for chunk in chunks])
+                for field in fields
+            },
+            dtypes={field: along_track_schema[field].python_type for field in fields},
+            schema=along_track_schema,
+        )
+
+    def export_chunks(
+        self,
+        fields: list[along_track_fields],
+        start_date: datetime,
+        end_date: datetime,
+        missions: list[Mission] = all_missions,
+    ) -> Iterator[dict[along_track_fields, npt.NDArray]]:
+        """
+        Stream the rows of :meth:`export` as column arrays, decoding the COPY data
+        every ``export_block_size`` bytes so memory is bounded by one block.
+
+        Packed fields are exported as stored, with NULL as their fill value, other
+        integer fields with NULL as the largest value of their type, see
+        :meth:`export_fill_value`, float fields as ``double precision`` with NULL as
+        NaN and timestamps with NULL as ``-infinity``, which decodes to NaT.  Fields
+        computed relative to a query point, e.g. ``distance``, cannot be exported.
+        """
+        columns = []
+        for field in fields:
+            expression, postgres_type = self.export_field_sql(field)
+            columns.append((expression, field, postgres_type))
+
+        query = pg.sql.SQL(self.load_sql_file(self.export_query)).format(
+            fields=pg.sql.SQL(", ").join(
+                pg.sql.SQL("{expression} AS {name}").format(
+                    expression=expression, name=pg.sql.Identifier(field)
+                )
+                for expression, field, _ in columns
             )
-        ]
+        )
+        params = {
+            "start_date": start_date,
+            "end_date": end_date,
+            "mission_ids": self.mission_ids(missions),
+        }
+
+        dimension_values = {
+            field: self.export_dimension_values(field)
+            for field in fields
+            if field in self.export_dimensions
+        }
+        decoder = BinaryCopyDecoder(
+            [(field, postgres_type) for _, field, postgres_type in columns]
+        )
+
+        def decoded_chunk() -> dict[along_track_fields, npt.NDArray]:
+            chunk = decoder.take()
+            for field, values in dimension_values.items():
+                chunk[field] = values[chunk[field]]
+            return chunk
+
+        with self.borrow_connection() as conn:
+            with conn.cursor() as cur:
+                with cur.copy(query, params) as copy:
+                    for block in copy:
+                        decoder.feed(block)
+                        if len(decoder.buffer) >= self.export_block_size:
+                            yield decoded_chunk()
+        yield decoded_chunk()
+        decoder.finish()
+
+    def export_field_sql(
+        self, field: along_track_fields
+    ) -> tuple[pg.sql.Composable, str]:
+        """
+        Expression exporting ``field`` as a fixed-width, never NULL COPY column and
+        the postgres type of that column
+        """
+        ocean_field = along_track_schema[field]
+        if field in self.export_dimensions:
+            key, key_type, _ = self.export_dimensions[field]
+            return pg.sql.Identifier(key), key_type
+
+        calculation = ocean_field.custom_calculation
+        if calculation and PLACEHOLDER_PATTERN.search(calculation):
+            raise ValueError(f"{field} depends on a query point and cannot be exported")
+        expression = (
+            pg.sql.SQL(calculation)
+            if calculation
+            else pg.sql.Identifier(ocean_field.postgres_column_or_query_name)
+        )
+
+        if ocean_field.packed_dtype is not None:
+            return (
+                pg.sql.SQL("COALESCE({}, {})").format(
+                    expression, pg.sql.Literal(ocean_field.packed_fill_value)
+                ),
+                ocean_field.postgres_type,
+            )
+        dtype = ocean_field.numpy_dtype
+        if dtype.kind == "f":
+            return (
+                pg.sql.SQL("COALESCE(({})::double precision, 'NaN')").format(
+                    expression
+                ),
+                "double precision",
+            )
+        if dtype.kind == "M":
+            return (
+                pg.sql.SQL("COALESCE(({})::timestamp, '-infinity')").format(expression),
+                "timestamp",
+            )
+        if dtype.kind in "iu":
+            return (
+                pg.sql.SQL("COALESCE({}, {})").format(
+                    expression,
+                    pg.sql.Literal(self.export_fill_value(ocean_field.postgres_type)),
+                ),
+                ocean_field.postgres_type,
+            )
+        raise ValueError(f"{field} cannot be exported through a binary COPY")
+
+    @staticmethod
+    def export_fill_value(postgres_type: str) -> int:
+        """
+        Value exported for a NULL integer of ``postgres_type``, the largest of the type
+        """
+        return int(np.iinfo(np.dtype(PG_BINARY_DTYPES[postgres_type])).max)
+
+    def export_dimension_values(self, field: along_track_fields) -> npt.NDArray:
+        """
+        Values of a dimension field indexed by their key, e.g. mission names by
+        ``mission_id``
+        """
+        key, _, table = self.export_dimensions[field]
+        query = pg.sql.SQL("SELECT {key}, {field} FROM {table}").format(
+            key=pg.sql.Identifier(key),
+            field=pg.sql.Identifier(field),
+            table=pg.sql.Identifier(table),
+        )
+        with self.borrow_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(query)
+                rows = cur.fetchall()
 
-        return self.execute_query(query, along_track_schema, params)
+        values = np.full(max((row[0] for row in rows), default=0) + 1, "", dtype=object)
+        for row_key, value in rows:
+            values[row_key] = value
+        return values.astype(along_track_schema[field].numpy_dtype)
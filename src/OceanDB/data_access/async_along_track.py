@@ -0,0 +1,313 @@
+"""
+asyncio query service for along-track altimetry data
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+from typing import Any, AsyncIterator, Iterable, List, Optional
+
+import numpy as np
+import numpy.typing as npt
+import psycopg as pg
+from psycopg.rows import tuple_row
+from psycopg_pool import AsyncConnectionPool
+
+from OceanDB.data_access.along_track import AlongTrack
+from OceanDB.data_access.schema.along_track_schema import (
+    along_track_fields,
+    along_track_schema,
+)
+from OceanDB.ocean_data.dataset import Dataset
+from OceanDB.ocean_data.ocean_data import OceanDataField
+
+
+async def reset_async_pooled_connection(connection: pg.AsyncConnection) -> None:
+    """
+    Undo per-use connection settings before a connection goes back to the pool
+    """
+    await connection.set_autocommit(False)
+    connection.row_factory = tuple_row
+
+
+class AsyncAlongTrack(AlongTrack):
+    """
+    Query service for along-track altimetry data that does not block the event loop.
+
+    Adds ``async_`` variants of the queries of :class:`AlongTrack`, which run the
+    query of each point concurrently on an ``AsyncConnectionPool``.  Results are
+    yielded as ``(point_index, dataset)`` pairs in completion order, ``dataset``
+    being None if the point matched nothing.  The inherited queries are unchanged
+    and block, the basin lookups and SQL files the async queries need on first use
+    are loaded in a worker thread.
+
+    The pool is opened on first use and bound to the running event loop, close it
+    with :meth:`close` or use the service as an async context manager::
+
+        async with AsyncAlongTrack(max_concurrency=8) as along_track:
+            async for point_index, dataset in (
+                along_track.async_geographic_points_in_r_dt(...)
+            ):
+                ...
+    """
+
+    def __init__(self, max_concurrency: Optional[int] = None):
+        """
+        :param max_concurrency:
+            number of point queries in flight at once, and size of the connection
+            pool. Defaults to ``postgres_pool_max_size``.
+        """
+        super().__init__()
+        self.max_concurrency = max_concurrency or self.config.postgres_pool_max_size
+        self._async_pool: Optional[AsyncConnectionPool] = None
+        self._async_pool_lock = asyncio.Lock()
+
+    async def __aenter__(self) -> "AsyncAlongTrack":
+        await self.async_connection_pool()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def async_connection_pool(self) -> AsyncConnectionPool:
+        """
+        The connection pool of this service, opened with the ``postgres_pool_*``
+        settings on first use
+        """
+        async with self._async_pool_lock:
+            if self._async_pool is None:
+                pool = AsyncConnectionPool(
+                    self.connection_string,
+                    min_size=min(
+                        self.config.postgres_pool_min_size, self.max_concurrency
+                    ),
+                    max_size=self.max_concurrency,
+                    max_lifetime=self.config.postgres_pool_max_lifetime,
+                    max_idle=self.config.postgres_pool_max_idle,
+                    timeout=self.config.postgres_pool_timeout,
+                    check=(
+                        AsyncConnectionPool.check_connection
+                        if self.config.postgres_pool_check
+                        else None
+                    ),
+                    reset=reset_async_pooled_connection,
+                    name="oceandb-async",
+                    open=False,
+                )
+                await pool.open()
+                self._async_pool = pool
+        return self._async_pool
+
+    async def close(self) -> None:
+        """
+        Close the connection pool of this service
+        """
+        async with self._async_pool_lock:
+            if self._async_pool is not None:
+                await self._async_pool.close()
+                self._async_pool = None
+
+    async def async_pool_stats(self) -> dict[str, int]:
+        """
+        Current size and usage counters of the async connection pool
+        """
+        return (await self.async_connection_pool()).get_stats()
+
+    async def execute_point_query(
+        self,
+        query: pg.sql.Composable,
+        schema: dict[str, OceanDataField],
+        params: dict[str, Any],
+    ) -> Dataset | None:
+        """
+        Run the query of one point on a pooled connection
+        """
+        pool = await self.async_connection_pool()
+        async with pool.connection() as conn:
+            async with self.columnar_cursor(conn) as cur:
+                await cur.execute(query, params, prepare=self.prepare_queries)
+                rows = await cur.fetchall()
+                columns = self.column_names(cur)
+
+        if not rows:
+            return None
+        return self.build_dataset(schema=schema, rows=rows, columns=columns)
+
+    async def execute_queries_concurrently(
+        self,
+        query: pg.sql.Composable,
+        schema: dict[str, OceanDataField],
+        params: Iterable[dict[str, Any]],
+    ) -> AsyncIterator[tuple[int, Dataset | None]]:
+        """
+        Run the query once per parameter set, at most ``max_concurrency`` at a time.
+
+        ``max_concurrency`` workers take the next parameter set as they finish a
+        query, so however many points there are only that many tasks exist.  Yields
+        ``(point_index, dataset)`` as each query completes.  Queries that have not
+        completed are cancelled, and awaited, if the caller stops iterating or a
+        query fails.
+        """
+        points = enumerate(params)
+        # bounded, so workers wait for a slow consumer instead of piling up results
+        results: asyncio.Queue = asyncio.Queue(maxsize=self.max_concurrency)
+        finished = object()
+
+        async def worker():
+            try:
+                for point_index, point_params in points:
+                    dataset = await self.execute_point_query(
+                        query, schema, point_params
+                    )
+                    await results.put((point_index, dataset))
+            except Exception as exc:
+                await results.put(exc)
+            else:
+                await results.put(finished)
+
+        workers = [
+            asyncio.create_task(worker()) for _ in range(self.max_concurrency)
+        ]
+        try:
+            running = len(workers)
+            while running:
+                result = await results.get()
+                if result is finished:
+                    running -= 1
+                elif isinstance(result, Exception):
+                    raise result
+                else:
+                    yield result
+        finally:
+            for task in workers:
+                task.cancel()
+            # wait for cancelled workers to return their pooled connections
+            await asyncio.gather(*workers, return_exceptions=True)
+
+    async def async_mission_ids(self, missions: list[str]) -> list[int]:
+        """
+        Keys of ``missions`` in along_track_mission, see :meth:`AlongTrack.mission_ids`,
+        read on the async pool
+        """
+        if AlongTrack._mission_ids is None:
+            pool = await self.async_connection_pool()
+            async with pool.connection() as conn:
+                async with conn.cursor() as cur:
+                    await cur.execute(self.mission_ids_query)
+                    AlongTrack._mission_ids = dict(await cur.fetchall())
+        return self.known_mission_ids(missions)
+
+    def connected_basin_ids(
+        self, latitudes: npt.NDArray, longitudes: npt.NDArray
+    ) -> list:
+        """
+        Basins connected to the basin of each point
+        """
+        basin_ids = self.basin_mask(latitudes, longitudes)
+        return self.basin_connections.lists(basin_ids)
+
+    async def async_connected_basin_ids(
+        self, latitudes: npt.NDArray, longitudes: npt.NDArray
+    ) -> list:
+        """
+        :meth:`connected_basin_ids` in a worker thread, which maps the basin mask and
+        reads the basin connections on first use
+        """
+        return await asyncio.to_thread(self.connected_basin_ids, latitudes, longitudes)
+
+    async def async_geographic_points_in_r_dt(
+        self,
+        latitudes: npt.NDArray,
+        longitudes: npt.NDArray,
+        dates: List[datetime],
+        fields: list[along_track_fields],
+        radii: List[float] | float = 500_000.0,
+        time_window: timedelta = timedelta(days=10),
+        missions: list[AlongTrack.Mission] = AlongTrack.all_missions,
+    ) -> AsyncIterator[
+        tuple[int, Dataset[along_track_fields, npt.NDArray[np.floating]] | None]
+    ]:
+        """
+        Query along-track points within spatial + temporal windows.
+
+        Yields ``(point_index, dataset)`` per query point in completion order,
+        ``dataset`` being None if empty.
+        """
+        query = await asyncio.to_thread(
+            self.compose_query,
+            self.along_track_spatiotemporal_query,
+            along_track_schema,
+            fields,
+        )
+
+        # input niceties---allow users to specify one radius to be used for all query points
+        if not isinstance(radii, list):
+            radii = [float(radii)] * len(latitudes)
+
+        connected_basin_ids = await self.async_connected_basin_ids(
+            latitudes, longitudes
+        )
+        mission_ids = await self.async_mission_ids(missions)
+        # built as the workers take them
+        params = (
+            {
+                "longitude": lon,
+                "latitude": lat,
+                "distance": r,
+                "central_date_time": dt,
+                "time_delta": time_window,
+                "connected_basin_ids": basins,
+                "mission_ids": mission_ids,
+            }
+            for lat, lon, dt, basins, r in zip(
+                latitudes, longitudes, dates, connected_basin_ids, radii
+            )
+        )
+
+        async for result in self.execute_queries_concurrently(
+            query, along_track_schema, params
+        ):
+            yield result
+
+    async def async_geographic_nearest_neighbors_dt(
+        self,
+        latitudes: npt.NDArray[np.floating],
+        longitudes: npt.NDArray[np.floating],
+        dates: List[datetime],
+        fields: list[along_track_fields],
+        time_window=timedelta(seconds=856710),
+        missions: list[AlongTrack.Mission] = AlongTrack.all_missions,
+        k: int = 3,
+    ) -> AsyncIterator[
+        tuple[int, Dataset[along_track_fields, npt.NDArray[np.floating]] | None]
+    ]:
+        """
+        Given an array of spatiotemporal points, yields ``(point_index, dataset)`` with
+        the ``k`` closest data points to each, in completion order
+        """
+        query = await asyncio.to_thread(
+            self.compose_query, self.nearest_neighbor_query, along_track_schema, fields
+        )
+
+        connected_basin_ids = await self.async_connected_basin_ids(
+            latitudes, longitudes
+        )
+        mission_ids = await self.async_mission_ids(missions)
+        params = (
+            {
+                "latitude": latitude,
+                "longitude": longitude,
+                "central_date_time": date,
+                "connected_basin_ids": basins,
+                "time_delta": str(time_window / 2),
+                "mission_ids": mission_ids,
+                "k": k,
+            }
+            for latitude, longitude, date, basins in zip(
+                latitudes, longitudes, dates, connected_basin_ids
+            )
+        )
+
+        async for result in self.execute_queries_concurrently(
+            query, along_track_schema, params
+        ):
+            yield result
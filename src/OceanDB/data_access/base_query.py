@@ -1,18 +1,41 @@
 from OceanDB.OceanDB import OceanDB
 from OceanDB.data_access.metadata import METADATA_REGISTRY
 from OceanDB.ocean_data.ocean_data import OceanDataField
+from OceanDB.ocean_data.fields import fields
+from operator import itemgetter
+import threading
+
 import numpy as np
 import psycopg as pg
+from psycopg.adapt import Loader
 
-from typing import Iterable, Any, Mapping, TypeVar
+from typing import Iterable, Iterator, Any, Mapping, TypeVar
 
+from OceanDB.data_access.result_cache import ResultCache
 from OceanDB.ocean_data.dataset import Dataset
+from OceanDB.ocean_data.ragged_dataset import RaggedDataset
+from OceanDB.utils.binary_copy import PG_EPOCH
 
-from typing import TypeVar
 
 K = TypeVar("K", bound=str)
 T = TypeVar("T")
 
+# int64 representation of NaT, which also stays NaT when offset by an epoch
+NAT = np.iinfo(np.int64).min
+
+
+class TimestampMicrosecondsLoader(Loader):
+    """
+    Loads binary timestamps as integer microseconds since 2000-01-01, so no
+    ``datetime`` object is created per value, see BaseQuery.decode_column
+    """
+
+    format = pg.pq.Format.BINARY
+
+    def load(self, data) -> int:
+        return int.from_bytes(data, "big", signed=True)
+
+
 class BaseQuery(OceanDB):
     """
     Base class for read-only query services.
@@ -23,14 +46,106 @@ class BaseQuery(OceanDB):
 
     METADATA = METADATA_REGISTRY
 
+    # Column that tags each row of a batched query with its query point
+    point_index_field = fields.point_index
+
+    # Rows per chunk of a streamed query, see stream_query
+    stream_chunk_size = 100_000
+
+    # Opt-in cache of execute_batch_query results
+    result_cache: ResultCache | None = None
+
+    # Queries composed by this process, keyed by SQL file, fields and point columns,
+    # see compose_query
+    _composed_queries: dict[tuple, pg.sql.SQL] = {}
+    _composed_query_stats = {"hits": 0, "misses": 0}
+    _composed_queries_lock = threading.Lock()
+
+    def compose_query(
+        self,
+        template: str,
+        schema: Mapping[K, OceanDataField],
+        fields: Iterable[K],
+        point_columns: Mapping[str, str] | None = None,
+    ) -> pg.sql.SQL:
+        """
+        The SQL file ``template`` with its ``{fields}`` select list filled in.
+
+        Composed once per process for each (template, fields, point columns) and
+        rendered to plain SQL, so repeated calls neither read the file nor quote
+        identifiers again, and send byte-identical queries that a pooled connection
+        can run as the same prepared statement.
+
+        :param point_columns:
+            SQL expressions to substitute for the query point placeholders of the
+            fields, see :meth:`OceanDataField.to_sql_query`
+        """
+        fields = tuple(fields)
+        key = (
+            template,
+            fields,
+            tuple(sorted(point_columns.items())) if point_columns else None,
+        )
+        with BaseQuery._composed_queries_lock:
+            query = BaseQuery._composed_queries.get(key)
+            if query is not None:
+                BaseQuery._composed_query_stats["hits"] += 1
+                return query
+            BaseQuery._composed_query_stats["misses"] += 1
+
+        composed = pg.sql.SQL(self.load_sql_file(template)).format(
+            fields=pg.sql.SQL(", ").join(
+                [schema[field].to_sql_query(point_columns) for field in fields]
+            )
+        )
+        query = pg.sql.SQL(composed.as_string(None))
+        with BaseQuery._composed_queries_lock:
+            return BaseQuery._composed_queries.setdefault(key, query)
+
+    @classmethod
+    def query_cache_stats(cls) -> dict[str, int]:
+        """
+        Hits and misses of the composed query cache, and the number of cached
+        queries and SQL files
+        """
+        with cls._composed_queries_lock:
+            return {
+                **BaseQuery._composed_query_stats,
+                "queries": len(BaseQuery._composed_queries),
+                "sql_files": len(OceanDB._sql_files),
+            }
+
+    @classmethod
+    def clear_query_cache(cls) -> None:
+        """
+        Forget the composed queries and SQL files, and reset the cache statistics
+        """
+        with cls._composed_queries_lock:
+            BaseQuery._composed_queries.clear()
+            BaseQuery._composed_query_stats.update(hits=0, misses=0)
+            OceanDB._sql_files.clear()
+
+    @property
+    def prepare_queries(self) -> bool:
+        """
+        Whether queries run as server-side prepared statements, which psycopg keeps
+        per connection and reuses for later executions of the same query
+        """
+        return self.config.postgres_prepared_statements
+
     def build_dataset(
         self,
-            *,
-            schema: Mapping[K, OceanDataField],
-            rows: list[dict[str, T]]
+        *,
+        schema: Mapping[K, OceanDataField],
+        rows: list[dict[str, T]] | list[tuple],
+        columns: list[str] | None = None,
     ) -> Dataset[K, T]:
         """
         Given a schema and a nonempty list of rows, return a dataset.
+
+        Rows are dicts, or tuples whose column names are given by ``columns`` (see
+        :meth:`column_names`), which saves building a dict per row.  Each field is
+        decoded straight into an array of its ``storage_dtype``.
         """
         data = {}
         dtypes = {}
@@ -38,36 +153,188 @@ class BaseQuery(OceanDB):
         if len(rows) == 0:
             raise ValueError("rows must be nonempty")
 
+        if columns is None:
+            keys = {name: name for name in rows[0]}
+        else:
+            keys = {name: index for index, name in enumerate(columns)}
+
         for name, field in schema.items():
-            fname = field.postgres_column_or_query_name
-            if not fname in rows[0]:
+            key = keys.get(field.postgres_column_or_query_name)
+            if key is None:
                 continue
-            values = [row[fname] for row in rows]
-            data[name] = np.asarray(values, dtype=field.python_type)
+            data[name] = self.decode_column(field, rows, key)
             dtypes[name] = field.python_type
 
         return Dataset[K, T](
             name="along_track_spatiotemporal", data=data, dtypes=dtypes, schema=schema
         )
 
+    @staticmethod
+    def decode_column(field: OceanDataField, rows: list, key: str | int) -> np.ndarray:
+        """
+        Decode one column of ``rows`` into a preallocated array of the field's dtype.
+
+        This still converts the column value by value, from the Python objects psycopg
+        loads for each row, only without a dict per row or a list per column.  Whole
+        buffers are decoded at once only by the binary COPY of
+        :meth:`AlongTrack.export`.
+
+        Timestamps are either ``datetime`` objects or integer microseconds since
+        2000-01-01 from a :meth:`columnar_cursor`.  Packed fields keep the integers
+        stored in the database, see :meth:`Dataset.column`.  NULLs decode to NaN in
+        float columns, NaT in timestamp columns and the fill value in packed columns.
+        """
+        dtype = field.storage_dtype
+        values = map(itemgetter(key), rows)
+        if field.packed_dtype is not None:
+            fill_value = field.packed_fill_value
+            return np.fromiter(
+                (fill_value if value is None else value for value in values),
+                dtype=dtype,
+                count=len(rows),
+            )
+
+        if dtype.kind == "U":
+            # the width of a string array is only known once all values are seen
+            return np.array(list(values), dtype=dtype)
+
+        if dtype.kind == "M":
+            first = next((value for value in values if value is not None), None)
+            values = map(itemgetter(key), rows)
+            if isinstance(first, int):
+                microseconds = np.fromiter(
+                    (NAT if value is None else value for value in values),
+                    dtype=np.int64,
+                    count=len(rows),
+                )
+                return PG_EPOCH + microseconds.astype("timedelta64[us]")
+
+        return np.fromiter(values, dtype=dtype, count=len(rows))
+
+    @staticmethod
+    def columnar_cursor(connection: pg.Connection, name: str = "") -> pg.Cursor:
+        """
+        A cursor fetching results in binary format with timestamps loaded as integer
+        microseconds, the fastest input for :meth:`build_dataset`.  Works on sync and
+        async connections, ``name`` makes it a server-side cursor.
+        """
+        cursor = connection.cursor(name, binary=True)
+        cursor.adapters.register_loader("timestamp", TimestampMicrosecondsLoader)
+        return cursor
+
+    @staticmethod
+    def column_names(cursor: pg.Cursor) -> list[str]:
+        """
+        Names of the result columns of the last query run by ``cursor``
+        """
+        return [column.name for column in cursor.description]
+
     def execute_query(
         self,
         query: str,
         schema: dict[K, OceanDataField],
         params: list[dict[str, Any]],
     ) -> Iterable[Dataset[K, T] | None]:
-        with pg.connect(self.config.postgres_dsn) as conn:
-            with conn.cursor(row_factory=pg.rows.dict_row) as cur:
+        with self.borrow_connection() as conn:
+            with self.columnar_cursor(conn) as cur:
                 cur.executemany(query, params, returning=True)
 
                 while True:
-                    rows : list[dict[str, T]]= cur.fetchall()
+                    rows: list[tuple] = cur.fetchall()
 
                     if not rows:
                         yield None
                     else:
-                        dataset = self.build_dataset(schema=schema, rows=rows)
+                        dataset = self.build_dataset(
+                            schema=schema, rows=rows, columns=self.column_names(cur)
+                        )
                         yield dataset
 
                     if not cur.nextset():
                         break
+
+    def execute_batch_query(
+        self,
+        query: str | pg.sql.SQL,
+        schema: Mapping[K, OceanDataField],
+        params: dict[str, Any],
+    ) -> Dataset[K, T] | None:
+        """
+        Run a set-based multi-point query in a single statement.
+
+        The query receives every query point at once as array parameters and tags
+        each returned row with ``point_index``, the position of its query point.
+        Returns one dataset holding the rows of all points, or None if no point
+        matched anything.  With a :attr:`result_cache` the result of a query already
+        run on the same data generation is returned without a database round trip,
+        and the columns of returned datasets are read-only.
+        """
+        schema = {"point_index": self.point_index_field, **schema}
+        cache_key = None
+        if self.result_cache is not None:
+            query_string = query if isinstance(query, str) else query.as_string(None)
+            cache_key = self.result_cache.key(
+                query_string, params, self.result_cache_generation()
+            )
+            found, dataset = self.result_cache.lookup(cache_key, schema)
+            if found:
+                return dataset
+
+        with self.borrow_connection() as conn:
+            with self.columnar_cursor(conn) as cur:
+                cur.execute(query, params, prepare=self.prepare_queries)
+                rows: list[tuple] = cur.fetchall()
+                columns = self.column_names(cur)
+
+        dataset = None
+        if rows:
+            dataset = self.build_dataset(schema=schema, rows=rows, columns=columns)
+        if cache_key is not None:
+            self.result_cache.put(cache_key, dataset)
+        return dataset
+
+    def result_cache_generation(self) -> str:
+        """
+        Marker of the data read by the queries of this service, part of every
+        :attr:`result_cache` key so cached results go stale when it changes.
+        Services over data that changes override it.
+        """
+        return ""
+
+    def split_by_point(
+        self,
+        dataset: Dataset[K, T] | None,
+        n_points: int,
+    ) -> Iterator[Dataset[K, T] | None]:
+        """
+        Split the result of a batched query into one dataset per query point.
+
+        Yields, in query point order, a view on the rows of each point or None if
+        the point matched nothing, the same as :meth:`execute_query`.  See
+        :class:`RaggedDataset` to hold the points without a dataset each.
+        """
+        return iter(RaggedDataset.from_batch(dataset, n_points))
+
+    def stream_query(
+        self,
+        query: str,
+        schema: Mapping[K, OceanDataField],
+        params: dict[str, Any],
+        chunk_size: int | None = None,
+    ) -> Iterator[Dataset[K, T]]:
+        """
+        Run a query on a named server-side cursor and yield its rows as datasets of
+        at most ``chunk_size`` rows.
+
+        Only one chunk is held in client memory at a time, however many rows the
+        query returns.  The connection stays checked out of the pool until the
+        iterator is exhausted or closed.
+        """
+        chunk_size = chunk_size or self.stream_chunk_size
+        with self.borrow_connection() as conn:
+            with self.columnar_cursor(conn, name="oceandb_stream") as cur:
+                cur.itersize = chunk_size
+                cur.execute(query, params)
+                columns = self.column_names(cur)
+                while rows := cur.fetchmany(chunk_size):
+                    yield self.build_dataset(schema=schema, rows=rows, columns=columns)
@@ -1,5 +1,4 @@
 from typing import TypeVar, Any, Type
-import psycopg as pg
 from typing import Any, List, Dict, Optional
 
 from OceanDB.OceanDB import OceanDB
@@ -21,7 +20,7 @@ class Query(OceanDB):
                         dataset_cls: Type[D]
                       ) -> OceanData[D]:
         try:
-            with pg.connect(self.connection_string) as conn:
+            with self.borrow_connection() as conn:
                 with conn.cursor() as cur:
                     cur.execute(query)
                     rows = cur.fetchall()
@@ -61,7 +60,7 @@ radius = 500_000.0
 missions = ['al']
 
 basin_ids = query.basin_mask(latitudes, latitudes)
-connected_basin_ids = list(map(self.basin_connection_map.get, basin_ids))
+connected_basin_ids = self.basin_connections.lists(basin_ids)
 
 params = [
     {
@@ -0,0 +1,249 @@
+"""
+Opt-in cache of query results, see :class:`ResultCache`
+"""
+
+from collections import OrderedDict
+import hashlib
+import os
+from pathlib import Path
+import tempfile
+import threading
+from typing import Any, Mapping
+
+import numpy as np
+
+from OceanDB.ocean_data.dataset import Dataset
+from OceanDB.ocean_data.ocean_data import OceanDataField
+
+
+class ResultCache:
+    """
+    Least recently used cache of query result datasets.
+
+    Entries are kept in memory up to ``max_bytes`` of column data.  With a
+    ``directory`` every entry is also written there as an ``.npz`` file of its NumPy
+    columns, so it survives eviction from memory and the process; the directory is
+    trimmed to ``max_disk_bytes`` by last use.
+
+    Keys include a generation marker of the data, e.g. the ingested files, see
+    :meth:`AlongTrack.result_cache_generation`.  Entries of any other generation are
+    dropped as soon as a new generation is seen, so new ingests invalidate them.
+
+    Cached datasets are frozen: their column arrays are made read-only when they
+    are stored, as every hit returns the same arrays.  This includes the dataset a
+    query returns on the miss that caches it, copy a column before modifying it.
+
+    Share one cache between query services to share its entries::
+
+        cache = ResultCache(max_bytes=512 * 1024**2, directory="~/.cache/oceandb")
+        along_track = AlongTrack(result_cache=cache)
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = 256 * 1024**2,
+        directory: str | os.PathLike | None = None,
+        max_disk_bytes: int | None = None,
+    ):
+        self.max_bytes = max_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.directory = Path(directory).expanduser() if directory else None
+        if self.directory is not None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+
+        self._entries: OrderedDict[str, Dataset | None] = OrderedDict()
+        self._entry_bytes: dict[str, int] = {}
+        self._bytes = 0
+        self._generation: str | None = None
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0}
+
+    @staticmethod
+    def dataset_bytes(dataset: Dataset | None) -> int:
+        """
+        Bytes of column data held by ``dataset``
+        """
+        if dataset is None:
+            return 0
+        return dataset.nbytes
+
+    def key(self, query: str, params: Mapping[str, Any], generation: str) -> str:
+        """
+        Cache key of a query, its parameters and the generation of the data it reads.
+
+        Seeing a new generation drops the entries of the previous ones.
+        """
+        self.set_generation(generation)
+        digest = hashlib.sha256(
+            repr((query, sorted(params.items()))).encode()
+        ).hexdigest()
+        return f"{self.generation_prefix(generation)}_{digest}"
+
+    @staticmethod
+    def generation_prefix(generation: str) -> str:
+        return hashlib.sha256(generation.encode()).hexdigest()[:16]
+
+    def set_generation(self, generation: str) -> None:
+        """
+        Drop the entries of every generation but ``generation``
+        """
+        with self._lock:
+            if generation == self._generation:
+                return
+            self._generation = generation
+            self._entries.clear()
+            self._entry_bytes.clear()
+            self._bytes = 0
+
+        if self.directory is not None:
+            prefix = self.generation_prefix(generation)
+            for path in self.directory.glob("*.npz"):
+                if not path.name.startswith(prefix):
+                    path.unlink(missing_ok=True)
+
+    def lookup(
+        self, key: str, schema: Mapping[str, OceanDataField]
+    ) -> tuple[bool, Dataset | None]:
+        """
+        ``(True, dataset)`` if ``key`` is cached, ``dataset`` being None for an empty
+        result, otherwise ``(False, None)``.  ``schema`` describes the columns of an
+        entry read back from disk.
+        """
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self._stats["hits"] += 1
+                return True, self._entries[key]
+
+        found, dataset = self.read_entry(key, schema)
+        with self._lock:
+            self._stats["disk_hits" if found else "misses"] += 1
+        if found:
+            self.store_in_memory(key, dataset)
+        return found, dataset
+
+    def put(self, key: str, dataset: Dataset | None) -> None:
+        """
+        Cache the result ``dataset`` of ``key``, None for an empty result.  The
+        columns of ``dataset`` are made read-only, not copied.
+        """
+        self.store_in_memory(key, dataset)
+        if self.directory is not None:
+            self.write_entry(key, dataset)
+
+    def store_in_memory(self, key: str, dataset: Dataset | None) -> None:
+        """
+        Keep ``dataset`` in memory, evicting the least recently used entries to stay
+        within ``max_bytes``.  A dataset larger than ``max_bytes`` is not kept.
+
+        The columns are made read-only in place, as every hit returns the same
+        arrays.
+        """
+        columns = {} if dataset is None else dataset.columns(scaled=False)
+        for values in columns.values():
+            values.flags.writeable = False
+        size = self.dataset_bytes(dataset)
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            self._bytes -= self._entry_bytes.pop(key, 0)
+            self._entries[key] = dataset
+            self._entries.move_to_end(key)
+            self._entry_bytes[key] = size
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                evicted, _ = self._entries.popitem(last=False)
+                self._bytes -= self._entry_bytes.pop(evicted)
+                self._stats["evictions"] += 1
+
+    def entry_path(self, key: str) -> Path:
+        return self.directory / f"{key}.npz"
+
+    def read_entry(
+        self, key: str, schema: Mapping[str, OceanDataField]
+    ) -> tuple[bool, Dataset | None]:
+        """
+        The entry ``key`` stored on disk, as :meth:`lookup`
+        """
+        if self.directory is None:
+            return False, None
+        path = self.entry_path(key)
+        try:
+            with np.load(path, allow_pickle=False) as columns:
+                data = {name: columns[name] for name in columns.files}
+            os.utime(path)  # last use, for trim_directory
+        except (OSError, ValueError):
+            return False, None
+
+        if not data:
+            return True, None
+        return True, Dataset(
+            name="along_track_spatiotemporal",
+            data=data,
+            dtypes={name: schema[name].python_type for name in data},
+            schema=schema,
+        )
+
+    def write_entry(self, key: str, dataset: Dataset | None) -> None:
+        """
+        Store ``dataset`` on disk as an ``.npz`` file of its columns, written to a
+        temporary file first so readers never see a partial entry
+        """
+        columns = {} if dataset is None else dataset.columns(scaled=False)
+        descriptor, temporary_path = tempfile.mkstemp(
+            dir=self.directory, suffix=".tmp"
+        )
+        try:
+            with os.fdopen(descriptor, "wb") as f:
+                np.savez(f, **columns)
+            os.replace(temporary_path, self.entry_path(key))
+        except BaseException:
+            Path(temporary_path).unlink(missing_ok=True)
+            raise
+        self.trim_directory()
+
+    def trim_directory(self) -> None:
+        """
+        Delete the least recently used entries on disk beyond ``max_disk_bytes``
+        """
+        if self.max_disk_bytes is None:
+            return
+        entries = []
+        for path in self.directory.glob("*.npz"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_disk_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+
+    def clear(self) -> None:
+        """
+        Drop every entry, in memory and on disk
+        """
+        with self._lock:
+            self._entries.clear()
+            self._entry_bytes.clear()
+            self._bytes = 0
+        if self.directory is not None:
+            for path in self.directory.glob("*.npz"):
+                path.unlink(missing_ok=True)
+
+    def stats(self) -> dict[str, int]:
+        """
+        Hits in memory and on disk, misses, evictions from memory, and the entries
+        and bytes held in memory
+        """
+        with self._lock:
+            return {
+                **self._stats,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+            }
@@ -1,5 +1,9 @@
+from collections import Counter
 from dataclasses import dataclass
 from dataclasses import asdict
+import multiprocessing as mp
+import re
+import threading
 import netCDF4 as nc
 import pandas as pd
 import psycopg
@@ -7,12 +11,14 @@ import psycopg as pg
 from psycopg import sql
 import time
 import numpy as np
-from functools import cached_property
-from typing import Optional
-from datetime import datetime, timedelta
+from typing import Iterable, Literal, Optional
+from datetime import date, datetime
 from pathlib import Path
 
 from OceanDB.etl.base_etl import BaseETL
+from OceanDB.data_access.schema.along_track_schema import along_track_schema
+from OceanDB.utils.binary_copy import encode_binary_copy
+from OceanDB.utils.time_conversion import netcdf_time_to_datetime64
 
 
 @dataclass
@@ -21,7 +27,7 @@ class AlongTrackData:
 
     file_name: np.ndarray
     mission: np.ndarray
-    time: np.ndarray
+    time: np.ndarray  # datetime64[us]
     latitude: np.ndarray
     longitude: np.ndarray
     cycle: np.ndarray
@@ -35,6 +41,9 @@ class AlongTrackData:
     mdt: np.ndarray
     tpa_correction: np.ndarray
     basin_id: np.ndarray
+    # Dimension keys of file_name & mission, assigned when the file is written
+    file_id: Optional[int] = None
+    mission_id: Optional[int] = None
 
 
 @dataclass
@@ -118,7 +127,14 @@ class AlongTrackETL(BaseETL):
     ocean_basin_table_name: str = "basin"
     ocean_basins_connections_table_name: str = "basin_connection"
     along_track_table_name: str = "along_track"
+    # Table behind the along_track view in the compact layout, see
+    # Config.along_track_compact_rows
+    along_track_compact_table_name: str = "along_track_compact"
+    # The compact layout stores coordinates as integer micro-degrees
+    compact_coordinate_scale: int = 1_000_000
     along_track_metadata_table_name: str = "along_track_metadata"
+    along_track_file_table_name: str = "along_track_file"
+    along_track_mission_table_name: str = "along_track_mission"
 
     variable_add_offset: dict = dict()
     missions = [
@@ -149,8 +165,133 @@ class AlongTrackETL(BaseETL):
         "tpn",
     ]
 
+    # Column order used by the binary COPY writer
+    along_track_copy_columns = [
+        "file_id",
+        "mission_id",
+        "track",
+        "cycle",
+        "latitude",
+        "longitude",
+        "sla_unfiltered",
+        "sla_filtered",
+        "date_time",
+        "dac",
+        "ocean_tide",
+        "internal_tide",
+        "lwe",
+        "mdt",
+        "tpa_correction",
+        "basin_id",
+    ]
+    # along_track stores these keys in place of file_name & mission, which are
+    # decoded through along_track_schema
+    along_track_key_types = {"file_id": "integer", "mission_id": "smallint"}
+    copy_batch_size: int = 250_000
+    along_track_staging_table_query = (
+        "tables/along_track/create_along_track_staging_table.sql"
+    )
+
+    # e.g. dt_global_j3_phy_l3_1hz_20190102_20240205.nc -> 20190102
+    file_date_pattern = re.compile(r"_(\d{8})_\d{8}\.nc$")
+
     def __init__(self):
         super().__init__()
+        # Partitions this process has already created or seen
+        self.known_partitions: set[str] = set()
+        # along_track_mission keys, see along_track_mission_ids
+        self.mission_ids: dict[str, int] = {}
+        if self.config.along_track_compact_rows:
+            # Rows are written to the table, and read through the along_track view
+            self.along_track_table_name = self.along_track_compact_table_name
+
+    @property
+    def coordinate_postgres_type(self) -> str:
+        """
+        Column type of latitude & longitude in the configured layout
+        """
+        if self.config.along_track_compact_rows:
+            return "integer"
+        return along_track_schema["latitude"].postgres_type
+
+    def encode_coordinates(self, values: np.ndarray) -> np.ndarray:
+        """
+        Latitudes or longitudes as stored in the configured layout: degrees, or
+        integer micro-degrees in the compact layout
+        """
+        if not self.config.along_track_compact_rows:
+            return values
+        return np.rint(values * self.compact_coordinate_scale).astype(np.int32)
+
+    def file_date(self, file: Path) -> Optional[date]:
+        """
+        The observation date encoded in an along track file name, if any
+        """
+        match = self.file_date_pattern.search(file.name)
+        if match is None:
+            return None
+        return datetime.strptime(match.group(1), "%Y%m%d").date()
+
+    def along_track_partition_layout(self) -> dict:
+        """
+        Sub-partitioning arguments of create_monthly_partitions for the configured
+        along_track layout, see Config.along_track_mission_partitions
+        """
+        if not self.config.along_track_mission_partitions:
+            return {}
+        return {
+            "sub_partition_column": "mission_id",
+            "sub_partition_values": self.along_track_mission_ids(self.missions),
+        }
+
+    def create_along_track_partitions(self, months: Iterable[date]) -> list[str]:
+        """
+        Create the missing along_track partitions for ``months`` in the configured
+        layout and remember them in ``known_partitions``
+        """
+        months = list(months)
+        created = self.create_monthly_partitions(
+            self.along_track_table_name, months, **self.along_track_partition_layout()
+        )
+        self.known_partitions.update(
+            f"{self.along_track_table_name}_{month.year}_{month.month:02d}"
+            for month in months
+        )
+        return created
+
+    def create_partitions_for_files(self, files: Iterable[Path]) -> list[str]:
+        """
+        Create every missing monthly partition needed by ``files`` in one transaction.
+
+        The months are read from the file names, so no file is opened.
+        """
+        dates = [self.file_date(file) for file in files]
+        months = {day.replace(day=1) for day in dates if day is not None}
+        created = self.create_along_track_partitions(months)
+        print(f"Created {len(created)} partitions for {len(months)} months")
+        return created
+
+    def ensure_along_track_partitions(self, along_track_data: AlongTrackData) -> None:
+        """
+        Create the partitions a parsed file needs, if this process has not seen them.
+
+        Only months missing from ``known_partitions`` go to the database, and they are
+        created on a separate short transaction, so writers are not serialized behind
+        each other's partition DDL.  Must be called before the writer's transaction
+        touches along_track, since creating a partition locks the parent table.
+        """
+        times = along_track_data.time[~np.isnat(along_track_data.time)]
+        months = np.unique(times.astype("datetime64[M]")).tolist()
+        missing = [
+            month
+            for month in months
+            if f"{self.along_track_table_name}_{month.year}_{month.month:02d}"
+            not in self.known_partitions
+        ]
+        if not missing:
+            return
+
+        self.create_along_track_partitions(missing)
 
     def extract_dataset_metadata(
         self, ds: nc.Dataset, file: Path
@@ -172,18 +313,12 @@ class AlongTrackETL(BaseETL):
             ds.variables["dac"].set_auto_scale(False)
             ds.variables["tpa_correction"].set_auto_scale(False)
 
-            time_data = ds.variables[
-                "time"
-            ]  # Extract dates from the dataset and convert them to standard datetime
-            time_data = nc.num2date(
-                time_data[:],
-                time_data.units,
-                only_use_cftime_datetimes=False,
-                only_use_python_datetimes=False,
+            time_variable = ds.variables["time"]
+            time_data = netcdf_time_to_datetime64(
+                time_variable[:],
+                time_variable.units,
+                getattr(time_variable, "calendar", "standard"),
             )
-            time_data = nc.date2num(
-                time_data[:], "microseconds since 2000-01-01 00:00:00"
-            )  # Convert the standard date back to the 8-byte integer PSQL uses
 
             basin_id = self.basin_mask(
                 ds.variables["latitude"][:], ds.variables["longitude"][:]
@@ -232,7 +367,7 @@ class AlongTrackETL(BaseETL):
 
         data = df.to_records(index=False).tolist()
 
-        with psycopg.connect(self.config.postgres_dsn) as conn:
+        with self.borrow_connection() as conn:
             with conn.cursor() as cur:
                 cur.executemany(query.as_string(conn), data)
                 conn.commit()
@@ -263,50 +398,31 @@ class AlongTrackETL(BaseETL):
 
         data = df.to_records(index=False).tolist()
 
-        with psycopg.connect(self.config.postgres_dsn) as conn:
+        with self.borrow_connection() as conn:
             with conn.cursor() as cur:
                 cur.executemany(query.as_string(conn), data)
                 conn.commit()
 
         print(f"Inserted {len(df)} rows in to the basins table")
 
-    @cached_property
-    def basin_mask_data(self):
-        """
-        Load the basin mask NetCDF file packaged with the module.
-        Returns the 'basinmask' variable as a NumPy array.
+    def import_along_track_data_to_postgresql(
+        self,
+        along_track_data: AlongTrackData,
+        connection: Optional[pg.Connection] = None,
+    ) -> int:
         """
-        # Open resource file via importlib.resources
-        with self.load_module_file(
-            "OceanDB.data", "basin_masks/new_basin_mask.nc", mode="rb"
-        ) as f:
-            ds = nc.Dataset("inmemory.nc", memory=f.read())  # load from memory buffer
-            ds.set_auto_mask(False)
-            basin_mask = ds.variables["basinmask"][:]
-            ds.close()
-            return basin_mask
-
-    def basin_mask(self, latitude, longitude):
-        onesixth = 1 / 6
-        i = np.floor((latitude + 90) / onesixth).astype(int)
-        j = np.floor((longitude % 360) / onesixth).astype(int)
-        mask_data = self.basin_mask_data
-        basin_mask = mask_data[i, j]
-        return basin_mask
+        Insert the AlongTrackData row by row with executemany.
 
-    def import_along_track_data_to_postgresql(self, along_track_data: AlongTrackData):
-        """
-        Cast the AlongTrackData to a Pandas DataFrame
+        If ``connection`` is given the rows are written in the caller's transaction.
         """
 
-        EPOCH = datetime(2000, 1, 1)
-        date_times = [
-            EPOCH + timedelta(microseconds=int(t)) for t in along_track_data.time
-        ]
+        date_times = along_track_data.time.tolist()
+        latitudes = self.encode_coordinates(along_track_data.latitude)
+        longitudes = self.encode_coordinates(along_track_data.longitude)
 
         # 1. Define the INSERT query
         insert_query = sql.SQL("""
-                               INSERT INTO {table} (file_name, mission, track, cycle, latitude, longitude,
+                               INSERT INTO {table} (file_id, mission_id, track, cycle, latitude, longitude,
                                                     sla_unfiltered, sla_filtered, date_time, dac,
                                                     ocean_tide, internal_tide, lwe, mdt, basin_id)
                                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
@@ -320,12 +436,12 @@ class AlongTrackETL(BaseETL):
         for i in range(len(along_track_data.time)):
             data_to_insert.append(
                 (
-                    along_track_data.file_name,
-                    along_track_data.mission,
+                    along_track_data.file_id,
+                    along_track_data.mission_id,
                     along_track_data.track[i].item(),
                     along_track_data.cycle[i].item(),
-                    along_track_data.latitude[i].item(),
-                    along_track_data.longitude[i].item(),
+                    latitudes[i].item(),
+                    longitudes[i].item(),
                     along_track_data.sla_unfiltered[i].item(),
                     along_track_data.sla_filtered[i].item(),
                     date_times[i],
@@ -339,15 +455,99 @@ class AlongTrackETL(BaseETL):
             )
 
         # 3. Execute the batch insert
-        with pg.connect(self.config.postgres_dsn) as connection:
+        start = time.perf_counter()
+        with self.borrow_connection(connection) as connection:
             with connection.cursor() as cursor:
                 print(f"Starting batch insert of {len(data_to_insert)} rows...")
                 cursor.executemany(insert_query, data_to_insert)
-            connection.commit()
-            print("Successfully inserted all rows.")
+        self.report_write_rate("INSERT", len(data_to_insert), start)
+        return len(data_to_insert)
+
+    def copy_along_track_data_to_postgresql(
+        self,
+        along_track_data: AlongTrackData,
+        connection: Optional[pg.Connection] = None,
+        table_name: Optional[str] = None,
+    ) -> int:
+        """
+        Stream the AlongTrackData columns into along_track with a binary COPY.
+
+        The NumPy columns are encoded directly into the PGCOPY wire format in batches of
+        ``copy_batch_size`` rows, so no Python object is created per observation.
+        Column types are taken from ``along_track_schema``, and the dimension keys
+        ``file_id`` & ``mission_id`` must be registered.
+
+        If ``connection`` is given the rows are written in the caller's transaction.
+        ``table_name`` redirects the COPY, e.g. into a staging table.
+        """
+        n_rows = len(along_track_data.time)
+        columns = []
+        for name in self.along_track_copy_columns:
+            attribute = "time" if name == "date_time" else name
+            values = getattr(along_track_data, attribute)
+            if name in self.along_track_key_types:
+                postgres_type = self.along_track_key_types[name]
+                values = np.full(n_rows, values)
+            elif name in ("latitude", "longitude"):
+                postgres_type = self.coordinate_postgres_type
+                values = self.encode_coordinates(values)
+            else:
+                postgres_type = along_track_schema[name].postgres_type
+            columns.append((values, postgres_type))
+
+        copy_query = sql.SQL(
+            "COPY {table} ({fields}) FROM STDIN (FORMAT BINARY)"
+        ).format(
+            table=sql.Identifier(table_name or self.along_track_table_name),
+            fields=sql.SQL(", ").join(
+                map(sql.Identifier, self.along_track_copy_columns)
+            ),
+        )
+
+        start = time.perf_counter()
+        with self.borrow_connection(connection) as connection:
+            with connection.cursor() as cursor:
+                with cursor.copy(copy_query) as copy:
+                    for batch_start in range(0, max(n_rows, 1), self.copy_batch_size):
+                        batch_stop = min(batch_start + self.copy_batch_size, n_rows)
+                        batch = [
+                            (
+                                values
+                                if postgres_type == "text"
+                                else values[batch_start:batch_stop],
+                                postgres_type,
+                            )
+                            for values, postgres_type in columns
+                        ]
+                        copy.write(
+                            encode_binary_copy(
+                                batch,
+                                n_rows=batch_stop - batch_start,
+                                header=batch_start == 0,
+                                trailer=batch_stop >= n_rows,
+                            )
+                        )
+        self.report_write_rate("COPY", n_rows, start)
+        return n_rows
+
+    def report_write_rate(self, method: str, n_rows: int, start: float) -> None:
+        duration = time.perf_counter() - start
+        rate = n_rows / duration if duration > 0 else float("inf")
+        print(
+            f"{method}: wrote {n_rows} rows in {duration:.2f} seconds "
+            f"({rate:,.0f} rows/sec)"
+        )
+
+    def import_metadata_to_psql(
+        self,
+        metadata: AlongTrackMetaData,
+        connection: Optional[pg.Connection] = None,
+    ) -> bool:
+        """
+        Insert metadata into along_track_metadata table, ignoring duplicates.
 
-    def import_metadata_to_psql(self, metadata: AlongTrackMetaData) -> None:
-        """Insert metadata into along_track_metadata table, ignoring duplicates."""
+        Returns False if the file was already recorded.
+        """
         fields = [
             "file_name",
             "conventions",
@@ -380,42 +580,606 @@ class AlongTrackETL(BaseETL):
         query = sql.SQL("""
             INSERT INTO {table} ({fields})
             VALUES ({placeholders})
-            ON CONFLICT (file_name) DO NOTHING;
+            ON CONFLICT (file_name) DO NOTHING
+            RETURNING file_name;
         """).format(
             table=sql.Identifier(self.along_track_metadata_table_name),
             fields=sql.SQL(", ").join(sql.Identifier(f) for f in fields),
             placeholders=sql.SQL(", ").join(sql.Placeholder() * len(fields)),
         )
 
-        with pg.connect(self.connection_string) as conn:
+        with self.borrow_connection(connection) as conn:
             with conn.cursor() as cur:
                 cur.execute(query, tuple(metadata.__dict__.values()))
-            conn.commit()
-        print(f"Inserted Metadata for {metadata.file_name}")
+                inserted = cur.fetchone() is not None
+        if inserted:
+            print(f"Inserted Metadata for {metadata.file_name}")
+        return inserted
 
-    def query_metadata(self):
-        query = "SELECT * FROM along_track_metadata;"
-        with pg.connect(self.connection_string) as connection:
-            with connection.cursor(row_factory=pg.rows.dict_row) as cursor:
-                cursor.execute(query)
-                rows = cursor.fetchall()
-        return set([metadata["file_name"] for metadata in rows])
+    def query_metadata(self, file_names: Optional[list[str]] = None) -> set[str]:
+        """
+        Return the names of files recorded in along_track_metadata.
 
-    def process_along_track_file(self, file: Path):
+        If ``file_names`` is given only those names are looked up, through the
+        primary key, so resuming an ingest does not scan the whole table.
         """
-        Processes an along track netcdf file & inserts into Postgres
+        query = sql.SQL("SELECT file_name FROM {table}").format(
+            table=sql.Identifier(self.along_track_metadata_table_name)
+        )
+        params = None
+        if file_names is not None:
+            query = sql.SQL("{query} WHERE file_name = ANY(%(file_names)s)").format(
+                query=query
+            )
+            params = {"file_names": list(file_names)}
+
+        with self.borrow_connection() as connection:
+            with connection.cursor() as cursor:
+                cursor.execute(query, params)
+                return {row[0] for row in cursor.fetchall()}
+
+    def along_track_mission_ids(self, missions: Iterable[str] = ()) -> dict[str, int]:
         """
-        start = time.perf_counter()
+        Keys of the along_track_mission dimension, registering any of ``missions``
+        that are not in it yet, in the given order.
+
+        The keys are read once per process.  New missions are registered in their
+        own short transaction, so a writer never holds a lock on a dimension row
+        while it COPYs a file.
+        """
+        missing = [mission for mission in missions if mission not in self.mission_ids]
+        if self.mission_ids and not missing:
+            return self.mission_ids
+
+        table = sql.Identifier(self.along_track_mission_table_name)
+        with self.borrow_connection() as connection:
+            with connection.cursor() as cursor:
+                if missing:
+                    cursor.executemany(
+                        sql.SQL(
+                            "INSERT INTO {table} (mission) VALUES (%s) "
+                            "ON CONFLICT (mission) DO NOTHING"
+                        ).format(table=table),
+                        [(mission,) for mission in dict.fromkeys(missing)],
+                    )
+                cursor.execute(
+                    sql.SQL("SELECT mission, mission_id FROM {table}").format(
+                        table=table
+                    )
+                )
+                self.mission_ids = dict(cursor.fetchall())
+        return self.mission_ids
 
+    def insert_along_track_missions(self) -> None:
+        """
+        Register the known missions, so their keys follow the order of ``missions``
+        """
+        mission_ids = self.along_track_mission_ids(self.missions)
+        print(f"Registered {len(mission_ids)} missions")
+
+    def register_along_track_file(
+        self,
+        along_track_data: AlongTrackData,
+        connection: Optional[pg.Connection] = None,
+    ) -> int:
+        """
+        Return the along_track_file key of a file, registering it if it is new.
+
+        Called inside the file's write transaction, after the file is claimed, so
+        no other writer can register the same file concurrently.
+        """
+        query = sql.SQL("""
+            INSERT INTO {table} (file_name, mission_id)
+            VALUES (%(file_name)s, %(mission_id)s)
+            ON CONFLICT (file_name) DO UPDATE SET mission_id = EXCLUDED.mission_id
+            RETURNING file_id
+        """).format(table=sql.Identifier(self.along_track_file_table_name))
+        with self.borrow_connection(connection) as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    query,
+                    {
+                        "file_name": along_track_data.file_name,
+                        "mission_id": along_track_data.mission_id,
+                    },
+                )
+                return cur.fetchone()[0]
+
+    def delete_along_track_file_rows(
+        self,
+        along_track_data: AlongTrackData,
+        connection: Optional[pg.Connection] = None,
+    ) -> int:
+        """
+        Delete the rows an earlier attempt left of a file that has no
+        along_track_metadata entry.
+
+        Such rows can only be left behind by ingests that wrote the data and the
+        metadata in separate transactions, or by a file whose metadata entry was
+        deleted to ingest it again.  They are found by the file name, through the
+        along_track_file entry of the earlier attempt, so this is called after the
+        file is claimed and before it is registered.  The time range of the file's
+        valid timestamps restricts the delete to the partitions the file can touch;
+        without any, every partition is searched.
+        """
+        query = sql.SQL("""
+            DELETE FROM {table}
+            WHERE file_id = (
+                SELECT file_id FROM {file_table} WHERE file_name = %(file_name)s
+            )
+        """).format(
+            table=sql.Identifier(self.along_track_table_name),
+            file_table=sql.Identifier(self.along_track_file_table_name),
+        )
+        params = {"file_name": along_track_data.file_name}
+        # min() and max() of times with a NaT are NaT, which would match no row
+        times = along_track_data.time[~np.isnat(along_track_data.time)]
+        if times.size:
+            query = sql.SQL(
+                "{query} AND date_time BETWEEN %(min_date_time)s AND %(max_date_time)s"
+            ).format(query=query)
+            params["min_date_time"] = times.min().item()
+            params["max_date_time"] = times.max().item()
+        with self.borrow_connection(connection) as conn:
+            with conn.cursor() as cur:
+                cur.execute(query, params)
+                if cur.rowcount:
+                    print(
+                        f"Removed {cur.rowcount} orphaned rows of "
+                        f"{along_track_data.file_name}"
+                    )
+                return cur.rowcount
+
+    def parse_along_track_file(
+        self, file: Path
+    ) -> tuple[AlongTrackData, AlongTrackMetaData]:
+        """
+        Read the data and global metadata of an along track netcdf file
+        """
         dataset: nc.Dataset = self.load_netcdf(file)
-        along_track_data: AlongTrackData = self.extract_data_from_netcdf(
+        # Metadata must be read first, extract_data_from_netcdf closes the dataset
+        along_track_metadata: AlongTrackMetaData = self.extract_dataset_metadata(
             ds=dataset, file=file
         )
-        along_track_metadata: AlongTrackMetaData = self.extract_dataset_metadata(
+        along_track_data: AlongTrackData = self.extract_data_from_netcdf(
             ds=dataset, file=file
         )
-        self.import_along_track_data_to_postgresql(along_track_data=along_track_data)
-        self.import_metadata_to_psql(metadata=along_track_metadata)
+        if along_track_data is None:
+            raise ValueError(f"Could not extract along track data from {file.name}")
+        return along_track_data, along_track_metadata
+
+    def write_along_track_file(
+        self,
+        along_track_data: AlongTrackData,
+        along_track_metadata: AlongTrackMetaData,
+        write_method: Literal["copy", "insert"] = "copy",
+        connection: Optional[pg.Connection] = None,
+    ) -> Optional[int]:
+        """
+        Atomically write a parsed file's rows and its along_track_metadata entry.
+
+        The metadata row is inserted first and acts as a claim on the file: a
+        concurrent writer of the same file blocks on it, and a file that is already
+        recorded is skipped.  Rows and metadata are committed in one transaction, so a
+        crash never leaves rows without a metadata entry.  If ``connection`` is given
+        the caller commits.
+
+        With mission partitions (see Config.along_track_mission_partitions) the unique
+        constraint cannot reject a row another mission already stored, so files must
+        be loaded through :meth:`bulk_load_along_track_files`, which drops them.
+
+        Returns the number of rows written, or None if the file was already ingested.
+        """
+        if self.config.along_track_mission_partitions:
+            raise ValueError(
+                "along_track is partitioned by mission, load files through a "
+                "staging table to drop rows shared by two missions"
+            )
+        self.ensure_along_track_partitions(along_track_data)
+        along_track_data.mission_id = self.along_track_mission_ids(
+            [along_track_data.mission]
+        )[along_track_data.mission]
+        with self.borrow_connection(connection) as connection:
+            if not self.import_metadata_to_psql(
+                metadata=along_track_metadata, connection=connection
+            ):
+                print(f"Skipping {along_track_metadata.file_name}, already ingested")
+                return None
+
+            self.delete_along_track_file_rows(along_track_data, connection=connection)
+            along_track_data.file_id = self.register_along_track_file(
+                along_track_data, connection=connection
+            )
+            if write_method == "copy":
+                return self.copy_along_track_data_to_postgresql(
+                    along_track_data=along_track_data, connection=connection
+                )
+            return self.import_along_track_data_to_postgresql(
+                along_track_data=along_track_data, connection=connection
+            )
+
+    def create_staging_table(
+        self, staging_table_name: str, connection: Optional[pg.Connection] = None
+    ) -> None:
+        """
+        Create an empty UNLOGGED staging table with the along_track COPY columns
+        """
+        query_string = self.load_sql_file(self.along_track_staging_table_query)
+        query = sql.SQL(query_string).format(
+            table_name=sql.Identifier(staging_table_name),
+            coordinate_type=sql.SQL(self.coordinate_postgres_type),
+        )
+        with self.borrow_connection(connection) as conn:
+            with conn.cursor() as cur:
+                cur.execute(query)
+                cur.execute(
+                    sql.SQL("TRUNCATE {table}").format(
+                        table=sql.Identifier(staging_table_name)
+                    )
+                )
+
+    def drop_staging_table(
+        self, staging_table_name: str, connection: Optional[pg.Connection] = None
+    ) -> None:
+        with self.borrow_connection(connection) as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    sql.SQL("DROP TABLE IF EXISTS {table}").format(
+                        table=sql.Identifier(staging_table_name)
+                    )
+                )
+
+    def along_track_merge_query(self, staging_table_name: str) -> sql.Composed:
+        """
+        Query merging a staging table into along_track, dropping the rows whose
+        ``(date_time, latitude, longitude)`` is already stored or staged.
+
+        With mission partitions (see Config.along_track_mission_partitions) the
+        unique constraint includes ``mission_id`` and cannot drop a row shared by two
+        missions (e.g. ``j3`` and ``j3n``), so the merge keeps the first staged row of
+        each point that no mission has stored yet.  Run it holding the lock of
+        :meth:`lock_along_track_merges`.
+        """
+        table = sql.Identifier(self.along_track_table_name)
+        columns = sql.SQL(", ").join(map(sql.Identifier, self.along_track_copy_columns))
+        staging_table = sql.Identifier(staging_table_name)
+        if not self.config.along_track_mission_partitions:
+            return sql.SQL("""
+                INSERT INTO {table} ({columns})
+                SELECT {columns} FROM {staging_table}
+                ON CONFLICT DO NOTHING
+            """).format(table=table, columns=columns, staging_table=staging_table)
+
+        return sql.SQL("""
+            INSERT INTO {table} ({columns})
+            SELECT {columns} FROM (
+                SELECT DISTINCT ON (date_time, latitude, longitude) {columns}
+                FROM {staging_table}
+                ORDER BY date_time, latitude, longitude, file_id
+            ) AS staged
+            WHERE NOT EXISTS (
+                SELECT 1 FROM {table} AS stored
+                WHERE stored.date_time = staged.date_time
+                  AND stored.latitude = staged.latitude
+                  AND stored.longitude = staged.longitude
+            )
+            ON CONFLICT DO NOTHING
+        """).format(table=table, columns=columns, staging_table=staging_table)
+
+    def lock_along_track_merges(self, cursor: pg.Cursor) -> None:
+        """
+        With mission partitions, wait for the merges of other writers to commit, so
+        two writers never both insert a point stored by none of them yet.  The
+        transaction-level advisory lock is released when the merge commits.
+        """
+        if self.config.along_track_mission_partitions:
+            cursor.execute(
+                "SELECT pg_advisory_xact_lock(hashtext(%s))",
+                (f"{self.along_track_table_name}_merge",),
+            )
+
+    def bulk_load_along_track_files(
+        self,
+        parsed_files: list[tuple[AlongTrackData, AlongTrackMetaData]],
+        staging_table_name: str,
+        connection: Optional[pg.Connection] = None,
+    ) -> Counter:
+        """
+        Load a batch of parsed files through an UNLOGGED staging table.
+
+        Every file not yet in along_track_metadata is claimed and COPYed into the
+        staging table, which is then merged into along_track with a single
+        ``INSERT ... SELECT``, see :meth:`along_track_merge_query`.  Rows whose
+        ``(date_time, latitude, longitude)`` is already stored, or staged by another
+        file of the batch (e.g. ``j3`` and ``j3n``), are dropped by the merge and
+        counted as duplicates, whatever the along_track layout.  If ``connection`` is
+        given the caller commits; the staging table must already exist.
+
+        Returns counts of ``files``, ``skipped`` files, ``rows`` inserted and
+        ``duplicates``.
+        """
+        stats = Counter(files=0, skipped=0, rows=0, duplicates=0)
+        merge_query = self.along_track_merge_query(staging_table_name)
+
+        mission_ids = self.along_track_mission_ids(
+            [along_track_data.mission for along_track_data, _ in parsed_files]
+        )
+        for along_track_data, _ in parsed_files:
+            self.ensure_along_track_partitions(along_track_data)
+            along_track_data.mission_id = mission_ids[along_track_data.mission]
+
+        staged_rows = 0
+        with self.borrow_connection(connection) as connection:
+            for along_track_data, along_track_metadata in parsed_files:
+                if not self.import_metadata_to_psql(
+                    metadata=along_track_metadata, connection=connection
+                ):
+                    stats["skipped"] += 1
+                    continue
+                self.delete_along_track_file_rows(
+                    along_track_data, connection=connection
+                )
+                along_track_data.file_id = self.register_along_track_file(
+                    along_track_data, connection=connection
+                )
+                staged_rows += self.copy_along_track_data_to_postgresql(
+                    along_track_data,
+                    connection=connection,
+                    table_name=staging_table_name,
+                )
+                stats["files"] += 1
+
+            start = time.perf_counter()
+            with connection.cursor() as cursor:
+                self.lock_along_track_merges(cursor)
+                cursor.execute(merge_query)
+                stats["rows"] = cursor.rowcount
+                cursor.execute(
+                    sql.SQL("TRUNCATE {table}").format(
+                        table=sql.Identifier(staging_table_name)
+                    )
+                )
+            stats["duplicates"] = staged_rows - stats["rows"]
+            self.report_write_rate("MERGE", staged_rows, start)
+            print(
+                f"Merged {stats['files']} files: {stats['rows']} rows inserted, "
+                f"{stats['duplicates']} duplicates dropped"
+            )
+        return stats
+
+    def process_along_track_file(
+        self, file: Path, write_method: Literal["copy", "insert"] = "copy"
+    ):
+        """
+        Processes an along track netcdf file & inserts into Postgres
+
+        ``write_method`` selects the binary COPY writer (default) or the row-by-row
+        INSERT writer.
+        """
+        start = time.perf_counter()
+
+        along_track_data, along_track_metadata = self.parse_along_track_file(file)
+        self.write_along_track_file(
+            along_track_data, along_track_metadata, write_method=write_method
+        )
         duration = time.perf_counter() - start
         size_mb = file.stat().st_size / (1024 * 1024)
         print(f"✅ {file.name} | {size_mb:.2f} MB | {duration:.2f} seconds")
+
+    def ingest_along_track_files(
+        self,
+        files: list[Path],
+        parser_count: int = 6,
+        writer_count: int = 2,
+        queue_size: int = 12,
+        write_method: Literal["copy", "insert"] = "copy",
+        staging_batch_size: Optional[int] = None,
+    ) -> Counter:
+        """
+        Ingest along track files with a staged parse → write pipeline.
+
+        ``parser_count`` processes read and decode NetCDF files and put the parsed
+        files on a queue holding at most ``queue_size`` files.  ``writer_count``
+        threads, each holding one database connection, drain the queue and commit one
+        transaction per file.  When the writers fall behind, the full queue blocks the
+        parsers, which bounds memory to roughly ``queue_size`` parsed files.
+
+        If ``staging_batch_size`` is set, each writer instead loads that many files
+        per transaction through its own UNLOGGED staging table, see
+        ``bulk_load_along_track_files``.  With mission partitions files are always
+        loaded that way, one file per transaction by default, see
+        ``write_along_track_file``.
+
+        Returns counts of ``files``, ``rows``, ``skipped`` (already ingested) and
+        ``failed`` files, and of ``duplicates`` dropped by staging merges.
+        """
+        start = time.perf_counter()
+        context = mp.get_context()
+
+        file_queue = context.Queue()
+        for file in files:
+            file_queue.put(file)
+        for _ in range(parser_count):
+            file_queue.put(None)
+        parsed_queue = context.Queue(maxsize=queue_size)
+
+        # Start the parser processes before any thread exists in this process. An
+        # open connection pool runs worker threads, it is reopened on next use.
+        self.close_connection_pools()
+        parsers = [
+            context.Process(
+                target=self._parse_files, args=(file_queue, parsed_queue), daemon=True
+            )
+            for _ in range(parser_count)
+        ]
+        for parser in parsers:
+            parser.start()
+
+        stats = Counter(files=0, rows=0, skipped=0, failed=0, duplicates=0)
+        stats_lock = threading.Lock()
+        # Each writer holds a connection for the whole ingest and briefly takes a
+        # second one when it creates partitions or registers missions
+        self.ensure_pool_capacity(2 * writer_count)
+        if self.config.along_track_mission_partitions and not staging_batch_size:
+            # only the staging merge drops rows shared by two missions
+            staging_batch_size = 1
+        if staging_batch_size:
+            writers = [
+                threading.Thread(
+                    target=self._bulk_load_parsed_files,
+                    args=(
+                        parsed_queue,
+                        f"{self.along_track_table_name}_staging_{writer_id}",
+                        staging_batch_size,
+                        stats,
+                        stats_lock,
+                    ),
+                    daemon=True,
+                )
+                for writer_id in range(writer_count)
+            ]
+        else:
+            writers = [
+                threading.Thread(
+                    target=self._write_parsed_files,
+                    args=(parsed_queue, write_method, stats, stats_lock),
+                    daemon=True,
+                )
+                for _ in range(writer_count)
+            ]
+        for writer in writers:
+            writer.start()
+
+        while any(parser.is_alive() for parser in parsers):
+            if not any(writer.is_alive() for writer in writers):
+                for parser in parsers:
+                    parser.terminate()
+                raise RuntimeError("All along track writers exited, aborting ingest")
+            for parser in parsers:
+                parser.join(timeout=1.0)
+
+        for _ in writers:
+            parsed_queue.put(None)
+        for writer in writers:
+            writer.join()
+
+        duration = time.perf_counter() - start
+        rate = stats["rows"] / duration if duration > 0 else float("inf")
+        print(
+            f"Ingested {stats['files']} files "
+            f"({stats['skipped']} skipped, {stats['failed']} failed, "
+            f"{stats['duplicates']} duplicate rows), "
+            f"{stats['rows']} rows in {duration:.2f} seconds ({rate:,.0f} rows/sec)"
+        )
+        return stats
+
+    def _parse_files(self, file_queue: mp.Queue, parsed_queue: mp.Queue) -> None:
+        """
+        Parser process: parse files until the ``None`` sentinel is received
+        """
+        while (file := file_queue.get()) is not None:
+            try:
+                along_track_data, along_track_metadata = self.parse_along_track_file(
+                    file
+                )
+            except Exception as ex:
+                print(f"❌ {file.name} | parse failed: {ex}")
+                parsed_queue.put((file, None, None))
+                continue
+            # Blocks while the queue is full, this is the pipeline's backpressure
+            parsed_queue.put((file, along_track_data, along_track_metadata))
+
+    def _write_parsed_files(
+        self,
+        parsed_queue: mp.Queue,
+        write_method: Literal["copy", "insert"],
+        stats: Counter,
+        stats_lock: threading.Lock,
+    ) -> None:
+        """
+        Writer thread: write parsed files on one connection, one transaction each
+        """
+        with self.borrow_connection() as connection:
+            while (item := parsed_queue.get()) is not None:
+                file, along_track_data, along_track_metadata = item
+                if along_track_data is None:
+                    with stats_lock:
+                        stats["failed"] += 1
+                    continue
+
+                start = time.perf_counter()
+                try:
+                    n_rows = self.write_along_track_file(
+                        along_track_data,
+                        along_track_metadata,
+                        write_method=write_method,
+                        connection=connection,
+                    )
+                    connection.commit()
+                except Exception as ex:
+                    connection.rollback()
+                    print(f"❌ {file.name} | write failed: {ex}")
+                    with stats_lock:
+                        stats["failed"] += 1
+                    continue
+
+                if n_rows is None:
+                    with stats_lock:
+                        stats["skipped"] += 1
+                    continue
+
+                with stats_lock:
+                    stats["files"] += 1
+                    stats["rows"] += n_rows
+                duration = time.perf_counter() - start
+                print(f"✅ {file.name} | {n_rows} rows | {duration:.2f} seconds")
+
+    def _bulk_load_parsed_files(
+        self,
+        parsed_queue: mp.Queue,
+        staging_table_name: str,
+        staging_batch_size: int,
+        stats: Counter,
+        stats_lock: threading.Lock,
+    ) -> None:
+        """
+        Writer thread: bulk load batches of parsed files through a staging table
+        """
+        with self.borrow_connection() as connection:
+            self.create_staging_table(staging_table_name, connection=connection)
+            connection.commit()
+
+            batch = []
+            done = False
+            while not done:
+                item = parsed_queue.get()
+                if item is None:
+                    done = True
+                elif item[1] is None:
+                    with stats_lock:
+                        stats["failed"] += 1
+                else:
+                    batch.append(item)
+
+                if not batch or (len(batch) < staging_batch_size and not done):
+                    continue
+
+                try:
+                    batch_stats = self.bulk_load_along_track_files(
+                        [(data, metadata) for _, data, metadata in batch],
+                        staging_table_name,
+                        connection=connection,
+                    )
+                    connection.commit()
+                except Exception as ex:
+                    connection.rollback()
+                    names = ", ".join(file.name for file, _, _ in batch)
+                    print(f"❌ staging batch failed ({names}): {ex}")
+                    with stats_lock:
+                        stats["failed"] += len(batch)
+                else:
+                    with stats_lock:
+                        stats.update(batch_stats)
+                batch = []
+
+            self.drop_staging_table(staging_table_name, connection=connection)
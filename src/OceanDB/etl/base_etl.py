@@ -1,6 +1,5 @@
 import netCDF4 as nc
 import pandas as pd
-import psycopg
 from psycopg import sql
 from OceanDB.OceanDB import OceanDB
 from pathlib import Path
@@ -30,7 +29,7 @@ class BaseETL(OceanDB):
 
         data = df.to_records(index=False).tolist()
 
-        with psycopg.connect(self.config.postgres_dsn) as conn:
+        with self.borrow_connection() as conn:
             with conn.cursor() as cur:
                 cur.executemany(query.as_string(conn), data)
                 conn.commit()
@@ -61,7 +60,7 @@ class BaseETL(OceanDB):
 
         data = df.to_records(index=False).tolist()
 
-        with psycopg.connect(self.config.postgres_dsn) as conn:
+        with self.borrow_connection() as conn:
             with conn.cursor() as cur:
                 cur.executemany(query.as_string(conn), data)
                 conn.commit()
@@ -1,14 +1,13 @@
 from dataclasses import dataclass
 import netCDF4 as nc
-import psycopg as pg
 from psycopg import sql
 import time
 import numpy as np
 from typing import Iterator
-from datetime import datetime, timedelta, timezone
 from pathlib import Path
 
 from OceanDB.etl import BaseETL
+from OceanDB.utils.time_conversion import unix_seconds_to_datetime64
 
 NDArray = np.ndarray
 
@@ -110,16 +109,13 @@ class EddyETL(BaseETL):
 
         time_var = ds.variables["time"]
 
-        # Unix epoch (correct for this dataset)
-        epoch = datetime(1970, 1, 1, tzinfo=timezone.utc)
-
         for start in range(0, n_total, batch_size):
             stop = min(start + batch_size, n_total)
             sl = slice(start, stop)
 
             # ---- Time parsing (critical fix) ----
-            raw_time = time_var[sl].astype("int64")
-            date_time = [epoch + timedelta(seconds=int(t)) for t in raw_time]
+            # Unix seconds (correct for this dataset), decoded to naive UTC datetime64
+            date_time = unix_seconds_to_datetime64(time_var[sl])
 
             yield EddyData(
                 amplitude=ds.variables["amplitude"][sl],
@@ -220,6 +216,8 @@ class EddyETL(BaseETL):
         )
 
         n_observations = len(eddy_data.observation_number)
+        # datetime64[us] -> datetime in a single C loop
+        date_times = eddy_data.date_time.tolist()
 
         rows = []
         for i in range(n_observations):
@@ -248,14 +246,14 @@ class EddyETL(BaseETL):
                     normalize_value(eddy_data.speed_contour_height[i]),
                     normalize_value(eddy_data.speed_contour_shape_error[i]),
                     normalize_value(eddy_data.speed_radius[i]),
-                    normalize_value(eddy_data.date_time[i]),
+                    date_times[i],
                     normalize_value(eddy_data.track[i]),
                     cyclonic_type,
                 ]
             )
 
         try:
-            with pg.connect(self.config.postgres_dsn) as conn:
+            with self.borrow_connection() as conn:
                 with conn.cursor() as cur:
                     cur.executemany(insert_query, rows)
         except Exception as e:
@@ -1,10 +1,15 @@
-from typing import Mapping
+from os import PathLike
+
+import numpy as np
 
 from ..ocean_data.ocean_data import OceanDataField
 
 
 from typing import TypeVar, Generic, Mapping
 
+# Units of timestamps wrapped as the integers of their datetime64[us] array
+RAW_TIME_UNITS = "microseconds since 1970-01-01 00:00:00"
+
 K = TypeVar("K", bound=str)
 T = TypeVar("T")
 
@@ -13,6 +18,11 @@ class Dataset(Mapping[K, T], Generic[K, T]):
     Immutable, column-oriented dataset.
 
     Represents the result of a query, ingestion step, or transformation.
+
+    Columns of packed fields (see :attr:`OceanDataField.is_packed`) hold the values
+    stored in the database, e.g. ``int16`` millimeters, a quarter of the memory of
+    ``float64``.  Indexing a column returns the stored values, unpacking them to
+    physical units is explicit, ``column(key, scaled=True)``.
     """
 
     def __init__(
@@ -31,6 +41,33 @@ class Dataset(Mapping[K, T], Generic[K, T]):
     def __getitem__(self, key: K) -> T:
         return self._data[key]
 
+    def column(self, key: K, scaled: bool = False) -> T:
+        """
+        The values of a column, unpacked to physical units if ``scaled`` and the
+        column is packed, otherwise as stored.  Unpacking computes a new array, keep
+        it rather than unpacking the column again.
+        """
+        values = self._data[key]
+        field = self.schema.get(key)
+        if scaled and field is not None:
+            return field.unpack(values)
+        return values
+
+    def columns(self, scaled: bool = False) -> dict[K, T]:
+        """
+        Every column, see :meth:`column`.  The stored columns are not copied.
+        """
+        if not scaled:
+            return dict(self._data)
+        return {key: self.column(key) for key in self._data}
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Bytes of the stored columns
+        """
+        return sum(np.asarray(values).nbytes for values in self._data.values())
+
     def __contains__(self, key) -> bool:
         return key in self._data
 
@@ -41,8 +78,127 @@ class Dataset(Mapping[K, T], Generic[K, T]):
         # number of columns, not rows
         return len(self._data)
 
-    def to_xarray(self):
-        raise NotImplementedError()
+    def select_rows(self, rows) -> "Dataset[K, T]":
+        """
+        Return a dataset holding a subset of the rows.
+
+        Selecting with a slice returns a view on this dataset's columns, selecting
+        with an index array copies them.
+        """
+        return Dataset[K, T](
+            name=self.name,
+            data={key: values[rows] for key, values in self._data.items()},
+            dtypes=self._dtypes,
+            schema=self.schema,
+        )
+
+    def variable_spec(self, key: K, metadata: Mapping[str, dict]) -> dict:
+        """
+        The metadata of a column, looked up by column name and then by the NetCDF
+        name of its field, e.g. ``date_time`` is described by ``time``
+        """
+        spec = metadata.get(key)
+        if spec is None and key in self.schema:
+            spec = metadata.get(self.schema[key].nc_name)
+        return spec or {}
+
+    def registry_metadata(self) -> Mapping[str, dict]:
+        """
+        The ``METADATA_REGISTRY`` variables of this dataset's domain, the registry key
+        its name starts with, e.g. ``along_track`` for ``along_track_spatiotemporal``
+        """
+        # imported here, OceanDB.data_access loads the query services, which import
+        # this module
+        from OceanDB.data_access.metadata import METADATA_REGISTRY
+
+        for domain, variables in METADATA_REGISTRY.items():
+            if self.name.startswith(domain):
+                return variables
+        return {}
 
-    def to_netcdf(self):
-        raise NotImplementedError()
+    def to_xarray(
+        self,
+        metadata: Mapping[str, dict] | None = None,
+        dim: str = "obs",
+        scaled: bool = False,
+    ):
+        """
+        The dataset as an ``xarray.Dataset`` of 1-D variables along ``dim``.
+
+        Variables wrap the column arrays without copying them.  Packed columns keep
+        the stored integers with ``scale_factor``, ``add_offset`` and ``_FillValue``
+        attributes and timestamps are viewed as integer microseconds since
+        1970-01-01, as ``xarray.open_dataset(..., decode_cf=False)`` reads them, so
+        ``xarray.decode_cf`` unpacks them lazily.  If ``scaled``, packed columns are
+        unpacked into float copies with a packing encoding and timestamps copied to
+        the nanoseconds xarray decodes them to.  CF attributes and NetCDF encodings
+        come from ``metadata``, by default the domain's ``METADATA_REGISTRY`` entry.
+        """
+        import xarray as xr
+
+        if metadata is None:
+            metadata = self.registry_metadata()
+
+        variables = {}
+        for key in self._data:
+            values = np.asarray(self.column(key, scaled=scaled))
+            field = self.schema.get(key)
+            packed_dtype = None if field is None else field.packed_dtype
+            spec = self.variable_spec(key, metadata)
+            attrs = {k: v for k, v in spec.get("attrs", {}).items() if v is not None}
+            encoding = {}
+            if values.dtype.kind == "M" and scaled:
+                values = values.astype("datetime64[ns]", copy=False)
+                # units and calendar of a time are how it is encoded, not attributes
+                for name in ("units", "calendar"):
+                    if name in attrs:
+                        encoding[name] = attrs.pop(name)
+                encoding["dtype"] = "float64"
+            elif values.dtype.kind == "M":
+                values = values.astype("datetime64[us]", copy=False).view(np.int64)
+                attrs["units"] = RAW_TIME_UNITS
+                attrs["_FillValue"] = np.iinfo(np.int64).min
+            elif packed_dtype is not None:
+                packing = {
+                    "scale_factor": field.scale_factor,
+                    "add_offset": field.add_offset,
+                }
+                if scaled:
+                    encoding.update(
+                        packing, dtype=packed_dtype, _FillValue=field.packed_fill_value
+                    )
+                else:
+                    attrs.update(packing)
+                    if values.dtype.kind in "iu":
+                        attrs["_FillValue"] = field.packed_fill_value
+            elif spec.get("dtype") is not None:
+                # a packed dtype of another kind needs scale_factor, not set here
+                if np.dtype(spec["dtype"]).kind == values.dtype.kind:
+                    encoding["dtype"] = np.dtype(spec["dtype"])
+            if (
+                spec.get("fill_value") is not None
+                and values.dtype.kind in "fiu"
+                and "_FillValue" not in attrs
+                and "_FillValue" not in encoding
+            ):
+                encoding["_FillValue"] = spec["fill_value"]
+
+            variable = xr.Variable(dim, values, attrs=attrs)
+            variable.encoding = encoding
+            variables[key] = variable
+
+        return xr.Dataset(variables, attrs={"title": self.name})
+
+    def to_netcdf(
+        self,
+        path: str | PathLike,
+        metadata: Mapping[str, dict] | None = None,
+        dim: str = "obs",
+    ) -> None:
+        """
+        Write the dataset to a NetCDF file through :meth:`to_xarray`, one variable at
+        a time, so no second copy of the whole dataset is made.  Packed columns are
+        written as stored and timestamps as integer microseconds, no unpacked copy is
+        made either.
+        """
+        self.to_xarray(metadata, dim, scaled=False).to_netcdf(path)
@@ -37,6 +37,8 @@ file_name = OceanDataField(
     python_type=str,
     postgres_type="text",
     postgres_column_or_query_name="file_name",
+    # along_track stores the key of the file in the along_track_file dimension
+    custom_calculation="(SELECT file_name FROM along_track_file WHERE along_track_file.file_id = along_track.file_id)",
 )
 
 mission = OceanDataField(
@@ -46,6 +48,8 @@ mission = OceanDataField(
     python_type=str,
     postgres_type="text",
     postgres_column_or_query_name="mission",
+    # along_track stores the key of the mission in the along_track_mission dimension
+    custom_calculation="(SELECT mission FROM along_track_mission WHERE along_track_mission.mission_id = along_track.mission_id)",
 )
 
 track = OceanDataField(
@@ -154,7 +158,8 @@ distance = OceanDataField(
     python_type=np.float64,
     postgres_type="double precision",
     postgres_column_or_query_name="distance",
-    custom_calculation="ST_Distance(ST_MakePoint(%(longitude)s, %(latitude)s),along_track_point)",
+    # geodesic distance in meters
+    custom_calculation="ST_Distance(ST_SetSRID(ST_MakePoint(%(longitude)s, %(latitude)s), 4326)::geography, along_track_point)",
 )
 
 delta_t = OceanDataField(
@@ -166,3 +171,13 @@ delta_t = OceanDataField(
     postgres_column_or_query_name="delta_t",
     custom_calculation="EXTRACT(EPOCH FROM (%(central_date_time)s - date_time))",
 )
+
+# Position of the query point a row was returned for in a batched (multi-point) query
+point_index = OceanDataField(
+    nc_name="point_index",
+    nc_scale=1,
+    nc_offset=0,
+    python_type=np.int64,
+    postgres_type="integer",
+    postgres_column_or_query_name="point_index",
+)
@@ -1,19 +1,202 @@
 from __future__ import annotations
 
-from typing import Any
+from os import PathLike
+from typing import Any, Iterable, Mapping
+
 import numpy as np
 import netCDF4 as nc
 
+from OceanDB.ocean_data.dataset import Dataset
+from OceanDB.ocean_data.ocean_data import OceanDataField
+
+# Timestamps are written exactly, as integer microseconds
+TIME_UNITS = "microseconds since 2000-01-01 00:00:00"
+TIME_EPOCH = np.datetime64("2000-01-01T00:00:00", "us")
 
-def _infer_len(dataset: Any) -> int:
+
+class NetCDFWriter:
     """
-    Infer the length of the dataset along its primary dimension.
-    Assumes all variables are 1D and share the same length.
+    Appends datasets, e.g. the chunks of a streamed query, to a NetCDF group as
+    variables along an unlimited dimension.
+
+    Variables are chunked and compressed with zlib and the shuffle filter.  Packed
+    fields (see :attr:`OceanDataField.is_packed`) are written as the integers they
+    are stored as in the database, with CF ``scale_factor`` and ``add_offset``
+    attributes, so readers unpack them to physical units.  Timestamps are written
+    as integer microseconds and strings as variable-length strings, which NetCDF
+    cannot compress.
+
+    Variables are created from the first dataset appended, every later dataset must
+    have the same columns::
+
+        with nc.Dataset("export.nc", "w") as ds:
+            writer = NetCDFWriter(ds)
+            for chunk in along_track.geographic_points_in_r_dt_chunks(...):
+                writer.append(chunk)
     """
-    if not dataset.data:
-        return 0
-    first = next(iter(dataset.data.values()))
-    return int(len(first))
+
+    def __init__(
+        self,
+        grp: nc.Dataset | nc.Group,
+        *,
+        dim_name: str = "obs",
+        chunk_size: int = 65536,
+        zlib: bool = True,
+        complevel: int = 4,
+        shuffle: bool = True,
+        schema: Mapping[str, OceanDataField] | None = None,
+        metadata: Mapping[str, dict] | None = None,
+    ):
+        """
+        :param chunk_size: rows per NetCDF chunk
+        :param schema:
+            fields of the columns of datasets without a ``schema``, e.g. the plain
+            dicts of ``AlongTrack.export_chunks``
+        :param metadata:
+            CF attributes of the variables, by default those of the
+            ``METADATA_REGISTRY`` domain of the first dataset
+        """
+        self.grp = grp
+        self.dim_name = dim_name
+        self.chunk_size = chunk_size
+        self.zlib = zlib
+        self.complevel = complevel
+        self.shuffle = shuffle
+        self.schema = schema
+        self.metadata = metadata
+        self.rows = len(grp.dimensions[dim_name]) if dim_name in grp.dimensions else 0
+
+    def append(self, dataset: Mapping[str, Any]) -> int:
+        """
+        Write the rows of ``dataset`` after those already written, returns the number
+        of rows appended
+        """
+        if self.dim_name not in self.grp.dimensions:
+            self.grp.createDimension(self.dim_name, None)
+
+        # packed columns of a Dataset are written as stored
+        if isinstance(dataset, Dataset):
+            dataset_columns = dataset.columns(scaled=False)
+        else:
+            dataset_columns = dict(dataset)
+        columns = {key: np.asarray(values) for key, values in dataset_columns.items()}
+        if not columns:
+            return 0
+        lengths = {len(values) for values in columns.values()}
+        if len(lengths) != 1:
+            raise ValueError("dataset columns have different lengths")
+        n_rows = lengths.pop()
+
+        schema = getattr(dataset, "schema", None) or self.schema or {}
+        for key, values in columns.items():
+            variable = self.grp.variables.get(key)
+            if variable is None:
+                variable = self.create_variable(key, values, schema.get(key), dataset)
+            elif self.dim_name not in variable.dimensions:
+                raise ValueError(f"{key} is not a variable along {self.dim_name}")
+            if n_rows:
+                variable[self.rows : self.rows + n_rows] = self.encode(values, variable)
+
+        missing = [
+            name
+            for name, variable in self.grp.variables.items()
+            if variable.dimensions == (self.dim_name,) and name not in columns
+        ]
+        if missing:
+            raise ValueError(f"dataset is missing the columns {missing}")
+
+        self.rows += n_rows
+        return n_rows
+
+    def write(self, datasets: Iterable[Mapping[str, Any]]) -> int:
+        """
+        Append every dataset of a stream, returns the number of rows written
+        """
+        return sum(self.append(dataset) for dataset in datasets)
+
+    def variable_attrs(
+        self, key: str, field: OceanDataField | None, dataset: Mapping[str, Any]
+    ) -> dict:
+        """
+        CF attributes of a column from the metadata, looked up by column name and
+        then by the NetCDF name of its field
+        """
+        metadata = self.metadata
+        if metadata is None:
+            registry_metadata = getattr(dataset, "registry_metadata", None)
+            metadata = registry_metadata() if registry_metadata else {}
+        spec = metadata.get(key)
+        if spec is None and field is not None:
+            spec = metadata.get(field.nc_name)
+        attrs = (spec or {}).get("attrs", {})
+        return {k: v for k, v in attrs.items() if v is not None}
+
+    def create_variable(
+        self,
+        key: str,
+        values: np.ndarray,
+        field: OceanDataField | None,
+        dataset: Mapping[str, Any],
+    ) -> nc.Variable:
+        attrs = self.variable_attrs(key, field, dataset)
+        packed = field is not None and field.packed_dtype is not None
+
+        fill_value = None
+        if values.dtype.kind == "U":
+            dtype = str
+        elif values.dtype.kind == "M":
+            dtype = np.dtype(np.int64)
+            fill_value = np.iinfo(np.int64).min
+            attrs.update(units=TIME_UNITS, calendar="standard")
+        elif packed:
+            dtype = field.packed_dtype
+            fill_value = field.packed_fill_value
+        elif values.dtype.kind == "b":
+            dtype = np.dtype(np.int8)
+        else:
+            dtype = values.dtype
+            if dtype.kind == "f":
+                fill_value = np.nan
+
+        compress = dtype is not str
+        variable = self.grp.createVariable(
+            key,
+            dtype,
+            (self.dim_name,),
+            zlib=self.zlib and compress,
+            complevel=self.complevel,
+            shuffle=self.shuffle and compress,
+            chunksizes=(self.chunk_size,),
+            fill_value=fill_value,
+        )
+        # values are written already packed, see encode
+        variable.set_auto_maskandscale(False)
+        if packed:
+            attrs.update(scale_factor=field.scale_factor, add_offset=field.add_offset)
+        variable.setncatts(attrs)
+        return variable
+
+    @staticmethod
+    def encode(values: np.ndarray, variable: nc.Variable) -> np.ndarray:
+        """
+        ``values`` as stored in ``variable``: missing values become its fill value and
+        timestamps integer microseconds
+        """
+        if values.dtype.kind == "M":
+            values = values.astype("datetime64[us]")
+            microseconds = (values - TIME_EPOCH).astype(np.int64)
+            microseconds[np.isnat(values)] = variable._FillValue
+            return microseconds
+        if values.dtype.kind == "b":
+            return values.astype(np.int8)
+        if variable.dtype is str or variable.dtype == values.dtype:
+            return values
+
+        # packed integers held as floats, e.g. by plain dicts, with NaN where missing
+        if values.dtype.kind == "f":
+            missing = np.isnan(values)
+            values = np.where(missing, variable._FillValue, np.rint(values))
+        return values.astype(variable.dtype)
 
 
 def write_dataset_to_group(
@@ -23,27 +206,19 @@ def write_dataset_to_group(
     dim_name: str = "obs",
 ) -> None:
     """
-    Serialize a Dataset into an existing NetCDF group.
-
-    Current implementation:
-    - Assumes 1D arrays of equal length
-    - Writes each field as a variable over the 'obs' dimension
+    Serialize a Dataset into an existing NetCDF group, see :class:`NetCDFWriter`
     """
+    NetCDFWriter(grp, dim_name=dim_name).append(dataset)
 
-    n = _infer_len(dataset)
-
-    # Create dimension (unlimited could be nice later; for now fixed length)
-    if dim_name not in grp.dimensions:
-        grp.createDimension(dim_name, n)
-
-    for field, arr in dataset.data.items():
-        # Normalize to numpy array
-        arr_np = np.asarray(arr)
 
-        # NetCDF4 supports numpy dtypes directly in most cases
-        var = grp.createVariable(
-            field,
-            arr_np.dtype,
-            (dim_name,),
-        )
-        var[:] = arr_np
\ No newline at end of file
+def write_datasets_to_netcdf(
+    path: str | PathLike,
+    datasets: Iterable[Mapping[str, Any]],
+    **writer_options,
+) -> int:
+    """
+    Write a stream of datasets to a new NetCDF4 file, holding one dataset in memory
+    at a time.  Returns the number of rows written.
+    """
+    with nc.Dataset(path, "w", format="NETCDF4") as grp:
+        return NetCDFWriter(grp, **writer_options).write(datasets)
@@ -1,6 +1,20 @@
+import re
 from dataclasses import dataclass
+from datetime import datetime
+from typing import Mapping
+
+import numpy as np
 import psycopg.sql as sql
 
+# psycopg named placeholders, e.g. %(longitude)s
+PLACEHOLDER_PATTERN = re.compile(r"%\((\w+)\)s")
+
+# Integer types packed fields are stored as, by postgres type
+PACKED_DTYPES: dict[str, np.dtype] = {
+    "smallint": np.dtype(np.int16),
+    "integer": np.dtype(np.int32),
+}
+
 
 @dataclass
 class OceanDataField:
@@ -12,10 +26,93 @@ class OceanDataField:
     postgres_column_or_query_name: str
     custom_calculation: str | None = None
 
-    def to_sql_query(self):
+    @property
+    def is_packed(self) -> bool:
+        """
+        Whether the database stores the field as integers, the value less
+        ``nc_offset`` times ``nc_scale``, e.g. millimeters for a field in meters
+        """
+        return self.nc_scale != 1 or self.nc_offset != 0
+
+    @property
+    def scale_factor(self) -> float:
+        """
+        CF ``scale_factor`` unpacking the stored integers
+        """
+        return 1 / self.nc_scale
+
+    @property
+    def add_offset(self) -> float:
+        """
+        CF ``add_offset`` unpacking the stored integers
+        """
+        return float(self.nc_offset)
+
+    @property
+    def packed_dtype(self) -> np.dtype | None:
+        """
+        dtype of the stored integers of a packed field, None for other fields
+        """
+        if not self.is_packed:
+            return None
+        return PACKED_DTYPES.get(self.postgres_type)
+
+    @property
+    def packed_fill_value(self) -> int:
+        """
+        Stored integer standing for a missing value, the largest of ``packed_dtype``
+        """
+        return int(np.iinfo(self.packed_dtype).max)
+
+    @property
+    def storage_dtype(self) -> np.dtype:
+        """
+        dtype of the field in a dataset: the stored integers of a packed field,
+        otherwise ``numpy_dtype``
+        """
+        packed_dtype = self.packed_dtype
+        return self.numpy_dtype if packed_dtype is None else packed_dtype
+
+    def unpack(self, values: np.ndarray) -> np.ndarray:
+        """
+        Physical values of the stored ``values`` of a packed field, NaN where they
+        are the fill value.  Values of other fields are returned as they are.
+        """
+        if not self.is_packed:
+            return values
+        # dividing by nc_scale gives the float nearest 1.234 for 1234, multiplying by
+        # scale_factor may be off by one unit in the last place
+        physical = values / self.nc_scale + self.add_offset
+        if values.dtype.kind in "iu" and self.packed_dtype is not None:
+            physical[values == self.packed_fill_value] = np.nan
+        return physical.astype(self.numpy_dtype, copy=False)
+
+    @property
+    def numpy_dtype(self) -> np.dtype:
+        """
+        dtype of the field when decoded into an array, timestamps decode to
+        ``datetime64[us]``
+        """
+        if self.python_type is datetime:
+            return np.dtype("datetime64[us]")
+        return np.dtype(self.python_type)
+
+    def to_sql_query(self, parameters: Mapping[str, str] | None = None):
+        """
+        :param parameters:
+            SQL expressions to substitute for named placeholders in the custom
+            calculation, e.g. ``{"longitude": "query_point.longitude"}`` when the
+            query point is a column of a batched query rather than a parameter.
+        """
         output_name = sql.Identifier(self.postgres_column_or_query_name)
         if self.custom_calculation:
-            postgres_calc = sql.SQL(self.custom_calculation)
+            calculation = self.custom_calculation
+            if parameters:
+                calculation = PLACEHOLDER_PATTERN.sub(
+                    lambda match: parameters.get(match.group(1), match.group(0)),
+                    calculation,
+                )
+            postgres_calc = sql.SQL(calculation)
         else:
             postgres_calc = sql.Identifier(self.postgres_column_or_query_name)
 
@@ -0,0 +1,123 @@
+from os import PathLike
+from typing import Generic, Iterator, Mapping
+
+import netCDF4 as nc
+import numpy as np
+import numpy.typing as npt
+
+from OceanDB.ocean_data.dataset import Dataset, K, T
+from OceanDB.ocean_data.netcdf import NetCDFWriter
+
+
+class RaggedDataset(Generic[K, T]):
+    """
+    The rows of many query points in one dataset, grouped by query point.
+
+    ``rows`` holds the concatenated columns of every point, the rows of point ``i``
+    being ``rows[offsets[i]:offsets[i + 1]]``, so selecting a point is a slice, a
+    view on the shared columns, whatever the number of points.  ``points`` holds
+    columns with one value per query point, e.g. its coordinates.
+
+    Written to NetCDF as a CF contiguous ragged array, see :meth:`to_netcdf`.
+    """
+
+    def __init__(
+        self,
+        *,
+        rows: Dataset[K, T] | None,
+        offsets: npt.NDArray[np.int64],
+        points: Mapping[str, npt.ArrayLike] | None = None,
+    ):
+        self.rows = rows
+        self.offsets = offsets
+        self.points = {key: np.asarray(values) for key, values in (points or {}).items()}
+
+    @classmethod
+    def from_batch(
+        cls,
+        dataset: Dataset[K, T] | None,
+        n_points: int,
+        points: Mapping[str, npt.ArrayLike] | None = None,
+    ) -> "RaggedDataset[K, T]":
+        """
+        Group the result of a batched query, tagged with ``point_index``, by query
+        point.  Rows are reordered, stably, only if they are not already grouped.
+        """
+        if dataset is None:
+            return cls(
+                rows=None, offsets=np.zeros(n_points + 1, dtype=np.int64), points=points
+            )
+
+        point_index = dataset["point_index"]
+        if np.any(np.diff(point_index) < 0):
+            dataset = dataset.select_rows(np.argsort(point_index, kind="stable"))
+            point_index = dataset["point_index"]
+
+        offsets = np.searchsorted(point_index, np.arange(n_points + 1)).astype(np.int64)
+        return cls(rows=dataset, offsets=offsets, points=points)
+
+    @property
+    def row_sizes(self) -> npt.NDArray[np.int64]:
+        """
+        Number of rows of each query point
+        """
+        return np.diff(self.offsets)
+
+    def __len__(self) -> int:
+        # number of query points, not rows
+        return len(self.offsets) - 1
+
+    def __getitem__(self, point: int) -> Dataset[K, T] | None:
+        """
+        A view on the rows of query point ``point``, or None if it matched nothing
+        """
+        point = range(len(self))[point]
+        start, stop = self.offsets[point], self.offsets[point + 1]
+        if stop == start:
+            return None
+        return self.rows.select_rows(slice(start, stop))
+
+    def __iter__(self) -> Iterator[Dataset[K, T] | None]:
+        return (self[point] for point in range(len(self)))
+
+    def to_netcdf(
+        self,
+        path: str | PathLike,
+        *,
+        sample_dim: str = "obs",
+        instance_dim: str = "point",
+        feature_type: str | None = None,
+        **writer_options,
+    ) -> None:
+        """
+        Write the dataset as a CF contiguous ragged array: the row columns along
+        ``sample_dim``, without ``point_index``, and the ``points`` columns along
+        ``instance_dim`` with ``row_size``, the number of rows of each point.
+
+        :param feature_type: CF ``featureType`` global attribute, if any
+        :param writer_options: options of the :class:`NetCDFWriter` of the rows
+        """
+        with nc.Dataset(path, "w", format="NETCDF4") as grp:
+            if self.rows is None:
+                grp.createDimension(sample_dim, 0)
+            else:
+                writer_options.setdefault("schema", self.rows.schema)
+                writer_options.setdefault("metadata", self.rows.registry_metadata())
+                samples = NetCDFWriter(grp, dim_name=sample_dim, **writer_options)
+                # the point of each row is implied by the row sizes
+                columns = self.rows.columns(scaled=False)
+                columns.pop("point_index", None)
+                samples.append(columns)
+
+            instances = NetCDFWriter(grp, dim_name=instance_dim)
+            instances.append(
+                {"row_size": self.row_sizes.astype(np.int32), **self.points}
+            )
+            grp["row_size"].setncatts(
+                {
+                    "long_name": "number of observations for this query point",
+                    "sample_dimension": sample_dim,
+                }
+            )
+            if feature_type is not None:
+                grp.featureType = feature_type
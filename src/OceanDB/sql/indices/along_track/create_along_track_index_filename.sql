@@ -1,4 +1,4 @@
-CREATE INDEX IF NOT EXISTS along_track_file_name_idx
-            ON along_track USING btree
-            (file_name COLLATE pg_catalog."default" ASC NULLS LAST)
+CREATE INDEX IF NOT EXISTS {index_name}
+            ON {table_name} USING btree
+            (file_id ASC NULLS LAST)
             WITH (deduplicate_items=True);
\ No newline at end of file
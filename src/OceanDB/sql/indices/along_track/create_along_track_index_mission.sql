@@ -1,4 +1,4 @@
-CREATE INDEX IF NOT EXISTS along_track_mission_idx
-    ON along_track USING btree
-    (split_part(file_name, '_'::text, 3) COLLATE pg_catalog."default" ASC NULLS LAST)
+CREATE INDEX IF NOT EXISTS {index_name}
+    ON {table_name} USING btree
+    (mission_id ASC NULLS LAST)
     WITH (deduplicate_items=True);
\ No newline at end of file
@@ -1,4 +1,4 @@
-CREATE INDEX IF NOT EXISTS along_track_point_idx
-            ON along_track USING gist
-            (along_track_point)
+CREATE INDEX IF NOT EXISTS {index_name}
+            ON {table_name} USING gist
+            ({point})
             WITH (buffering=auto);
\ No newline at end of file
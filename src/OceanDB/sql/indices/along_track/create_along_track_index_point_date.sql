@@ -1,3 +1,3 @@
-CREATE INDEX IF NOT EXISTS along_track_point_date_idx
-            ON along_track USING gist
-            (along_track_point, date_time);
\ No newline at end of file
+CREATE INDEX IF NOT EXISTS {index_name}
+            ON {table_name} USING gist
+            ({point}, date_time);
\ No newline at end of file
@@ -1,4 +1,4 @@
-CREATE INDEX IF NOT EXISTS along_track_point_date_mission_idx
-    ON along_track USING gist
-    (along_track_point, date_time, split_part(file_name, '_'::text, 3) COLLATE pg_catalog."default")
+CREATE INDEX IF NOT EXISTS {index_name}
+    ON {table_name} USING gist
+    ({point}, date_time, mission_id)
     WITH (buffering=auto);
\ No newline at end of file
@@ -0,0 +1,8 @@
+COPY (
+    SELECT
+    {fields}
+    FROM along_track
+    WHERE date_time >= %(start_date)s
+      AND date_time < %(end_date)s
+      AND mission_id = ANY(%(mission_ids)s::smallint[])
+) TO STDOUT (FORMAT BINARY)
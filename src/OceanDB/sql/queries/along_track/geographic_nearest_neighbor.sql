@@ -4,6 +4,7 @@ FROM along_track
 WHERE date_time BETWEEN %(central_date_time)s - %(time_delta)s::interval
                     AND %(central_date_time)s + %(time_delta)s::interval
   AND basin_id = ANY(%(connected_basin_ids)s)
-  AND mission = ANY(%(missions)s)
-ORDER BY distance
-LIMIT 3;
+  AND mission_id = ANY(%(mission_ids)s::smallint[])
+-- KNN ordering, walks the GiST index on along_track_point nearest first
+ORDER BY along_track_point <-> ST_SetSRID(ST_MakePoint(%(longitude)s, %(latitude)s), 4326)::geography
+LIMIT %(k)s;
@@ -0,0 +1,24 @@
+SELECT
+    query_point.point_index - 1 AS point_index,
+    along_track_result.*
+FROM unnest(
+    %(latitudes)s::double precision[],
+    %(longitudes)s::double precision[],
+    %(central_date_times)s::timestamp[]
+) WITH ORDINALITY AS query_point(latitude, longitude, central_date_time, point_index)
+CROSS JOIN LATERAL (
+    SELECT
+    {fields}
+    FROM along_track
+    WHERE date_time BETWEEN query_point.central_date_time - %(time_delta)s::interval
+                        AND query_point.central_date_time + %(time_delta)s::interval
+      AND basin_id = ANY(
+          (%(connected_basin_ids)s::smallint[])[query_point.point_index:query_point.point_index]
+      )
+      AND mission_id = ANY(%(mission_ids)s::smallint[])
+    -- KNN ordering, walks the GiST index on along_track_point nearest first
+    ORDER BY along_track_point <-> ST_SetSRID(
+        ST_MakePoint(query_point.longitude, query_point.latitude), 4326
+    )::geography
+    LIMIT %(k)s
+) AS along_track_result;
@@ -9,4 +9,4 @@ WHERE ST_DWithin(
 AND date_time BETWEEN %(central_date_time)s - %(time_delta)s::interval
                   AND %(central_date_time)s + %(time_delta)s::interval
 AND basin_id = ANY(%(connected_basin_ids)s)
-AND mission = ANY(%(missions)s);
+AND mission_id = ANY(%(mission_ids)s::smallint[]);
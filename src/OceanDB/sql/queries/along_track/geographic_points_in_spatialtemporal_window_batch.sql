@@ -0,0 +1,25 @@
+SELECT
+    query_point.point_index - 1 AS point_index,
+    along_track_result.*
+FROM unnest(
+    %(latitudes)s::double precision[],
+    %(longitudes)s::double precision[],
+    %(central_date_times)s::timestamp[],
+    %(distances)s::double precision[]
+) WITH ORDINALITY AS query_point(latitude, longitude, central_date_time, distance, point_index)
+CROSS JOIN LATERAL (
+    SELECT
+    {fields}
+    FROM along_track
+    WHERE ST_DWithin(
+        along_track_point::geography,
+        ST_SetSRID(ST_MakePoint(query_point.longitude, query_point.latitude), 4326)::geography,
+        query_point.distance
+    )
+    AND date_time BETWEEN query_point.central_date_time - %(time_delta)s::interval
+                      AND query_point.central_date_time + %(time_delta)s::interval
+    AND basin_id = ANY(
+        (%(connected_basin_ids)s::smallint[])[query_point.point_index:query_point.point_index]
+    )
+    AND mission_id = ANY(%(mission_ids)s::smallint[])
+) AS along_track_result;
@@ -1,5 +1,5 @@
 SELECT
-    atk.file_name,
+    (SELECT file_name FROM along_track_file WHERE along_track_file.file_id = atk.file_id) AS file_name,
     atk.track,
     atk.cycle,
     atk.latitude,
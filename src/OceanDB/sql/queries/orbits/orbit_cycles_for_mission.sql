@@ -3,6 +3,6 @@ SELECT
     MIN(date_time) AS start_time,
     MAX(date_time) AS end_time
 FROM along_track
-WHERE split_part(file_name, '_', 3) = %(mission)s
+WHERE mission_id = (SELECT mission_id FROM along_track_mission WHERE mission = %(mission)s)
 GROUP BY cycle
 ORDER BY cycle;
\ No newline at end of file
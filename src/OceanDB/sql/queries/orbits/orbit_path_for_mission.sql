@@ -3,5 +3,5 @@ SELECT
 	latitude,
 	longitude
 FROM along_track
-WHERE split_part(file_name, '_', 3) = %(mission)s AND cycle = %(cycle)s
+WHERE mission_id = (SELECT mission_id FROM along_track_mission WHERE mission = %(mission)s) AND cycle = %(cycle)s
 ORDER BY date_time;
\ No newline at end of file
@@ -0,0 +1,22 @@
+CREATE TABLE IF NOT EXISTS public.{table_name}
+(
+    file_id integer NOT NULL,
+    mission_id smallint NOT NULL,
+    track smallint,
+    cycle smallint,
+    -- micro-degrees, decoded by the along_track view
+    latitude integer NOT NULL,
+    longitude integer NOT NULL,
+    sla_unfiltered smallint,
+    sla_filtered smallint,
+    date_time timestamp without time zone NOT NULL,
+    dac smallint,
+    ocean_tide smallint,
+    internal_tide smallint,
+    lwe smallint,
+    mdt smallint,
+    tpa_correction smallint,
+    basin_id smallint NOT NULL,
+    -- NO DUPLICATES, the key doubles as the unique spatiotemporal constraint
+    CONSTRAINT {primary_key_name} PRIMARY KEY ({primary_key})
+) PARTITION BY RANGE (date_time)
\ No newline at end of file
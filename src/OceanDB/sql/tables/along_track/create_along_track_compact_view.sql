@@ -0,0 +1,21 @@
+CREATE OR REPLACE VIEW public.{view_name} AS
+SELECT
+    file_id,
+    mission_id,
+    track,
+    cycle,
+    latitude::double precision / 1000000 AS latitude,
+    longitude::double precision / 1000000 AS longitude,
+    sla_unfiltered,
+    sla_filtered,
+    date_time,
+    dac,
+    ocean_tide,
+    internal_tide,
+    lwe,
+    mdt,
+    tpa_correction,
+    basin_id,
+    -- Not stored, the spatial indices are built on this expression
+    {point} AS along_track_point
+FROM public.{table_name}
\ No newline at end of file
@@ -0,0 +1,8 @@
+CREATE TABLE IF NOT EXISTS public.{table_name}
+(
+    file_id integer NOT NULL GENERATED BY DEFAULT AS IDENTITY,
+    file_name text COLLATE pg_catalog."default" NOT NULL,
+    mission_id smallint NOT NULL REFERENCES along_track_mission (mission_id),
+    CONSTRAINT along_track_file_pkey PRIMARY KEY (file_id),
+    CONSTRAINT along_track_file_unique UNIQUE (file_name)
+)
\ No newline at end of file
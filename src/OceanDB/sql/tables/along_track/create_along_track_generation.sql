@@ -0,0 +1,27 @@
+-- Generation of the ingested files: a counter bumped whenever the file metadata
+-- table changes, so readers learn of new ingests without scanning it
+CREATE TABLE IF NOT EXISTS public.{generation_table_name} (
+    generation bigint NOT NULL
+);
+
+INSERT INTO public.{generation_table_name} (generation)
+SELECT 0 WHERE NOT EXISTS (SELECT FROM public.{generation_table_name});
+
+CREATE OR REPLACE FUNCTION public.{function_name}() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    UPDATE public.{generation_table_name} SET generation = generation + 1;
+    RETURN NULL;
+END
+$$;
+
+-- Deferred to commit, so the generation changes together with the files it marks
+-- and concurrent ingests only contend for the counter row while they commit
+CREATE OR REPLACE CONSTRAINT TRIGGER {trigger_name}
+AFTER INSERT OR UPDATE OR DELETE ON public.{table_name}
+DEFERRABLE INITIALLY DEFERRED
+FOR EACH ROW EXECUTE FUNCTION public.{function_name}();
+
+CREATE OR REPLACE TRIGGER {truncate_trigger_name}
+AFTER TRUNCATE ON public.{table_name}
+FOR EACH STATEMENT EXECUTE FUNCTION public.{function_name}();
@@ -0,0 +1,7 @@
+CREATE TABLE IF NOT EXISTS public.{table_name}
+(
+    mission_id smallint NOT NULL GENERATED BY DEFAULT AS IDENTITY,
+    mission text NOT NULL,
+    CONSTRAINT along_track_mission_pkey PRIMARY KEY (mission_id),
+    CONSTRAINT along_track_mission_unique UNIQUE (mission)
+)
\ No newline at end of file
@@ -0,0 +1,19 @@
+CREATE UNLOGGED TABLE IF NOT EXISTS public.{table_name}
+(
+    file_id integer NOT NULL,
+    mission_id smallint NOT NULL,
+    track smallint,
+    cycle smallint,
+    latitude {coordinate_type},
+    longitude {coordinate_type},
+    sla_unfiltered smallint,
+    sla_filtered smallint,
+    date_time timestamp without time zone,
+    dac smallint,
+    ocean_tide smallint,
+    internal_tide smallint,
+    lwe smallint,
+    mdt smallint,
+    tpa_correction smallint,
+    basin_id smallint NOT NULL
+)
\ No newline at end of file
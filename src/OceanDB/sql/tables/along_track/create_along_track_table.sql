@@ -1,8 +1,8 @@
 CREATE TABLE IF NOT EXISTS public.{table_name}
 (
     id bigint NOT NULL GENERATED ALWAYS AS IDENTITY ( INCREMENT 1 START 1 MINVALUE 1 MAXVALUE 9223372036854775807 CACHE 1 ),
-    file_name text COLLATE pg_catalog."default",
-    mission text,
+    file_id integer NOT NULL,
+    mission_id smallint NOT NULL,
     track smallint,
     cycle smallint,
     latitude double precision,
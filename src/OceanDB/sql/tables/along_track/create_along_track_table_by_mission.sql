@@ -0,0 +1,26 @@
+CREATE TABLE IF NOT EXISTS public.{table_name}
+(
+    id bigint NOT NULL GENERATED ALWAYS AS IDENTITY ( INCREMENT 1 START 1 MINVALUE 1 MAXVALUE 9223372036854775807 CACHE 1 ),
+    file_id integer NOT NULL,
+    mission_id smallint NOT NULL,
+    track smallint,
+    cycle smallint,
+    latitude double precision,
+    longitude double precision,
+    sla_unfiltered smallint,
+    sla_filtered smallint,
+    date_time timestamp without time zone,
+    dac smallint,
+    ocean_tide smallint,
+    internal_tide smallint,
+    lwe smallint,
+    mdt smallint,
+    tpa_correction smallint,
+    basin_id smallint NOT NULL,
+    along_track_point geography(Point,4326) GENERATED ALWAYS AS (ST_SetSRID(ST_MakePoint(longitude, latitude), 4326)::geography) STORED,
+    -- Unique constraints on a partitioned table must contain every partition key,
+    -- so mission_id is part of both keys in this layout
+    CONSTRAINT cop_along_pkey PRIMARY KEY (date_time, mission_id, id),
+    -- NO DUPLICATES (within a mission, the staging merge drops those of two missions)
+    CONSTRAINT along_track_unique_spatiotemporal UNIQUE (date_time, latitude, longitude, mission_id)
+) PARTITION BY RANGE (date_time)
\ No newline at end of file
@@ -0,0 +1 @@
+CREATE TABLE IF NOT EXISTS {partition_name} PARTITION OF {table_name} DEFAULT;
\ No newline at end of file
@@ -0,0 +1 @@
+CREATE TABLE IF NOT EXISTS {partition_name} PARTITION OF {table_name} FOR VALUES IN ({value});
\ No newline at end of file
@@ -0,0 +1 @@
+CREATE TABLE IF NOT EXISTS {partition_name} PARTITION OF {table_name} FOR VALUES FROM ({min_partition_date}) TO ({max_partition_date}) PARTITION BY LIST ({sub_partition_column});
\ No newline at end of file
@@ -0,0 +1,106 @@
+from typing import IO, Iterable
+
+import numpy as np
+import numpy.typing as npt
+
+
+class BasinConnections:
+    """
+    Ocean basin connectivity in compressed sparse row form.
+
+    The basins connected to basin ``b`` are ``ids[offsets[b]:offsets[b + 1]]``,
+    starting with ``b`` itself.  Basins absent from the connection table, e.g. land,
+    have no connections, not even to themselves.  Every lookup is a slice or a
+    vectorized gather, no database round trip is involved.
+    """
+
+    def __init__(self, offsets: npt.NDArray[np.int64], ids: npt.NDArray[np.int16]):
+        self.offsets = offsets
+        self.ids = ids
+
+    @classmethod
+    def from_pairs(
+        cls, basin_ids: npt.ArrayLike, connected_ids: npt.ArrayLike
+    ) -> "BasinConnections":
+        """
+        Build the connectivity from the ``(basin_id, connected_id)`` rows of the
+        basin_connections table, ignoring duplicate rows
+        """
+        pairs = np.column_stack(
+            [
+                np.asarray(basin_ids, dtype=np.int64),
+                np.asarray(connected_ids, dtype=np.int64),
+            ]
+        )
+        listed = np.unique(pairs[:, 0])
+        # every listed basin is connected to itself, first in its row
+        self_pairs = np.column_stack([listed, listed])
+        pairs = np.unique(np.concatenate([self_pairs, pairs]), axis=0)
+        is_self = pairs[:, 0] == pairs[:, 1]
+        pairs = pairs[np.lexsort((pairs[:, 1], ~is_self, pairs[:, 0]))]
+
+        n_basins = int(pairs.max()) + 1
+        counts = np.bincount(pairs[:, 0], minlength=n_basins)
+        offsets = np.zeros(n_basins + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+        return cls(offsets=offsets, ids=pairs[:, 1].astype(np.int16))
+
+    @classmethod
+    def from_csv(cls, f: IO) -> "BasinConnections":
+        """
+        Read ``ocean_basin_connections.csv``, rows of ``basinid,connected_basin``
+        """
+        pairs = np.loadtxt(f, delimiter=",", skiprows=1, dtype=np.int64, ndmin=2)
+        return cls.from_pairs(pairs[:, 0], pairs[:, 1])
+
+    @property
+    def n_basins(self) -> int:
+        return len(self.offsets) - 1
+
+    def counts(self, basin_ids: npt.ArrayLike) -> npt.NDArray[np.int64]:
+        """
+        Number of basins connected to each of ``basin_ids``, 0 for unknown basins
+        """
+        basin_ids = np.asarray(basin_ids, dtype=np.int64)
+        known = (basin_ids >= 0) & (basin_ids < self.n_basins)
+        safe_ids = np.where(known, basin_ids, 0)
+        return np.where(known, self.offsets[safe_ids + 1] - self.offsets[safe_ids], 0)
+
+    def __contains__(self, basin_id) -> bool:
+        return bool(self.counts([basin_id])[0])
+
+    def __getitem__(self, basin_id: int) -> npt.NDArray[np.int16]:
+        """
+        Basins connected to ``basin_id``, empty if it has none
+        """
+        if basin_id not in self:
+            return self.ids[:0]
+        return self.ids[self.offsets[basin_id] : self.offsets[basin_id + 1]]
+
+    def padded(self, basin_ids: npt.ArrayLike, fill: int = -1) -> npt.NDArray[np.int16]:
+        """
+        Basins connected to each of ``basin_ids`` as the rows of a 2-D array, padded
+        with ``fill`` to the longest row and at least one column wide
+        """
+        basin_ids = np.asarray(basin_ids, dtype=np.int64)
+        counts = self.counts(basin_ids)
+        width = max(1, int(counts.max(initial=0)))
+        columns = np.arange(width)
+        starts = self.offsets[np.clip(basin_ids, 0, self.n_basins - 1)]
+        positions = np.minimum(starts[:, None] + columns, len(self.ids) - 1)
+        return np.where(columns < counts[:, None], self.ids[positions], np.int16(fill))
+
+    def lists(self, basin_ids: Iterable[int]) -> list[list[int]]:
+        """
+        Basins connected to each of ``basin_ids`` as Python lists
+        """
+        return [self[int(basin_id)].tolist() for basin_id in basin_ids]
+
+    def to_dict(self) -> dict[int, list[int]]:
+        """
+        ``{basin_id: connected basin ids}`` for every basin with connections
+        """
+        return {
+            basin_id: self[basin_id].tolist()
+            for basin_id in np.flatnonzero(np.diff(self.offsets)).tolist()
+        }
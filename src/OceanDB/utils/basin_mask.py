@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+from importlib import resources
+import os
+from pathlib import Path
+import tempfile
+from typing import TYPE_CHECKING
+
+import netCDF4 as nc
+import numpy as np
+import numpy.typing as npt
+
+if TYPE_CHECKING:
+    # importlib.resources.abc only exists from Python 3.11
+    from importlib.resources.abc import Traversable
+
+
+def decode_basin_mask(source: Traversable) -> npt.NDArray:
+    """
+    The ``basinmask`` variable of a basin mask NetCDF file
+    """
+    ds = nc.Dataset("inmemory.nc", memory=source.read_bytes())
+    try:
+        ds.set_auto_mask(False)
+        return ds.variables["basinmask"][:]
+    finally:
+        ds.close()
+
+
+def load_basin_mask(source: Traversable, cache_directory: Path) -> np.memmap:
+    """
+    The basin mask of the NetCDF file ``source`` as a read-only memory map.
+
+    The first call decodes the NetCDF file into an ``.npy`` file in
+    ``cache_directory``, named after the size and modification time of ``source`` so
+    a new mask is converted again.  Later calls, from any process, only map that
+    file: the operating system shares its pages between processes, so however many
+    workers read the mask there is one physical copy and no decode.
+    """
+    with resources.as_file(source) as path:
+        stat = path.stat()
+    cache_path = cache_directory / f"basin_mask_{stat.st_size}_{stat.st_mtime_ns}.npy"
+
+    if not cache_path.exists():
+        cache_directory.mkdir(parents=True, exist_ok=True)
+        basin_mask = decode_basin_mask(source)
+        # concurrent conversions each write their own file, the last rename wins
+        descriptor, temporary_path = tempfile.mkstemp(
+            dir=cache_directory, suffix=".tmp"
+        )
+        try:
+            with os.fdopen(descriptor, "wb") as f:
+                np.save(f, basin_mask)
+            os.replace(temporary_path, cache_path)
+        except BaseException:
+            Path(temporary_path).unlink(missing_ok=True)
+            raise
+
+    return np.load(cache_path, mmap_mode="r")
@@ -0,0 +1,216 @@
+import struct
+from typing import Sequence
+
+import numpy as np
+import numpy.typing as npt
+
+# https://www.postgresql.org/docs/current/sql-copy.html#id-1.9.3.55.9.4
+PGCOPY_HEADER = b"PGCOPY\n\xff\r\n\x00" + struct.pack("!ii", 0, 0)
+PGCOPY_TRAILER = struct.pack("!h", -1)
+
+# Postgres stores timestamps as microseconds since 2000-01-01
+PG_EPOCH = np.datetime64("2000-01-01T00:00:00", "us")
+
+# Big-endian wire formats for the fixed-width postgres types we COPY
+PG_BINARY_DTYPES: dict[str, str] = {
+    "smallint": ">i2",
+    "integer": ">i4",
+    "bigint": ">i8",
+    "real": ">f4",
+    "double precision": ">f8",
+    "timestamp": ">i8",
+    "boolean": "u1",
+}
+
+
+def _to_wire(
+    values: npt.ArrayLike, postgres_type: str
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Convert a column into its big-endian wire representation and a null mask.
+    """
+    mask = np.ma.getmaskarray(values)
+    data = np.ma.getdata(values)
+
+    if postgres_type == "timestamp" and np.issubdtype(data.dtype, np.datetime64):
+        mask = mask | np.isnat(data)
+        data = (data.astype("datetime64[us]") - PG_EPOCH).astype(np.int64)
+
+    return np.asarray(data).astype(PG_BINARY_DTYPES[postgres_type]), mask
+
+
+def encode_binary_copy(
+    columns: Sequence[tuple[npt.ArrayLike | str, str]],
+    n_rows: int,
+    *,
+    header: bool = True,
+    trailer: bool = True,
+) -> bytes:
+    """
+    Encode columnar data as a PostgreSQL binary COPY stream.
+
+    Rows are assembled as a single ``(n_rows, row_width)`` byte matrix so that no
+    Python object is created per row.  Masked values (e.g. netCDF fill values) are
+    written as NULL.
+
+    :param columns:
+        ``(values, postgres_type)`` pairs, in the order of the COPY column list.
+        ``values`` is either an array of length ``n_rows`` or, for ``text`` columns,
+        a single string repeated on every row (e.g. the file name).
+
+    :param n_rows:
+        number of rows to encode
+
+    :param header:
+        prepend the PGCOPY signature. Set to False when appending to an open stream.
+
+    :param trailer:
+        append the end-of-data marker. Set to False when more rows will follow.
+    """
+    parts = [np.full((n_rows, 1), len(columns), dtype=">i2").view(np.uint8)]
+    null_masks = []
+
+    for values, postgres_type in columns:
+        if postgres_type == "text":
+            encoded = str(values).encode("utf-8")
+            field = np.empty((n_rows, 4 + len(encoded)), dtype=np.uint8)
+            field[:, :4] = np.frombuffer(
+                struct.pack("!i", len(encoded)), dtype=np.uint8
+            )
+            field[:, 4:] = np.frombuffer(encoded, dtype=np.uint8)
+            parts.append(field)
+            null_masks.append(None)
+            continue
+
+        data, mask = _to_wire(values, postgres_type)
+        width = data.dtype.itemsize
+        length = np.full(n_rows, width, dtype=">i4")
+        length[mask] = -1
+        parts.append(length.view(np.uint8).reshape(n_rows, 4))
+        parts.append(data.view(np.uint8).reshape(n_rows, width))
+        null_masks.append(mask if mask.any() else None)
+
+    rows = np.hstack(parts)
+
+    if any(mask is not None for mask in null_masks):
+        # NULL fields carry a length of -1 and no payload, so drop their data bytes
+        keep = np.ones(rows.shape, dtype=bool)
+        offset = 2
+        for (values, postgres_type), mask in zip(columns, null_masks):
+            if postgres_type == "text":
+                offset += 4 + len(str(values).encode("utf-8"))
+                continue
+            width = np.dtype(PG_BINARY_DTYPES[postgres_type]).itemsize
+            if mask is not None:
+                keep[mask, offset + 4 : offset + 4 + width] = False
+            offset += 4 + width
+        payload = rows[keep].tobytes()
+    else:
+        payload = rows.tobytes()
+
+    return (
+        (PGCOPY_HEADER if header else b"")
+        + payload
+        + (PGCOPY_TRAILER if trailer else b"")
+    )
+
+
+class BinaryCopyDecoder:
+    """
+    Incrementally decode a PostgreSQL binary COPY stream into NumPy columns.
+
+    Every column must be fixed width and never NULL, so that all rows have the same
+    length and a block of complete rows can be viewed as a structured array without
+    parsing row by row.  Feed the stream in blocks of any size with :meth:`feed`,
+    decode the rows buffered so far with :meth:`take`, then call :meth:`finish` to
+    check that the stream ended with the end-of-data marker.
+    """
+
+    def __init__(self, columns: Sequence[tuple[str, str]]):
+        """
+        :param columns:
+            ``(name, postgres_type)`` pairs, in the order of the COPY column list.
+        """
+        self.columns = list(columns)
+        self.row_dtype = np.dtype(
+            [("field_count", ">i2")]
+            + [
+                field
+                for name, postgres_type in self.columns
+                for field in [
+                    (f"{name}_length", ">i4"),
+                    (name, PG_BINARY_DTYPES[postgres_type]),
+                ]
+            ]
+        )
+        self.buffer = bytearray()
+        self.header_read = False
+        self.rows = 0
+
+    def feed(self, data: bytes) -> None:
+        """
+        Buffer a block of the stream.  Postgres sends one block per row, so rows are
+        only decoded by :meth:`take`.
+        """
+        self.buffer += data
+
+    def take(self) -> dict[str, np.ndarray]:
+        """
+        Decode the complete rows buffered so far.  Returns a dict of native-endian
+        column arrays, possibly holding no rows.
+        """
+        if not self.header_read and not self._read_header():
+            return self._decode(0)
+        return self._decode(len(self.buffer) // self.row_dtype.itemsize)
+
+    def finish(self) -> None:
+        """
+        Check that the stream ended with the end-of-data marker and no partial row
+        """
+        if not self.header_read or bytes(self.buffer) != PGCOPY_TRAILER:
+            raise ValueError("Binary COPY stream ended in the middle of a row")
+
+    def _read_header(self) -> bool:
+        signature_length = len(PGCOPY_HEADER) - 8
+        if len(self.buffer) < len(PGCOPY_HEADER):
+            return False
+        if bytes(self.buffer[:signature_length]) != PGCOPY_HEADER[:signature_length]:
+            raise ValueError("Not a binary COPY stream")
+
+        extension_length = struct.unpack_from("!i", self.buffer, signature_length + 4)[
+            0
+        ]
+        header_length = len(PGCOPY_HEADER) + extension_length
+        if len(self.buffer) < header_length:
+            return False
+
+        del self.buffer[:header_length]
+        self.header_read = True
+        return True
+
+    def _decode(self, n_rows: int) -> dict[str, np.ndarray]:
+        # the end-of-data marker is shorter than a row, so it is never decoded
+        size = n_rows * self.row_dtype.itemsize
+        records = np.frombuffer(bytes(self.buffer[:size]), dtype=self.row_dtype)
+        del self.buffer[:size]
+
+        if n_rows and (records["field_count"] != len(self.columns)).any():
+            raise ValueError("Unexpected field count in binary COPY stream")
+
+        columns = {}
+        for name, postgres_type in self.columns:
+            width = np.dtype(PG_BINARY_DTYPES[postgres_type]).itemsize
+            if n_rows and (records[f"{name}_length"] != width).any():
+                raise ValueError(f"Column {name} has NULL or variable width values")
+            values = records[name]
+            if postgres_type == "timestamp":
+                columns[name] = PG_EPOCH + values.astype(np.int64).astype(
+                    "timedelta64[us]"
+                )
+            elif postgres_type == "boolean":
+                columns[name] = values.astype(bool)
+            else:
+                columns[name] = values.astype(values.dtype.newbyteorder("="))
+
+        self.rows += n_rows
+        return columns
@@ -0,0 +1,98 @@
+from datetime import datetime, timezone
+
+import netCDF4 as nc
+import numpy as np
+import numpy.typing as npt
+
+UNIX_EPOCH = np.datetime64("1970-01-01T00:00:00", "us")
+
+# Length of each CF time unit in microseconds
+CF_UNIT_MICROSECONDS: dict[str, int] = {
+    "microseconds": 1,
+    "microsecond": 1,
+    "milliseconds": 1_000,
+    "millisecond": 1_000,
+    "seconds": 1_000_000,
+    "second": 1_000_000,
+    "s": 1_000_000,
+    "minutes": 60_000_000,
+    "minute": 60_000_000,
+    "hours": 3_600_000_000,
+    "hour": 3_600_000_000,
+    "days": 86_400_000_000,
+    "day": 86_400_000_000,
+}
+
+# Calendars that numpy's proleptic gregorian datetime64 represents exactly
+STANDARD_CALENDARS = {"standard", "gregorian", "proleptic_gregorian"}
+
+
+def parse_cf_time_units(units: str) -> tuple[int, np.datetime64]:
+    """
+    Split CF time units, e.g. ``days since 1950-01-01 00:00:00``, into the length of
+    one unit in microseconds and the reference date as ``datetime64[us]``.
+    """
+    unit, separator, reference = units.strip().partition(" since ")
+    if not separator or unit.lower() not in CF_UNIT_MICROSECONDS:
+        raise ValueError(f"Unsupported CF time units: {units!r}")
+
+    reference = reference.strip()
+    if reference.endswith(" UTC"):
+        reference = reference[: -len(" UTC")]
+    reference_date = datetime.fromisoformat(reference.replace("Z", "+00:00"))
+    if reference_date.tzinfo is not None:
+        reference_date = reference_date.astimezone(timezone.utc).replace(tzinfo=None)
+
+    return CF_UNIT_MICROSECONDS[unit.lower()], np.datetime64(reference_date, "us")
+
+
+def netcdf_time_to_datetime64(
+    values: npt.ArrayLike, units: str, calendar: str = "standard"
+) -> npt.NDArray[np.datetime64]:
+    """
+    Decode a NetCDF time variable into a naive ``datetime64[us]`` array.
+
+    Units of the form ``<unit> since <date>`` are decoded with array arithmetic,
+    anything else falls back to ``netCDF4.num2date``.  Masked values decode to ``NaT``.
+
+    :param values:
+        raw time values, e.g. ``ds.variables["time"][:]``
+
+    :param units:
+        CF units attribute of the time variable
+
+    :param calendar:
+        CF calendar attribute of the time variable
+    """
+    if calendar.lower() not in STANDARD_CALENDARS:
+        raise ValueError(f"Calendar {calendar!r} cannot be decoded to datetime64")
+
+    try:
+        unit_microseconds, reference_date = parse_cf_time_units(units)
+    except ValueError:
+        date_times = nc.num2date(
+            values,
+            units,
+            calendar=calendar,
+            only_use_cftime_datetimes=False,
+            only_use_python_datetimes=True,
+        )
+        return np.ma.filled(
+            np.ma.asarray(date_times, dtype="datetime64[us]"),
+            fill_value=np.datetime64("NaT"),
+        )
+
+    mask = np.ma.getmaskarray(values)
+    offsets = np.rint(np.ma.getdata(values).astype(np.float64) * unit_microseconds)
+    offsets[mask] = 0
+    date_times = reference_date + offsets.astype("timedelta64[us]")
+    date_times[mask] = np.datetime64("NaT")
+    return date_times
+
+
+def unix_seconds_to_datetime64(values: npt.ArrayLike) -> npt.NDArray[np.datetime64]:
+    """
+    Convert integer Unix seconds into a naive (UTC) ``datetime64[us]`` array.
+    """
+    seconds = np.ma.getdata(values).astype(np.int64)
+    return UNIX_EPOCH + seconds.astype("timedelta64[s]")
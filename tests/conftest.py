@@ -0,0 +1,16 @@
+import pytest
+
+
+@pytest.fixture
+def oceandb_env(monkeypatch):
+    """
+    Minimal settings so OceanDB classes can be constructed without a .env file.
+    Returns monkeypatch, so tests can override further settings.
+    """
+    monkeypatch.setenv("POSTGRES_USERNAME", "postgres")
+    monkeypatch.setenv("POSTGRES_PASSWORD", "postgres")
+    monkeypatch.setenv("ALONG_TRACK_DATA_DIRECTORY", "/tmp")
+    monkeypatch.setenv("EDDY_DATA_DIRECTORY", "/tmp")
+    monkeypatch.setenv("COPERNICUS_USERNAME", "")
+    monkeypatch.setenv("COPERNICUS_PASSWORD", "")
+    return monkeypatch
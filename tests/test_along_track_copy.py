@@ -0,0 +1,180 @@
+import struct
+from contextlib import contextmanager
+
+import numpy as np
+
+from OceanDB.etl import AlongTrackETL
+from OceanDB.etl.along_track_etl import AlongTrackData
+from OceanDB.utils.binary_copy import PGCOPY_HEADER
+
+
+class RecordingCopy:
+    def __init__(self):
+        self.payload = b""
+
+    def write(self, data):
+        self.payload += data
+
+
+class RecordingCursor:
+    def __init__(self):
+        self.copies = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    @contextmanager
+    def copy(self, query):
+        copy = RecordingCopy()
+        self.copies.append(copy)
+        yield copy
+
+
+class RecordingConnection:
+    def __init__(self):
+        self.recording_cursor = RecordingCursor()
+
+    def cursor(self):
+        return self.recording_cursor
+
+
+def along_track_data(n_rows: int) -> AlongTrackData:
+    int16 = np.arange(n_rows, dtype=np.int16)
+    return AlongTrackData(
+        file_name="dt_global_j3_phy_l3_1hz_20190102_20240205.nc",
+        mission="j3",
+        time=np.array(["2019-01-02T00:00:00"] * n_rows, dtype="datetime64[us]"),
+        latitude=np.linspace(-60, 60, n_rows),
+        longitude=np.linspace(0, 360, n_rows),
+        cycle=int16,
+        track=int16,
+        sla_unfiltered=int16,
+        sla_filtered=int16,
+        dac=int16,
+        ocean_tide=int16,
+        internal_tide=int16,
+        lwe=int16,
+        mdt=int16,
+        tpa_correction=int16,
+        basin_id=int16,
+        file_id=70_000,
+        mission_id=19,
+    )
+
+
+def test_copy_writes_dimension_keys(oceandb_env):
+    """
+    TEST file_name & mission are written as their integer dimension keys
+    """
+    connection = RecordingConnection()
+    AlongTrackETL().copy_along_track_data_to_postgresql(
+        along_track_data(3), connection=connection
+    )
+
+    (copy,) = connection.recording_cursor.copies
+    first_row = copy.payload[len(PGCOPY_HEADER) :]
+    n_fields, file_id_length, file_id = struct.unpack("!hii", first_row[:10])
+    mission_id_length, mission_id = struct.unpack("!ih", first_row[10:16])
+
+    assert n_fields == len(AlongTrackETL.along_track_copy_columns)
+    assert (file_id_length, file_id) == (4, 70_000)
+    assert (mission_id_length, mission_id) == (2, 19)
+
+
+def test_compact_rows_copy_micro_degrees(oceandb_env):
+    """
+    TEST the compact layout writes integer micro-degree coordinates to its table
+    """
+    oceandb_env.setenv("ALONG_TRACK_COMPACT_ROWS", "true")
+    etl = AlongTrackETL()
+    data = along_track_data(2)
+    data.latitude = np.array([-59.123456, 12.5])
+    data.longitude = np.array([359.999999, 0.000001])
+
+    connection = RecordingConnection()
+    etl.copy_along_track_data_to_postgresql(data, connection=connection)
+
+    (copy,) = connection.recording_cursor.copies
+    first_row = copy.payload[len(PGCOPY_HEADER) :]
+    coordinates = struct.unpack("!iiii", first_row[28:44])
+
+    assert etl.along_track_table_name == "along_track_compact"
+    assert coordinates == (4, -59_123_456, 4, 359_999_999)
+
+
+class ExecutingCursor(RecordingCursor):
+    rowcount = 0
+
+    def __init__(self):
+        super().__init__()
+        self.executed = []
+
+    def execute(self, query, params):
+        self.executed.append((query.as_string(None), params))
+
+
+def test_delete_file_rows_ignores_missing_times(oceandb_env):
+    """
+    TEST the delete bounds skip NaT, and a file without valid times deletes by file
+    name only
+    """
+    etl = AlongTrackETL()
+    connection = RecordingConnection()
+    connection.recording_cursor = ExecutingCursor()
+    data = along_track_data(3)
+    data.time[1] = np.datetime64("NaT")
+
+    etl.delete_along_track_file_rows(data, connection=connection)
+    data.time[:] = np.datetime64("NaT")
+    etl.delete_along_track_file_rows(data, connection=connection)
+
+    (bounded, bounded_params), (by_file, by_file_params) = (
+        connection.recording_cursor.executed
+    )
+    assert "BETWEEN" in bounded
+    assert bounded_params["min_date_time"] is not None
+    assert bounded_params["max_date_time"] is not None
+    assert "BETWEEN" not in by_file
+    assert "WHERE file_name = %(file_name)s" in by_file
+    assert by_file_params == {"file_name": data.file_name}
+
+
+def test_write_file_cleans_up_before_registering(oceandb_env):
+    """
+    TEST rows of an earlier attempt are deleted before the file is registered again
+    """
+    calls = []
+
+    class OrderedETL(AlongTrackETL):
+        def ensure_along_track_partitions(self, along_track_data):
+            pass
+
+        def along_track_mission_ids(self, missions):
+            return {"j3": 19}
+
+        def import_metadata_to_psql(self, metadata, connection=None):
+            return True
+
+        def delete_along_track_file_rows(self, along_track_data, connection=None):
+            calls.append(("delete", along_track_data.file_id))
+
+        def register_along_track_file(self, along_track_data, connection=None):
+            calls.append(("register", along_track_data.file_id))
+            return 70_001
+
+        def copy_along_track_data_to_postgresql(self, along_track_data, connection):
+            calls.append(("copy", along_track_data.file_id))
+            return 3
+
+    data = along_track_data(3)
+    data.file_id = None
+
+    n_rows = OrderedETL().write_along_track_file(
+        data, None, connection=RecordingConnection()
+    )
+
+    assert n_rows == 3
+    assert calls == [("delete", None), ("register", None), ("copy", 70_001)]
@@ -0,0 +1,171 @@
+from contextlib import contextmanager
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from OceanDB.data_access.along_track import AlongTrack
+from OceanDB.utils.binary_copy import (
+    PG_EPOCH,
+    BinaryCopyDecoder,
+    encode_binary_copy,
+)
+
+
+def copy_stream() -> bytes:
+    times = np.array(
+        ["2019-01-02T00:00:00", "2019-01-02T00:00:01"], dtype="datetime64[us]"
+    )
+    # the last timestamp is -infinity, exported for NULL
+    microseconds = np.append(
+        (times - PG_EPOCH).astype(np.int64), np.iinfo(np.int64).min
+    )
+    return encode_binary_copy(
+        [
+            (np.array([2, 1, 2], dtype=np.int16), "smallint"),
+            (microseconds, "timestamp"),
+            (np.array([0.5, np.nan, -1.25]), "double precision"),
+        ],
+        n_rows=3,
+    )
+
+
+def test_binary_copy_decoder_round_trip():
+    """
+    TEST a binary COPY stream fed in arbitrary blocks decodes into native columns
+    """
+    payload = copy_stream()
+    decoder = BinaryCopyDecoder(
+        [
+            ("mission", "smallint"),
+            ("date_time", "timestamp"),
+            ("sla", "double precision"),
+        ]
+    )
+
+    chunks = []
+    for start in range(0, len(payload), 7):
+        decoder.feed(payload[start : start + 7])
+        chunks.append(decoder.take())
+    decoder.finish()
+
+    mission = np.concatenate([chunk["mission"] for chunk in chunks])
+    date_time = np.concatenate([chunk["date_time"] for chunk in chunks])
+    sla = np.concatenate([chunk["sla"] for chunk in chunks])
+
+    assert decoder.rows == 3
+    assert mission.tolist() == [2, 1, 2]
+    assert mission.dtype == np.dtype(np.int16)
+    assert date_time[1] == np.datetime64("2019-01-02T00:00:01")
+    assert np.isnat(date_time[2])
+    assert sla[0] == 0.5 and np.isnan(sla[1])
+
+
+def test_binary_copy_decoder_rejects_truncated_stream():
+    """
+    TEST a stream cut in the middle of a row is an error
+    """
+    decoder = BinaryCopyDecoder([("mission", "smallint")])
+    decoder.feed(encode_binary_copy([(np.array([1]), "smallint")], 1)[:-3])
+    decoder.take()
+
+    with pytest.raises(ValueError):
+        decoder.finish()
+
+
+def test_export_field_sql(oceandb_env):
+    """
+    TEST exported columns are fixed width and never NULL
+    """
+    along_track = AlongTrack()
+
+    # packed fields are exported as stored
+    expression, postgres_type = along_track.export_field_sql("sla_filtered")
+    assert postgres_type == "smallint"
+    assert "32767" in expression.as_string(None)
+    expression, postgres_type = along_track.export_field_sql("latitude")
+    assert postgres_type == "double precision"
+    assert "'NaN'" in expression.as_string(None)
+    assert along_track.export_field_sql("mission")[1] == "smallint"
+    assert along_track.export_field_sql("track")[1] == "smallint"
+    with pytest.raises(ValueError):
+        along_track.export_field_sql("distance")
+
+
+def test_export(oceandb_env):
+    """
+    TEST export decodes the COPY stream and maps dimension keys back to text
+    """
+    along_track = AlongTrack()
+    oceandb_env.setattr(AlongTrack, "_mission_ids", {"al": 1, "j3": 2})
+    along_track.export_block_size = 40
+    along_track.export_dimension_values = lambda field: np.array(["", "al", "j3"])
+    payload = copy_stream()
+
+    class Cursor:
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            return False
+
+        @contextmanager
+        def copy(self, query, params):
+            yield [payload[start : start + 16] for start in range(0, len(payload), 16)]
+
+    class Connection:
+        def cursor(self):
+            return Cursor()
+
+    @contextmanager
+    def borrow_connection(connection=None):
+        yield Connection()
+
+    along_track.borrow_connection = borrow_connection
+    along_track.export_field_sql = lambda field: (
+        None,
+        {"mission": "smallint", "date_time": "timestamp"}.get(
+            field, "double precision"
+        ),
+    )
+    along_track.load_sql_file = lambda filename: "{fields}"
+
+    dataset = along_track.export(
+        ["mission", "date_time", "latitude"],
+        start_date=datetime(2019, 1, 1),
+        end_date=datetime(2019, 2, 1),
+    )
+
+    assert dataset["mission"].tolist() == ["j3", "al", "j3"]
+    assert dataset["latitude"][2] == -1.25
+
+
+def test_export_null_integer(oceandb_env):
+    """
+    TEST a NULL integer is exported as the largest value of its type, not NULL
+    """
+    along_track = AlongTrack()
+    expression, postgres_type = along_track.export_field_sql("cycle")
+    fill_value = along_track.export_fill_value(postgres_type)
+    assert expression.as_string(None).startswith("COALESCE(")
+    assert f", {fill_value})" in expression.as_string(None)
+
+    # the row of the NULL cycle, as COALESCE sends it, decodes with the others
+    decoder = BinaryCopyDecoder([("cycle", postgres_type)])
+    decoder.feed(
+        encode_binary_copy([(np.array([12, fill_value]), postgres_type)], n_rows=2)
+    )
+    cycle = decoder.take()["cycle"]
+    decoder.finish()
+    assert cycle.tolist() == [12, fill_value]
+
+    # a NULL sent as is aborts the decoding
+    decoder = BinaryCopyDecoder([("cycle", postgres_type)])
+    decoder.feed(
+        encode_binary_copy(
+            [(np.ma.masked_array([12, 0], mask=[False, True]), postgres_type)],
+            n_rows=2,
+        )
+    )
+    with pytest.raises(ValueError):
+        decoder.take()
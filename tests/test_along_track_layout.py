@@ -0,0 +1,18 @@
+from OceanDB.benchmarks.along_track_layout import AlongTrackLayoutBenchmark
+
+
+def test_layout_query_filters_legacy_table_on_mission_text(oceandb_env):
+    """
+    TEST the legacy table, without mission_id, is filtered on its mission column
+    """
+    benchmark = AlongTrackLayoutBenchmark()
+
+    current = benchmark.layout_query("along_track").as_string(None)
+    legacy = benchmark.layout_query("along_track_monthly", mission_id=False)
+    legacy = legacy.as_string(None)
+
+    assert 'FROM "along_track"' in current
+    assert "mission_id = ANY(%(mission_ids)s::smallint[])" in current
+    assert 'FROM "along_track_monthly"' in legacy
+    assert "mission = ANY(%(missions)s)" in legacy
+    assert "mission_id" not in legacy
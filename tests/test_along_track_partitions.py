@@ -0,0 +1,140 @@
+from contextlib import contextmanager
+from datetime import date
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+
+from OceanDB.OceanDB_Initializer import OceanDBInit
+from OceanDB.etl import AlongTrackETL
+
+
+class RecordingETL(AlongTrackETL):
+    """
+    Records partition DDL requests instead of sending them to Postgres
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.requested = []
+        self.layouts = []
+
+    def along_track_mission_ids(self, missions=()):
+        return {mission: i + 1 for i, mission in enumerate(self.missions)}
+
+    def create_monthly_partitions(self, table_name, months, connection=None, **layout):
+        self.requested.append(sorted(months))
+        self.layouts.append(layout)
+        return []
+
+
+def test_file_date():
+    """
+    TEST the observation date is read from the file name
+    """
+    etl = RecordingETL.__new__(RecordingETL)
+
+    assert etl.file_date(Path("dt_global_j3_phy_l3_1hz_20190102_20240205.nc")) == date(
+        2019, 1, 2
+    )
+    assert etl.file_date(Path("notes.nc")) is None
+
+
+def test_create_partitions_for_files(oceandb_env):
+    """
+    TEST all months needed by the queued files are requested at once
+    """
+    etl = RecordingETL()
+    files = [
+        Path("dt_global_j3_phy_l3_1hz_20190102_20240205.nc"),
+        Path("dt_global_al_phy_l3_1hz_20190131_20240205.nc"),
+        Path("dt_global_s6a_lr_phy_l3_1hz_20230301_20240205.nc"),
+    ]
+
+    etl.create_partitions_for_files(files)
+
+    assert etl.requested == [[date(2019, 1, 1), date(2023, 3, 1)]]
+    assert etl.known_partitions == {"along_track_2019_01", "along_track_2023_03"}
+
+
+def test_ensure_along_track_partitions_only_requests_unseen_months(oceandb_env):
+    """
+    TEST writers only go to the database for months they have not seen
+    """
+    etl = RecordingETL()
+    etl.known_partitions.add("along_track_2019_01")
+    data = SimpleNamespace(
+        time=np.array(
+            ["2019-01-31T23:59:59", "2019-02-01T00:00:00", "NaT"],
+            dtype="datetime64[us]",
+        )
+    )
+
+    etl.ensure_along_track_partitions(data)
+    etl.ensure_along_track_partitions(data)
+
+    assert etl.requested == [[date(2019, 2, 1)]]
+
+
+def test_mission_partition_layout(oceandb_env):
+    """
+    TEST months are sub-partitioned by mission only when configured
+    """
+    etl = RecordingETL()
+    etl.create_along_track_partitions([date(2019, 1, 1)])
+    assert etl.layouts == [{}]
+
+    oceandb_env.setenv("ALONG_TRACK_MISSION_PARTITIONS", "true")
+    etl = RecordingETL()
+    etl.create_along_track_partitions([date(2019, 1, 1)])
+
+    (layout,) = etl.layouts
+    assert layout["sub_partition_column"] == "mission_id"
+    assert layout["sub_partition_values"]["al"] == 1
+    assert list(layout["sub_partition_values"]) == etl.missions
+    assert etl.known_partitions == {"along_track_2019_01"}
+
+
+class CheckingInit(OceanDBInit):
+    """
+    Answers the row checks of partitions from a dict instead of Postgres
+    """
+
+    def __init__(self, partition_rows):
+        super().__init__()
+        self.partition_rows = partition_rows
+        self.checked = []
+
+    def along_track_partitions(self):
+        return list(self.partition_rows)
+
+    @contextmanager
+    def borrow_connection(self, connection=None):
+        init = self
+
+        class Cursor:
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *exc):
+                return False
+
+            def execute(self, query):
+                self.partition = query.as_string(None).split('"')[-2]
+                init.checked.append(self.partition)
+
+            def fetchone(self):
+                return (init.partition_rows[self.partition],)
+
+        yield SimpleNamespace(cursor=Cursor)
+
+
+def test_defer_indices_only_without_rows_in_other_partitions(oceandb_env):
+    """
+    TEST indices are only dropped if the new partitions are the only ones with rows
+    """
+    init = CheckingInit({"along_track_2019_01": False, "along_track_2019_02": True})
+    assert init.can_defer_along_track_indices(["along_track_2019_02"])
+    assert init.checked == ["along_track_2019_01"]
+
+    assert not init.can_defer_along_track_indices([])
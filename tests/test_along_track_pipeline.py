@@ -0,0 +1,126 @@
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+
+import pytest
+
+from OceanDB.etl import AlongTrackETL
+
+
+class FakeConnection:
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+
+class FakeAlongTrackETL(AlongTrackETL):
+    """
+    Parses file names into row counts and records writes instead of touching NetCDF/Postgres
+    """
+
+    written: list
+
+    def parse_along_track_file(self, file: Path):
+        if file.name.startswith("corrupt"):
+            raise ValueError("corrupt file")
+        return int(file.stem.split("_")[-1]), {"file_name": file.name}
+
+    def write_along_track_file(
+        self, data, metadata, write_method="copy", connection=None
+    ):
+        if metadata["file_name"].startswith("reject"):
+            raise RuntimeError("duplicate rows")
+        if metadata["file_name"].startswith("ingested"):
+            return None
+        return data
+
+    @contextmanager
+    def borrow_connection(self, connection=None):
+        yield FakeConnection()
+
+
+def test_ingest_along_track_files_pipeline(oceandb_env):
+    """
+    TEST every file flows from the parser processes through the writer threads
+    """
+    files = [Path(f"dt_global_j3_{n}.nc") for n in range(1, 41)]
+    files += [Path("corrupt_1.nc"), Path("reject_5.nc"), Path("ingested_3.nc")]
+
+    stats = FakeAlongTrackETL().ingest_along_track_files(
+        files, parser_count=3, writer_count=2, queue_size=2
+    )
+
+    assert stats["files"] == 40
+    assert stats["rows"] == sum(range(1, 41))
+    assert stats["skipped"] == 1
+    assert stats["failed"] == 2
+
+
+class FakeStagingETL(FakeAlongTrackETL):
+    """
+    Records staging batches and treats every file's first row as a duplicate
+    """
+
+    def create_staging_table(self, staging_table_name, connection=None):
+        pass
+
+    def drop_staging_table(self, staging_table_name, connection=None):
+        pass
+
+    def bulk_load_along_track_files(
+        self, parsed_files, staging_table_name, connection=None
+    ):
+        assert 0 < len(parsed_files) <= 4
+        rows = sum(data for data, _ in parsed_files)
+        return Counter(
+            files=len(parsed_files),
+            rows=rows - len(parsed_files),
+            duplicates=len(parsed_files),
+        )
+
+
+def test_ingest_along_track_files_staging_batches(oceandb_env):
+    """
+    TEST staging mode merges batches and accumulates duplicate counts
+    """
+    files = [Path(f"dt_global_j3_{n}.nc") for n in range(1, 11)]
+
+    stats = FakeStagingETL().ingest_along_track_files(
+        files, parser_count=2, writer_count=2, queue_size=2, staging_batch_size=4
+    )
+
+    assert stats["files"] == 10
+    assert stats["rows"] == sum(range(1, 11)) - 10
+    assert stats["duplicates"] == 10
+
+
+def test_mission_partitions_drop_rows_of_other_missions(oceandb_env):
+    """
+    TEST with mission partitions files are staged and the merge drops rows another
+    mission stored
+    """
+    oceandb_env.setenv("ALONG_TRACK_MISSION_PARTITIONS", "true")
+    merge_query = FakeStagingETL().along_track_merge_query("staging").as_string(None)
+    assert "DISTINCT ON (date_time, latitude, longitude)" in merge_query
+    assert "NOT EXISTS" in merge_query
+
+    with pytest.raises(ValueError):
+        AlongTrackETL().write_along_track_file(None, None)
+
+    files = [Path(f"dt_global_j3_{n}.nc") for n in range(1, 6)]
+    stats = FakeStagingETL().ingest_along_track_files(
+        files, parser_count=2, writer_count=2, queue_size=2
+    )
+    assert stats["files"] == 5
+    assert stats["duplicates"] == 5
+
+
+def test_merge_without_mission_partitions(oceandb_env):
+    """
+    TEST without mission partitions the unique constraint drops the duplicates
+    """
+    merge_query = FakeStagingETL().along_track_merge_query("staging").as_string(None)
+    assert "ON CONFLICT DO NOTHING" in merge_query
+    assert "NOT EXISTS" not in merge_query
@@ -0,0 +1,154 @@
+import asyncio
+import inspect
+import threading
+from datetime import datetime
+
+import pytest
+
+from OceanDB.data_access.along_track import AlongTrack
+from OceanDB.data_access.async_along_track import AsyncAlongTrack
+
+
+class SleepingAlongTrack(AsyncAlongTrack):
+    """
+    Answers each point query after a delay instead of asking Postgres
+    """
+
+    def __init__(self, delays, max_concurrency):
+        super().__init__(max_concurrency=max_concurrency)
+        self.delays = delays
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def execute_point_query(self, query, schema, params):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(self.delays[params["point"]])
+        self.in_flight -= 1
+        return None if params["point"] == 1 else f"dataset {params['point']}"
+
+
+def test_execute_queries_concurrently(oceandb_env):
+    """
+    TEST point queries are limited in concurrency and yielded in completion order
+    """
+    along_track = SleepingAlongTrack(delays=[0.1, 0.01, 0.03, 0.0], max_concurrency=2)
+
+    async def collect():
+        return [
+            result
+            async for result in along_track.execute_queries_concurrently(
+                "query", {}, [{"point": point} for point in range(4)]
+            )
+        ]
+
+    results = asyncio.run(collect())
+
+    assert along_track.max_in_flight == 2
+    assert results == [(1, None), (2, "dataset 2"), (3, "dataset 3"), (0, "dataset 0")]
+
+
+def test_execute_queries_concurrently_bounds_tasks(oceandb_env):
+    """
+    TEST many points are run by a fixed pool of workers, not a task per point
+    """
+    n_points = 1000
+    along_track = SleepingAlongTrack(delays=[0.0] * n_points, max_concurrency=4)
+    max_tasks = 0
+
+    async def collect():
+        nonlocal max_tasks
+        point_indexes = []
+        async for point_index, _ in along_track.execute_queries_concurrently(
+            "query", {}, ({"point": point} for point in range(n_points))
+        ):
+            max_tasks = max(max_tasks, len(asyncio.all_tasks()))
+            point_indexes.append(point_index)
+        return point_indexes
+
+    point_indexes = asyncio.run(collect())
+
+    assert sorted(point_indexes) == list(range(n_points))
+    # the workers and the task running collect
+    assert max_tasks <= 4 + 1
+
+
+def test_execute_queries_concurrently_raises_query_errors(oceandb_env):
+    """
+    TEST a failed point query is raised to the caller
+    """
+    along_track = SleepingAlongTrack(delays=[0.0, 0.0], max_concurrency=2)
+
+    async def fail(query, schema, params):
+        raise ValueError("query failed")
+
+    along_track.execute_point_query = fail
+
+    async def collect():
+        return [
+            result
+            async for result in along_track.execute_queries_concurrently(
+                "query", {}, [{"point": 0}, {"point": 1}]
+            )
+        ]
+
+    with pytest.raises(ValueError):
+        asyncio.run(collect())
+
+
+def test_async_queries_keep_the_sync_queries(oceandb_env):
+    """
+    TEST async queries have their own names and load basins off the event loop
+    """
+    along_track = SleepingAlongTrack(delays=[0.0, 0.0], max_concurrency=2)
+    along_track.execute_point_query = lambda query, schema, params: asyncio.sleep(
+        0, result=params["latitude"]
+    )
+    along_track.compose_query = lambda *args: "query"
+    basin_threads = []
+
+    def connected_basin_ids(latitudes, longitudes):
+        basin_threads.append(threading.get_ident())
+        return [[1]] * len(latitudes)
+
+    along_track.connected_basin_ids = connected_basin_ids
+    oceandb_env.setattr(AlongTrack, "_mission_ids", {"j3": 19})
+
+    async def collect():
+        return [
+            result
+            async for result in along_track.async_geographic_points_in_r_dt(
+                latitudes=[-69.0, 10.0],
+                longitudes=[28.1, 30.0],
+                dates=[datetime(2013, 3, 14)] * 2,
+                fields=["sla_filtered"],
+                missions=["j3"],
+            )
+        ]
+
+    results = asyncio.run(collect())
+
+    assert sorted(results) == [(0, -69.0), (1, 10.0)]
+    assert basin_threads and basin_threads[0] != threading.get_ident()
+    assert not inspect.isasyncgenfunction(AsyncAlongTrack.geographic_points_in_r_dt)
+
+
+def test_execute_queries_concurrently_awaits_cancelled_workers(oceandb_env):
+    """
+    TEST workers still running when the caller stops iterating are cancelled and done
+    """
+    along_track = SleepingAlongTrack(delays=[0.0, 10.0, 10.0], max_concurrency=3)
+
+    async def first_result():
+        results = along_track.execute_queries_concurrently(
+            "query", {}, [{"point": point} for point in range(3)]
+        )
+        async for result in results:
+            break
+        await results.aclose()
+        return result, asyncio.all_tasks() - {asyncio.current_task()}
+
+    result, pending = asyncio.run(first_result())
+
+    assert result == (0, "dataset 0")
+    assert pending == set()
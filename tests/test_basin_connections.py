@@ -0,0 +1,40 @@
+import numpy as np
+
+from OceanDB.OceanDB import OceanDB
+from OceanDB.utils.basin_connections import BasinConnections
+
+
+def test_packaged_basin_connections(oceandb_env):
+    """
+    TEST the packaged connections list each basin first, then its connected basins
+    """
+    basin_connections = OceanDB().basin_connections
+
+    expected = [1, 14, 28, 34, 43, 52, 53, 72, 105, 106, 110, 127, 148, 250]
+    assert basin_connections[1].tolist() == expected
+    # the duplicate row 4,236 is listed once
+    assert basin_connections[4].tolist().count(236) == 1
+    assert 0 not in basin_connections
+    assert basin_connections[0].tolist() == []
+    assert OceanDB().basin_connections is basin_connections
+
+
+def test_padded_connections_are_vectorized(oceandb_env):
+    """
+    TEST rows of several basins are gathered into one array padded with -1
+    """
+    basin_connections = BasinConnections.from_pairs([1, 1, 2, 4], [2, 3, 1, 4])
+
+    padded = basin_connections.padded(np.array([1, 3, 2, 4, -7, 99]))
+
+    assert padded.tolist() == [
+        [1, 2, 3],
+        [-1, -1, -1],
+        [2, 1, -1],
+        [4, -1, -1],
+        [-1, -1, -1],
+        [-1, -1, -1],
+    ]
+    assert basin_connections.counts([1, 3, 99]).tolist() == [3, 0, 0]
+    assert basin_connections.to_dict() == {1: [1, 2, 3], 2: [2, 1], 4: [4]}
+    assert basin_connections.padded(np.array([3])).tolist() == [[-1]]
@@ -0,0 +1,37 @@
+import netCDF4 as nc
+import numpy as np
+import pytest
+
+from OceanDB.utils import basin_mask
+
+
+@pytest.fixture
+def basin_mask_file(tmp_path):
+    path = tmp_path / "basin_mask.nc"
+    with nc.Dataset(path, "w") as ds:
+        ds.createDimension("lat", 3)
+        ds.createDimension("lon", 4)
+        ds.createVariable("basinmask", "i2", ("lat", "lon"))[:] = np.arange(12).reshape(
+            3, 4
+        )
+    return path
+
+
+def test_basin_mask_is_decoded_once(basin_mask_file, tmp_path, monkeypatch):
+    """
+    TEST the mask is converted on first load, later loads only map the file
+    """
+    cache_directory = tmp_path / "cache"
+    mask = basin_mask.load_basin_mask(basin_mask_file, cache_directory)
+
+    def decode_basin_mask(source):
+        raise AssertionError("decoded again")
+
+    monkeypatch.setattr(basin_mask, "decode_basin_mask", decode_basin_mask)
+    mapped = basin_mask.load_basin_mask(basin_mask_file, cache_directory)
+
+    assert isinstance(mapped, np.memmap)
+    assert not mapped.flags.writeable
+    assert mapped.dtype == np.int16
+    assert mapped.tolist() == mask.tolist() == np.arange(12).reshape(3, 4).tolist()
+    assert len(list(cache_directory.iterdir())) == 1
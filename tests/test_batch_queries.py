@@ -0,0 +1,180 @@
+from contextlib import contextmanager
+from datetime import datetime
+from types import SimpleNamespace
+
+import numpy as np
+import psycopg as pg
+from psycopg.adapt import AdaptersMap
+
+from OceanDB.OceanDB import OceanDB
+from OceanDB.data_access.along_track import AlongTrack
+from OceanDB.data_access.schema.along_track_schema import along_track_schema
+from OceanDB.utils.basin_connections import BasinConnections
+
+
+def test_split_by_point(oceandb_env):
+    """
+    TEST a batched result splits into per-point views, with None for empty points
+    """
+    along_track = AlongTrack()
+    rows = [
+        {"point_index": 2, "latitude": -69.0, "track": 7},
+        {"point_index": 0, "latitude": 12.5, "track": 8},
+        {"point_index": 2, "latitude": -68.5, "track": 9},
+    ]
+    dataset = along_track.build_dataset(
+        schema={"point_index": along_track.point_index_field, **along_track_schema},
+        rows=rows,
+    )
+
+    first, second, third, fourth = along_track.split_by_point(dataset, 4)
+
+    assert first["latitude"].tolist() == [12.5]
+    assert second is None
+    assert third["track"].tolist() == [7, 9]
+    assert fourth is None
+    assert list(along_track.split_by_point(None, 2)) == [None, None]
+
+
+def test_batch_fields_read_query_point_columns(oceandb_env):
+    """
+    TEST per-point placeholders in field calculations become query_point columns
+    """
+    along_track = AlongTrack()
+
+    query = along_track.compose_query(
+        along_track.nearest_neighbor_batch_query,
+        along_track_schema,
+        ["latitude", "distance"],
+        along_track.batch_point_columns,
+    ).as_string(None)
+
+    assert "%(longitude)s" not in query
+    assert "%(latitude)s" not in query
+    assert "ST_MakePoint(query_point.longitude, query_point.latitude)" in query
+
+
+def test_batch_point_params_pad_connected_basins(oceandb_env):
+    """
+    TEST connected basins of all points are sent as one rectangular array
+    """
+    oceandb_env.setattr(
+        OceanDB, "_basin_connections", BasinConnections.from_pairs([1, 1, 5], [2, 3, 5])
+    )
+    along_track = AlongTrack()
+    along_track.basin_mask = lambda latitudes, longitudes: np.array([1, 5, 9])
+
+    params = along_track.batch_point_params(
+        np.array([1.0, 2.0, 3.0]),
+        np.array([4.0, 5.0, 6.0]),
+        [datetime(2013, 3, 14)] * 3,
+    )
+
+    assert params["latitudes"] == [1.0, 2.0, 3.0]
+    assert params["connected_basin_ids"] == [[1, 2, 3], [5, -1, -1], [-1, -1, -1]]
+
+
+class ServerCursor:
+    """
+    Hands out canned rows like a named cursor
+    """
+
+    def __init__(self, columns, rows):
+        self.adapters = AdaptersMap(pg.adapters)
+        self.description = [SimpleNamespace(name=column) for column in columns]
+        self.rows = rows
+        self.fetched = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, query, params):
+        self.params = params
+
+    def fetchmany(self, size):
+        rows, self.rows = self.rows[:size], self.rows[size:]
+        self.fetched.append(len(rows))
+        return rows
+
+
+def test_nearest_neighbor_batch_orders_by_knn_operator(oceandb_env):
+    """
+    TEST the batched nearest neighbor query walks the spatial index and returns k rows
+    """
+    oceandb_env.setattr(AlongTrack, "_mission_ids", {"al": 1, "j3": 19})
+    along_track = AlongTrack()
+    along_track.basin_mask = lambda latitudes, longitudes: np.array([1])
+    executed = {}
+
+    def execute_batch_query(query, schema, params):
+        executed["query"] = query.as_string(None)
+        executed["params"] = params
+
+    along_track.execute_batch_query = execute_batch_query
+    along_track.geographic_nearest_neighbors_dt_batch(
+        latitudes=np.array([-69.0]),
+        longitudes=np.array([28.1]),
+        dates=[datetime(2013, 3, 14)],
+        fields=["sla_filtered", "distance"],
+        missions=["j3", "tp"],
+        k=5,
+    )
+
+    assert "along_track_point <->" in executed["query"]
+    assert "LIMIT %(k)s" in executed["query"]
+    assert "::geography" in executed["query"]
+    assert executed["params"]["k"] == 5
+    # missions never ingested have no key and are left out
+    assert executed["params"]["mission_ids"] == [19]
+
+
+def test_mission_filter_is_a_bound_parameter(oceandb_env):
+    """
+    TEST every along_track query binds the mission keys, so partitions are pruned
+    """
+    along_track = AlongTrack()
+    templates = [
+        along_track.nearest_neighbor_query,
+        along_track.nearest_neighbor_batch_query,
+        along_track.along_track_spatiotemporal_query,
+        along_track.along_track_spatiotemporal_batch_query,
+        along_track.export_query,
+    ]
+
+    for template in templates:
+        query = along_track.load_sql_file(template)
+        assert "mission_id = ANY(%(mission_ids)s::smallint[])" in query
+        assert "along_track_mission" not in query
+
+
+def test_stream_query_yields_chunks(oceandb_env):
+    """
+    TEST a streamed query is read from a named cursor in fixed-size chunks
+    """
+    along_track = AlongTrack()
+    cursor = ServerCursor(
+        ["point_index", "latitude", "track"], [(0, float(i), i) for i in range(5)]
+    )
+    cursor_names = []
+
+    class Connection:
+        def cursor(self, name="", binary=False):
+            cursor_names.append(name)
+            return cursor
+
+    @contextmanager
+    def borrow_connection(connection=None):
+        yield Connection()
+
+    along_track.borrow_connection = borrow_connection
+
+    chunks = list(
+        along_track.stream_query("query", along_track_schema, {}, chunk_size=2)
+    )
+
+    assert cursor_names == ["oceandb_stream"]
+    assert [chunk["track"].tolist() for chunk in chunks] == [[0, 1], [2, 3], [4]]
+    assert cursor.fetched == [2, 2, 1, 0]
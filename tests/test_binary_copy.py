@@ -0,0 +1,82 @@
+import struct
+from datetime import datetime
+
+import numpy as np
+
+from OceanDB.utils.binary_copy import (
+    PG_EPOCH,
+    PGCOPY_HEADER,
+    PGCOPY_TRAILER,
+    encode_binary_copy,
+)
+
+
+def test_encode_binary_copy_layout():
+    """
+    TEST rows are encoded field by field in network byte order
+    """
+    track = np.array([7, 8], dtype=np.int16)
+    latitude = np.array([-69.5, 12.25])
+    times = np.array(
+        ["2000-01-01T00:00:01", "2013-03-14T23:00:00"], dtype="datetime64[us]"
+    )
+
+    payload = encode_binary_copy(
+        [
+            ("dt_global_j3_phy", "text"),
+            (track, "smallint"),
+            (latitude, "double precision"),
+            (times, "timestamp"),
+        ],
+        n_rows=2,
+    )
+
+    assert payload.startswith(PGCOPY_HEADER)
+    assert payload.endswith(PGCOPY_TRAILER)
+
+    body = payload[len(PGCOPY_HEADER) : -len(PGCOPY_TRAILER)]
+    row_width = 2 + (4 + 16) + (4 + 2) + (4 + 8) + (4 + 8)
+    assert len(body) == 2 * row_width
+
+    second = body[row_width:]
+    assert struct.unpack("!h", second[:2])[0] == 4
+    assert second[6:22] == b"dt_global_j3_phy"
+    assert struct.unpack("!ih", second[22:28]) == (2, 8)
+    assert struct.unpack("!id", second[28:40]) == (8, 12.25)
+    microseconds = (
+        datetime(2013, 3, 14, 23) - datetime(2000, 1, 1)
+    ).total_seconds() * 1e6
+    assert struct.unpack("!iq", second[40:52]) == (8, int(microseconds))
+
+
+def test_encode_binary_copy_masked_values_are_null():
+    """
+    TEST masked (fill) values are written as NULL with no payload
+    """
+    sla = np.ma.masked_array([1, 2, 3], mask=[False, True, False], dtype=np.int16)
+
+    payload = encode_binary_copy(
+        [(sla, "smallint")], n_rows=3, header=False, trailer=False
+    )
+
+    assert payload == (
+        struct.pack("!hih", 1, 2, 1)
+        + struct.pack("!hi", 1, -1)
+        + struct.pack("!hih", 1, 2, 3)
+    )
+
+
+def test_encode_binary_copy_nat_is_null():
+    """
+    TEST missing timestamps (NaT) are written as NULL, not as -infinity
+    """
+    times = np.array(["2013-03-14T23:00:00", "NaT"], dtype="datetime64[us]")
+
+    payload = encode_binary_copy(
+        [(times, "timestamp")], n_rows=2, header=False, trailer=False
+    )
+
+    microseconds = (times[0] - PG_EPOCH).astype(np.int64)
+    assert payload == struct.pack("!hiq", 1, 8, microseconds) + struct.pack(
+        "!hi", 1, -1
+    )
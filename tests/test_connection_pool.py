@@ -0,0 +1,33 @@
+from OceanDB.OceanDB import OceanDB
+from OceanDB.data_access.along_track import AlongTrack
+from OceanDB.etl import AlongTrackETL
+
+
+def test_connection_pool_is_shared(oceandb_env):
+    """
+    TEST query and ingest objects share one pool, which grows on demand
+    """
+    # no connection is opened before the pool is used
+    oceandb_env.setenv("POSTGRES_POOL_MIN_SIZE", "0")
+    oceandb_env.setenv("POSTGRES_POOL_MAX_SIZE", "3")
+    oceandb_env.setenv("POSTGRES_HOST", "pool-test.invalid")
+
+    try:
+        along_track = AlongTrack()
+        etl = AlongTrackETL()
+        pool = along_track.connection_pool
+        assert etl.connection_pool is pool
+
+        etl.ensure_pool_capacity(5)
+        etl.ensure_pool_capacity(2)
+
+        stats = along_track.pool_stats()
+        assert stats["pool_min"] == 0
+        assert stats["pool_max"] == 5
+
+        # a closed pool is reopened on next use
+        OceanDB.close_connection_pools()
+        assert pool.closed
+        assert etl.connection_pool is not pool
+    finally:
+        OceanDB.close_connection_pools()
@@ -0,0 +1,93 @@
+import numpy as np
+import xarray as xr
+
+from OceanDB.data_access.schema.along_track_schema import along_track_schema
+from OceanDB.ocean_data.dataset import Dataset
+
+
+def along_track_dataset(n_rows: int) -> Dataset:
+    data = {
+        "date_time": np.datetime64("2019-01-01", "us")
+        + np.arange(n_rows).astype("timedelta64[s]"),
+        "track": np.arange(n_rows, dtype=np.int64),
+        # packed, as stored in the database: millimeters, 32767 where missing
+        "sla_filtered": np.array([-1000, -500, 32767, 500, 1000][:n_rows], np.int16),
+        "mission": np.array(["j3"] * n_rows),
+    }
+    return Dataset(
+        name="along_track_spatiotemporal",
+        data=data,
+        dtypes={name: along_track_schema[name].python_type for name in data},
+        schema=along_track_schema,
+    )
+
+
+def test_to_xarray_scaled(oceandb_env):
+    """
+    TEST scaled variables are unpacked and carry CF attributes & encodings
+    """
+    dataset = along_track_dataset(5)
+
+    ds = dataset.to_xarray(scaled=True)
+
+    np.testing.assert_array_equal(ds["sla_filtered"], [-1, -0.5, np.nan, 0.5, 1])
+    assert np.shares_memory(ds["track"].values, dataset["track"])
+    assert ds["sla_filtered"].attrs["units"] == "m"
+    assert ds["sla_filtered"].encoding["_FillValue"] == 32767
+    assert ds["sla_filtered"].encoding["dtype"] == np.int16
+    assert ds["sla_filtered"].encoding["scale_factor"] == 0.001
+    assert ds["track"].encoding["dtype"] == np.int16
+    # time metadata is matched through the field's NetCDF name
+    assert ds["date_time"].attrs["standard_name"] == "time"
+    assert "units" not in ds["date_time"].attrs
+    assert ds["date_time"].encoding["units"] == "days since 1950-01-01 00:00:00"
+
+
+def test_to_xarray_wraps_columns(oceandb_env):
+    """
+    TEST variables share memory with the stored columns, which CF decoding unpacks
+    """
+    dataset = along_track_dataset(5)
+    times = dataset["date_time"].copy()
+    times[1] = np.datetime64("NaT")
+    dataset = Dataset(
+        name=dataset.name,
+        data={**dataset, "date_time": times},
+        dtypes={},
+        schema=dataset.schema,
+    )
+
+    raw = dataset.to_xarray()
+
+    for key in ("sla_filtered", "date_time", "track"):
+        assert np.shares_memory(raw[key].values, dataset[key])
+    assert raw["sla_filtered"].attrs["scale_factor"] == 0.001
+    decoded = xr.decode_cf(raw)
+    np.testing.assert_allclose(
+        decoded["sla_filtered"], dataset.column("sla_filtered", scaled=True)
+    )
+    np.testing.assert_array_equal(
+        decoded["date_time"], dataset["date_time"].astype("datetime64[ns]")
+    )
+
+
+def test_to_netcdf_round_trip(oceandb_env, tmp_path):
+    """
+    TEST a dataset written to NetCDF reads back with the same values
+    """
+    dataset = along_track_dataset(5)
+    path = tmp_path / "along_track.nc"
+
+    dataset.to_netcdf(path)
+
+    with xr.open_dataset(path) as ds:
+        assert ds.sizes["obs"] == 5
+        assert ds["track"].dtype == np.int16
+        np.testing.assert_allclose(
+            ds["sla_filtered"], dataset.column("sla_filtered", scaled=True)
+        )
+        np.testing.assert_array_equal(ds["mission"], dataset["mission"])
+        # times are stored exactly, as integer microseconds
+        np.testing.assert_array_equal(
+            ds["date_time"], dataset["date_time"].astype("datetime64[ns]")
+        )
@@ -0,0 +1,93 @@
+import netCDF4 as nc
+import numpy as np
+
+from OceanDB.data_access.metadata import ALONG_TRACK_VARIABLES
+from OceanDB.data_access.schema.along_track_schema import along_track_schema
+from OceanDB.ocean_data.dataset import Dataset
+from OceanDB.ocean_data.netcdf import NetCDFWriter, write_datasets_to_netcdf
+
+
+def along_track_chunk(start: int, n_rows: int) -> Dataset:
+    data = {
+        "date_time": np.datetime64("2019-01-01", "us")
+        + np.arange(start, start + n_rows).astype("timedelta64[s]"),
+        "sla_filtered": np.arange(start, start + n_rows, dtype=np.float64) * 10,
+        "mission": np.array(["j3"] * n_rows),
+    }
+    return Dataset(
+        name="along_track_spatiotemporal",
+        data=data,
+        dtypes={name: along_track_schema[name].python_type for name in data},
+        schema=along_track_schema,
+    )
+
+
+def test_stream_of_chunks_is_appended(oceandb_env, tmp_path):
+    """
+    TEST chunks are appended along an unlimited, chunked & compressed dimension
+    """
+    path = tmp_path / "along_track.nc"
+    chunks = [along_track_chunk(0, 5), along_track_chunk(5, 3), along_track_chunk(8, 0)]
+
+    rows = write_datasets_to_netcdf(path, iter(chunks), chunk_size=4)
+
+    assert rows == 8
+    with nc.Dataset(path) as ds:
+        assert ds.dimensions["obs"].isunlimited()
+        sla = ds["sla_filtered"]
+        assert sla.chunking() == [4]
+        assert sla.filters()["zlib"] and sla.filters()["shuffle"]
+        assert sla.units == "m"
+        # unpacked to meters from the millimeters stored in the database
+        np.testing.assert_allclose(sla[:], np.arange(8) * 0.01)
+        assert ds["mission"][:].tolist() == ["j3"] * 8
+        times = nc.num2date(ds["date_time"][:], ds["date_time"].units)
+        assert [time.second for time in times] == list(range(8))
+
+
+def test_packed_fields_are_written_as_integers(oceandb_env, tmp_path):
+    """
+    TEST smallint fields are stored packed, with missing values as the fill value
+    """
+    path = tmp_path / "along_track.nc"
+    chunk = {"sla_filtered": np.array([1234.0, np.nan, -5.0])}
+
+    with nc.Dataset(path, "w") as ds:
+        writer = NetCDFWriter(
+            ds, schema=along_track_schema, metadata=ALONG_TRACK_VARIABLES
+        )
+        writer.append(chunk)
+        writer.append(chunk)
+
+    with nc.Dataset(path) as ds:
+        sla = ds["sla_filtered"]
+        assert sla.dtype == np.int16
+        assert sla.scale_factor == 0.001
+        assert sla.standard_name == "sea_surface_height_above_sea_level"
+        assert sla[:].mask.tolist() == [False, True, False] * 2
+        sla.set_auto_maskandscale(False)
+        assert sla[:].tolist() == [1234, 32767, -5] * 2
+
+
+def test_stored_columns_of_a_dataset_are_written(oceandb_env, tmp_path):
+    """
+    TEST the packed integers a dataset holds are written as they are, not unpacked
+    """
+    path = tmp_path / "along_track.nc"
+    dataset = Dataset(
+        name="along_track_spatiotemporal",
+        data={"sla_filtered": np.array([1234, 32767, -5], dtype=np.int16)},
+        dtypes={"sla_filtered": np.float64},
+        schema=along_track_schema,
+    )
+
+    write_datasets_to_netcdf(path, [dataset])
+
+    with nc.Dataset(path) as ds:
+        sla = ds["sla_filtered"]
+        assert sla.units == "m"
+        np.testing.assert_allclose(
+            sla[:].filled(np.nan), dataset.column("sla_filtered", scaled=True)
+        )
+        sla.set_auto_maskandscale(False)
+        assert sla[:].tolist() == [1234, 32767, -5]
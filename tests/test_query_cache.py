@@ -0,0 +1,50 @@
+from OceanDB.data_access.along_track import AlongTrack
+from OceanDB.data_access.schema.along_track_schema import along_track_schema
+
+
+def test_compose_query_is_cached_per_fields(oceandb_env):
+    """
+    TEST a query is composed once per template and field list
+    """
+    AlongTrack.clear_query_cache()
+    along_track = AlongTrack()
+    template = along_track.nearest_neighbor_query
+
+    first = along_track.compose_query(
+        template, along_track_schema, ["latitude", "distance"]
+    )
+    second = along_track.compose_query(
+        template, along_track_schema, ["latitude", "distance"]
+    )
+    other = along_track.compose_query(template, along_track_schema, ["latitude"])
+
+    assert second is first
+    assert other is not first
+    assert "{fields}" not in first.as_string(None)
+    assert AlongTrack.query_cache_stats() == {
+        "hits": 1,
+        "misses": 2,
+        "queries": 2,
+        "sql_files": 1,
+    }
+
+
+def test_sql_file_is_read_once(oceandb_env):
+    """
+    TEST SQL files are read from the package once per process
+    """
+    AlongTrack.clear_query_cache()
+    along_track = AlongTrack()
+    opened = []
+    load_module_file = along_track.load_module_file
+
+    def counting_load_module_file(*args, **kwargs):
+        opened.append(kwargs["filename"])
+        return load_module_file(*args, **kwargs)
+
+    along_track.load_module_file = counting_load_module_file
+    query = along_track.load_sql_file(along_track.nearest_neighbor_query)
+
+    assert along_track.load_sql_file(along_track.nearest_neighbor_query) is query
+    assert AlongTrack().load_sql_file(along_track.nearest_neighbor_query) is query
+    assert opened == [along_track.nearest_neighbor_query]
@@ -0,0 +1,65 @@
+import netCDF4 as nc
+import numpy as np
+
+from OceanDB.data_access.along_track import AlongTrack
+from OceanDB.data_access.schema.along_track_schema import along_track_schema
+from OceanDB.ocean_data.ragged_dataset import RaggedDataset
+
+
+def make_batch(along_track: AlongTrack):
+    rows = [
+        {"point_index": 2, "sla_filtered": -0.5, "track": 7},
+        {"point_index": 0, "sla_filtered": 0.25, "track": 8},
+        {"point_index": 2, "sla_filtered": 0.75, "track": 9},
+    ]
+    return along_track.build_dataset(
+        schema={"point_index": along_track.point_index_field, **along_track_schema},
+        rows=rows,
+    )
+
+
+def test_points_are_views_on_shared_columns(oceandb_env):
+    """
+    TEST each query point is a slice of the concatenated columns, None if empty
+    """
+    along_track = AlongTrack()
+    ragged = RaggedDataset.from_batch(make_batch(along_track), 4)
+
+    assert len(ragged) == 4
+    assert ragged.offsets.tolist() == [0, 1, 1, 3, 3]
+    assert ragged.row_sizes.tolist() == [1, 0, 2, 0]
+    assert ragged[2]["track"].tolist() == [7, 9]
+    assert np.shares_memory(ragged[2]["track"], ragged.rows["track"])
+    assert ragged[1] is None
+    assert ragged[-4]["track"].tolist() == [8]
+    assert [point is None for point in ragged] == [False, True, False, True]
+
+    empty = RaggedDataset.from_batch(None, 2)
+    assert list(empty) == [None, None]
+    assert empty.row_sizes.tolist() == [0, 0]
+
+
+def test_contiguous_ragged_array_netcdf(oceandb_env, tmp_path):
+    """
+    TEST the CF contiguous ragged array holds the rows of each point in order
+    """
+    along_track = AlongTrack()
+    points = along_track.query_point_columns(
+        np.array([-69.0, 10.0, 12.5]),
+        np.array([28.1, 30.0, 31.5]),
+        [np.datetime64("2013-03-14T05:00")] * 3,
+    )
+    ragged = RaggedDataset.from_batch(make_batch(along_track), 3, points)
+    path = tmp_path / "ragged.nc"
+
+    ragged.to_netcdf(path, feature_type="point")
+
+    with nc.Dataset(path) as ds:
+        assert ds.featureType == "point"
+        assert "point_index" not in ds.variables
+        row_size = ds["row_size"]
+        assert row_size.dimensions == ("point",)
+        assert row_size.sample_dimension == "obs"
+        assert row_size[:].tolist() == [1, 0, 2]
+        assert ds["track"][:].tolist() == [8, 7, 9]
+        assert ds["query_latitude"][:].tolist() == [-69.0, 10.0, 12.5]
@@ -0,0 +1,186 @@
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+import numpy as np
+import psycopg as pg
+from psycopg.adapt import AdaptersMap
+import pytest
+
+from OceanDB.data_access.along_track import AlongTrack
+from OceanDB.data_access.result_cache import ResultCache
+from OceanDB.data_access.schema.along_track_schema import along_track_schema
+from OceanDB.ocean_data.dataset import Dataset
+
+
+def make_dataset(n_rows: int) -> Dataset:
+    return Dataset(
+        name="along_track_spatiotemporal",
+        data={"sla_filtered": np.arange(n_rows, dtype=np.int16)},
+        dtypes={"sla_filtered": float},
+        schema=along_track_schema,
+    )
+
+
+def test_memory_tier_evicts_least_recently_used(oceandb_env):
+    """
+    TEST entries beyond the byte budget are evicted least recently used first
+    """
+    cache = ResultCache(max_bytes=3 * 20)
+    keys = [cache.key("query", {"point": i}, "1") for i in range(4)]
+    for key in keys[:3]:
+        cache.put(key, make_dataset(10))
+
+    cache.lookup(keys[0], along_track_schema)
+    cache.put(keys[3], make_dataset(10))
+
+    assert cache.lookup(keys[1], along_track_schema) == (False, None)
+    assert cache.lookup(keys[0], along_track_schema)[0]
+    assert cache.stats() == {
+        "hits": 2,
+        "disk_hits": 0,
+        "misses": 1,
+        "evictions": 1,
+        "entries": 3,
+        "bytes": 3 * 20,
+    }
+
+
+def test_new_generation_invalidates_entries(oceandb_env, tmp_path):
+    """
+    TEST entries of a previous ingest generation are dropped, in memory and on disk
+    """
+    cache = ResultCache(directory=tmp_path)
+    key = cache.key("query", {"point": 0}, "1:10")
+    cache.put(key, make_dataset(10))
+
+    new_key = cache.key("query", {"point": 0}, "2:25")
+
+    assert new_key != key
+    assert cache.lookup(new_key, along_track_schema) == (False, None)
+    assert list(tmp_path.glob("*.npz")) == []
+
+
+def test_disk_tier_survives_the_process(oceandb_env, tmp_path):
+    """
+    TEST a new cache over the same directory reads entries, empty results included
+    """
+    cache = ResultCache(directory=tmp_path)
+    key = cache.key("query", {"point": 0}, "1")
+    empty_key = cache.key("query", {"point": 1}, "1")
+    cache.put(key, make_dataset(10))
+    cache.put(empty_key, None)
+
+    cache = ResultCache(directory=tmp_path)
+    cache.key("query", {"point": 0}, "1")
+    found, dataset = cache.lookup(key, along_track_schema)
+
+    assert found
+    stored = dataset.column("sla_filtered", scaled=False)
+    assert stored.tolist() == list(range(10))
+    assert stored.dtype == np.int16
+    assert not stored.flags.writeable
+    assert cache.lookup(empty_key, along_track_schema) == (True, None)
+    assert cache.stats()["disk_hits"] == 2
+
+
+def test_along_track_batch_query_hits_cache(oceandb_env):
+    """
+    TEST a repeated batched query is answered by the result cache
+    """
+    oceandb_env.setattr(AlongTrack, "_mission_ids", {"al": 1})
+    along_track = AlongTrack(result_cache=ResultCache())
+    along_track.basin_mask = lambda latitudes, longitudes: np.array([1])
+    along_track.result_cache_generation = lambda: "1:10"
+    executed = []
+
+    class Cursor:
+        adapters = AdaptersMap(pg.adapters)
+        description = [
+            SimpleNamespace(name="point_index"),
+            SimpleNamespace(name="sla_filtered"),
+        ]
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            return False
+
+        def execute(self, query, params, prepare=None):
+            executed.append(params)
+
+        def fetchall(self):
+            return [(0, 500), (0, 250)]
+
+    class Connection:
+        def cursor(self, name="", binary=False):
+            return Cursor()
+
+    @contextmanager
+    def borrow_connection(connection=None):
+        yield Connection()
+
+    along_track.borrow_connection = borrow_connection
+    query = {
+        "latitudes": np.array([-69.0]),
+        "longitudes": np.array([28.1]),
+        "dates": [np.datetime64("2013-03-14")],
+        "fields": ["sla_filtered"],
+    }
+
+    first = along_track.geographic_points_in_r_dt_batch(**query)
+    second = along_track.geographic_points_in_r_dt_batch(**query)
+    along_track.geographic_points_in_r_dt_batch(**query, radii=100_000.0)
+
+    assert second is first
+    assert second.column("sla_filtered", scaled=True).tolist() == [0.5, 0.25]
+    assert len(executed) == 2
+
+
+def test_generation_is_read_from_the_counter(oceandb_env):
+    """
+    TEST the generation is the ingest counter, read at most once per TTL, and a
+    database without the counter is an error
+    """
+    along_track = AlongTrack()
+    oceandb_env.setattr(AlongTrack, "_ingest_generation", None)
+    executed = []
+    counter_exists = True
+
+    class Cursor:
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            return False
+
+        def execute(self, query):
+            executed.append(query)
+            if not counter_exists:
+                raise pg.errors.UndefinedTable()
+
+        def fetchone(self):
+            return (7,)
+
+    class Connection:
+        def cursor(self):
+            return Cursor()
+
+    @contextmanager
+    def borrow_connection(connection=None):
+        yield Connection()
+
+    along_track.borrow_connection = borrow_connection
+
+    assert along_track.result_cache_generation() == "g7"
+    assert along_track.result_cache_generation() == "g7"
+    assert executed == [along_track.ingest_generation_query]
+
+    # once the TTL has passed the counter is read again
+    along_track.result_cache_generation_ttl = 0.0
+    assert along_track.result_cache_generation() == "g7"
+    assert len(executed) == 2
+
+    counter_exists = False
+    with pytest.raises(RuntimeError):
+        along_track.result_cache_generation()
@@ -0,0 +1,58 @@
+import struct
+from datetime import datetime, timedelta
+
+import numpy as np
+import psycopg as pg
+
+from OceanDB.data_access.along_track import AlongTrack
+from OceanDB.data_access.base_query import TimestampMicrosecondsLoader
+from OceanDB.data_access.schema.along_track_schema import along_track_schema
+
+
+def test_build_dataset_from_tuples(oceandb_env):
+    """
+    TEST tuple rows decode into typed columns, timestamps into datetime64[us]
+    """
+    along_track = AlongTrack()
+    rows = [
+        (datetime(2013, 3, 14, 23, 0, 0, 5), -695, "j3", 7),
+        (datetime(2013, 3, 15), None, "al", 8),
+    ]
+
+    dataset = along_track.build_dataset(
+        schema=along_track_schema,
+        rows=rows,
+        columns=["date_time", "sla_filtered", "mission", "track"],
+    )
+
+    assert dataset["date_time"].dtype == np.dtype("datetime64[us]")
+    assert dataset["date_time"][0] == np.datetime64("2013-03-14T23:00:00.000005")
+    # packed fields keep the stored millimeters, unpacked to meters on request
+    assert dataset["sla_filtered"].tolist() == [-695, 32767]
+    assert dataset["sla_filtered"].dtype == np.int16
+    sla_filtered = dataset.column("sla_filtered", scaled=True)
+    assert sla_filtered[0] == -0.695
+    assert np.isnan(sla_filtered[1])
+    assert dataset["mission"].tolist() == ["j3", "al"]
+    assert dataset["track"].tolist() == [7, 8]
+    assert "latitude" not in dataset
+
+
+def test_binary_timestamps_decode_to_datetime64(oceandb_env):
+    """
+    TEST timestamps loaded as microseconds since 2000 decode to datetime64[us]
+    """
+    along_track = AlongTrack()
+    loader = TimestampMicrosecondsLoader(pg.adapters.types["timestamp"].oid)
+    microseconds = (datetime(2013, 3, 14, 23) - datetime(2000, 1, 1)) // timedelta(
+        microseconds=1
+    )
+
+    dataset = along_track.build_dataset(
+        schema=along_track_schema,
+        rows=[(loader.load(struct.pack("!q", microseconds)),), (None,)],
+        columns=["date_time"],
+    )
+
+    assert dataset["date_time"][0] == np.datetime64("2013-03-14T23:00:00")
+    assert np.isnat(dataset["date_time"][1])
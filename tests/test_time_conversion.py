@@ -0,0 +1,47 @@
+import netCDF4 as nc
+import numpy as np
+
+from OceanDB.utils.time_conversion import (
+    netcdf_time_to_datetime64,
+    unix_seconds_to_datetime64,
+)
+
+
+def test_netcdf_time_to_datetime64_matches_num2date():
+    """
+    TEST vectorized CF decoding agrees with netCDF4.num2date to within a microsecond
+    """
+    units = "days since 1950-01-01 00:00:00"
+    days = np.array([0.0, 23083.958333, 27028.000011574, 26000.123456789])
+
+    expected = nc.num2date(
+        days,
+        units,
+        only_use_cftime_datetimes=False,
+        only_use_python_datetimes=True,
+    ).astype("datetime64[us]")
+    result = netcdf_time_to_datetime64(days, units)
+
+    assert result.dtype == np.dtype("datetime64[us]")
+    assert (np.abs(result - expected) <= np.timedelta64(1, "us")).all()
+
+
+def test_netcdf_time_to_datetime64_masked_is_nat():
+    """
+    TEST masked time values decode to NaT
+    """
+    seconds = np.ma.masked_array([0, 60], mask=[False, True])
+
+    result = netcdf_time_to_datetime64(seconds, "seconds since 2000-01-01")
+
+    assert result[0] == np.datetime64("2000-01-01T00:00:00")
+    assert np.isnat(result[1])
+
+
+def test_unix_seconds_to_datetime64():
+    """
+    TEST eddy unix seconds decode to naive UTC
+    """
+    result = unix_seconds_to_datetime64(np.array([0, 1_600_000_000], dtype=np.uint32))
+
+    assert result.tolist()[1].isoformat() == "2020-09-13T12:26:40"